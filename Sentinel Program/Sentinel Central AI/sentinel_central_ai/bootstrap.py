@@ -7,6 +7,7 @@ from dataclasses import dataclass
 from typing import Iterable
 
 from .config import SentinelConfig
+from .coordinator.ingest import RemoteIngestPipeline
 from .coordinator.services import Coordinator
 from .learning.feedback import FeedbackLoop
 from .policy.engine import PolicyEngine
@@ -30,6 +31,7 @@ class BootstrapContext:
     feedback_loop: FeedbackLoop
     coordinator: Coordinator
     dashboard: Dashboard
+    remote_ingest: RemoteIngestPipeline | None = None
 
 
 def _announce_components(logger: logging.Logger, context: BootstrapContext) -> None:
@@ -77,7 +79,7 @@ def bootstrap_environment(config: SentinelConfig | None = None) -> BootstrapCont
         },
     )
 
-    feature_store = FeatureStore.from_config(config.storage)
+    feature_store = FeatureStore.from_config(config.storage, snapshot_windows=config.learning.windows)
     ingest_pipeline = IngestPipeline(
         TelemetryIngestor.from_config(config.sensor.telemetry),
         feature_store,
@@ -98,6 +100,9 @@ def bootstrap_environment(config: SentinelConfig | None = None) -> BootstrapCont
         feature_store=feature_store,
     )
     dashboard = Dashboard(coordinator=coordinator)
+    remote_ingest = None
+    if config.coordinator.telemetry.enabled:
+        remote_ingest = RemoteIngestPipeline.from_config(config.coordinator.telemetry, feature_store)
 
     context = BootstrapContext(
         ingest_pipeline=ingest_pipeline,
@@ -107,6 +112,7 @@ def bootstrap_environment(config: SentinelConfig | None = None) -> BootstrapCont
         feedback_loop=feedback_loop,
         coordinator=coordinator,
         dashboard=dashboard,
+        remote_ingest=remote_ingest,
     )
 
     _announce_components(logger, context)
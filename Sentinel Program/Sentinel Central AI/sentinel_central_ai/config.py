@@ -7,6 +7,18 @@ from datetime import timedelta
 from typing import Dict, List
 
 
+@dataclass(slots=True)
+class RetentionTier:
+    """Keep feature history at ``resolution`` for ``retention``.
+
+    A zero resolution keeps the raw feature windows; every other tier holds
+    count/sum/min/max buckets rolled up from the next finer tier.
+    """
+
+    resolution: timedelta
+    retention: timedelta
+
+
 @dataclass(slots=True)
 class StorageConfig:
     """Persistence configuration for features, decisions, and digests."""
@@ -15,6 +27,25 @@ class StorageConfig:
     dsn: str = "sqlite:///var/sentinel/features.db"
     audit_log_path: str = "var/sentinel/audit.log"
     digest_interval: timedelta = timedelta(hours=1)
+    commit_batch: int = 16
+    commit_interval: timedelta = timedelta(seconds=5)
+    max_pending: int = 10_000  # windows kept for retry while commits fail; oldest dropped beyond this
+    retention_tiers: List[RetentionTier] = field(
+        default_factory=lambda: [
+            RetentionTier(resolution=timedelta(0), retention=timedelta(hours=1)),
+            RetentionTier(resolution=timedelta(minutes=1), retention=timedelta(days=7)),
+            RetentionTier(resolution=timedelta(hours=1), retention=timedelta(days=365)),
+        ]
+    )
+    compaction_interval: timedelta = timedelta(minutes=1)
+    compaction_max_buckets: int = 60  # per tier per commit-path compaction; a backlog catches up over several
+    audit_flush_interval: timedelta = timedelta(seconds=1)
+    audit_flush_bytes: int = 64 * 1024
+    audit_max_backlog: int = 10_000
+    audit_segment_bytes: int = 64 * 1024 * 1024
+    audit_compress: bool = True
+    audit_hash_chain: bool = True
+    history_dtype: str = "float64"  # or "float32" to halve the in-memory history
 
 
 @dataclass(slots=True)
@@ -25,6 +56,20 @@ class TelemetryConfig:
     redis_url: str = "redis://localhost:6379/0"
     redis_channel: str = "sentinel.telemetry"
     redis_list_key: str = "sentinel.telemetry.queue"
+    redis_encoding: str = "json"  # or "msgpack" when the package is installed
+    redis_transport: str = "list"  # or "stream" for coordinator consumer groups
+    redis_stream_key: str = "sentinel.telemetry.stream"
+    redis_list_max_len: int | None = 100_000  # LTRIM cap for the list, approximate MAXLEN for the stream
+    publish_batch: int = 256  # flush early if one cycle buffers this many
+    local_backlog: int = 10_000  # messages held in memory while Redis is down
+    spill_path: str | None = None  # e.g. "var/sentinel/telemetry.spill" to keep overflow on disk
+    spill_max_bytes: int = 64 * 1024 * 1024
+    reconnect_backoff: timedelta = timedelta(milliseconds=500)
+    reconnect_backoff_max: timedelta = timedelta(seconds=30)
+    collector_workers: int = 4  # threads for blocking collectors
+    source_intervals: Dict[str, timedelta] = field(default_factory=dict)  # override collector cadences
+    source_priorities: Dict[str, int] = field(default_factory=dict)  # override collector priorities
+    collector_cycle_budget: timedelta | None = timedelta(milliseconds=500)  # summed cost budgets per cycle
     sources: List[str] = field(
         default_factory=lambda: [
             "auth_logs",
@@ -123,6 +168,24 @@ class LearningConfig:
     )
 
 
+@dataclass(slots=True)
+class TelemetryConsumerConfig:
+    """Coordinator-side consumption of telemetry published by remote sensors."""
+
+    enabled: bool = False
+    redis_url: str = "redis://localhost:6379/0"
+    transport: str = "list"  # must match the sensors' TelemetryConfig.redis_transport
+    stream_key: str = "sentinel.telemetry.stream"
+    list_key: str = "sentinel.telemetry.queue"
+    group: str = "sentinel-coordinator"
+    consumer: str = ""  # defaults to the hostname; must stay the same across restarts
+    batch_size: int = 512
+    block: timedelta = timedelta(seconds=1)
+    max_inflight: int = 4096  # unacknowledged messages before reads pause
+    claim_idle: timedelta = timedelta(minutes=1)
+    window: timedelta = timedelta(seconds=1)
+
+
 @dataclass(slots=True)
 class CoordinatorConfig:
     """Coordinator node configuration."""
@@ -131,6 +194,7 @@ class CoordinatorConfig:
     ui_endpoint: str = "https://coordinator.local:8443"
     approvals_api: str = "https://coordinator.local:8443/approvals"
     storage_engine: str = "sqlite"
+    telemetry: TelemetryConsumerConfig = field(default_factory=TelemetryConsumerConfig)
 
 
 @dataclass(slots=True)
@@ -0,0 +1,383 @@
+"""Background writer for the feature store's append-only audit log.
+
+:meth:`AuditLogWriter.submit` only queues records. A daemon thread
+serialises them to JSON lines and appends them to a segment file it keeps
+open. Lines are written with one ``fsync`` once ``flush_bytes`` are pending
+or ``flush_interval`` has passed since the oldest pending line. The queue
+holds at most ``max_backlog`` records: if the disk falls behind, the oldest
+queued records are dropped rather than blocking ingest, the log records an
+``audit_dropped`` marker for the gap, and :meth:`AuditLogWriter.stats`
+reports the backlog.
+
+The active segment rotates at ``segment_bytes`` into ``<name>.<index>``,
+gzip-compressed when ``compress`` is set. A segment left over from a
+previous run is resumed on start. With ``hash_chain`` every segment opens
+with a header naming the SHA-256 of the previous segment and is sealed with
+a footer holding its own SHA-256, so editing, truncating, or removing a
+sealed segment breaks the chain. :func:`verify_chain` walks it.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any, BinaryIO, Deque, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.logging_config import configure_logging
+
+logger = configure_logging(context={"component": "audit_log"})
+
+HEADER_KEY = "audit_segment"
+FOOTER_KEY = "audit_segment_end"
+
+
+def _json_serializer(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return value
+
+
+def _encode(record: dict) -> bytes:
+    return (json.dumps(record, default=_json_serializer) + "\n").encode("utf-8")
+
+
+def _segments(path: Path) -> List[Tuple[int, Path]]:
+    """Rotated segments of ``path`` in chain order."""
+
+    pattern = re.compile(re.escape(path.name) + r"\.(\d+)(\.gz)?$")
+    found = []
+    for candidate in path.parent.glob(path.name + ".*"):
+        match = pattern.match(candidate.name)
+        if match:
+            found.append((int(match.group(1)), candidate))
+    return sorted(found)
+
+
+def _read_segment(path: Path) -> bytes:
+    if path.suffix == ".gz":
+        with gzip.open(path, "rb") as handle:
+            return handle.read()
+    return path.read_bytes()
+
+
+def _marker(line: bytes, key: str) -> Optional[dict]:
+    """The header/footer payload carried by ``line``, if it is one."""
+
+    if not line.startswith(b'{"' + key.encode() + b'"'):
+        return None
+    try:
+        return json.loads(line)[key]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+@dataclass(slots=True)
+class AuditLogWriter:
+    """Append audit records from a background thread with rotation."""
+
+    path: Path
+    flush_interval: timedelta = timedelta(seconds=1)
+    flush_bytes: int = 64 * 1024
+    max_backlog: int = 10_000
+    segment_bytes: int = 64 * 1024 * 1024
+    compress: bool = True
+    hash_chain: bool = True
+    _queue: Deque[dict] = field(init=False, default_factory=deque)
+    _condition: threading.Condition = field(init=False, default_factory=threading.Condition)
+    _thread: threading.Thread | None = field(init=False, default=None)
+    _closing: bool = field(init=False, default=False)
+    _buffered: int = field(init=False, default=0)
+    _reported_drops: int = field(init=False, default=0)
+    _handle: BinaryIO | None = field(init=False, default=None)
+    _digest: Any = field(init=False, default=None)  # running sha256 of the active segment
+    _index: int = field(init=False, default=0)
+    _previous: str | None = field(init=False, default=None)
+    _size: int = field(init=False, default=0)
+    _records: int = field(init=False, default=0)
+    _stats: Dict[str, int] = field(
+        init=False,
+        default_factory=lambda: {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "high_water": 0,
+            "bytes": 0,
+            "flushes": 0,
+            "rotations": 0,
+            "errors": 0,
+        },
+    )
+
+    def __post_init__(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="sentinel-audit", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(self, records: Iterable[dict]) -> None:
+        """Queue records for the writer thread; never waits on I/O."""
+
+        with self._condition:
+            if self._closing:
+                raise RuntimeError("AuditLogWriter is closed")
+            queue = self._queue
+            was_empty = not queue
+            for record in records:
+                queue.append(record)
+                self._stats["submitted"] += 1
+            overflow = len(queue) - self.max_backlog
+            if overflow > 0:
+                for _ in range(overflow):
+                    queue.popleft()
+                if not self._stats["dropped"]:
+                    logger.warning(
+                        "Audit backlog full; dropping oldest records",
+                        extra={"sentinel_context": {"max_backlog": self.max_backlog}},
+                    )
+                self._stats["dropped"] += overflow
+            self._stats["high_water"] = max(self._stats["high_water"], len(queue) + self._buffered)
+            if was_empty:
+                self._condition.notify()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters plus the current backlog (queued and not yet written)."""
+
+        with self._condition:
+            stats = dict(self._stats)
+            stats["backlog"] = len(self._queue) + self._buffered
+            stats["max_backlog"] = self.max_backlog
+            stats["segment"] = self._index
+        return stats
+
+    def close(self) -> None:
+        """Write everything queued, fsync, and stop the writer thread."""
+
+        with self._condition:
+            if self._closing:
+                return
+            self._closing = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        try:
+            self._recover()
+        except OSError:
+            logger.exception("Could not open audit log", extra={"sentinel_context": {"path": str(self.path)}})
+            self._stats["errors"] += 1
+        pending: List[bytes] = []
+        pending_bytes = 0
+        deadline: float | None = None
+        while True:
+            with self._condition:
+                if not self._queue and not self._closing:
+                    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    self._condition.wait(timeout)
+                records = list(self._queue)
+                self._queue.clear()
+                self._buffered += len(records)
+                closing = self._closing
+                dropped = self._stats["dropped"] - self._reported_drops
+                self._reported_drops = self._stats["dropped"]
+            lines = [_encode(record) for record in records]
+            if dropped:
+                lines.insert(0, _encode({"audit_dropped": dropped, "at": datetime.now(UTC)}))
+            pending.extend(lines)
+            pending_bytes += sum(len(line) for line in lines)
+            if pending and deadline is None:
+                deadline = time.monotonic() + self.flush_interval.total_seconds()
+            if pending and (closing or pending_bytes >= self.flush_bytes or time.monotonic() >= deadline):
+                self._write(pending, pending_bytes)
+                pending, pending_bytes, deadline = [], 0, None
+            if closing:
+                break
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _write(self, lines: List[bytes], size: int) -> None:
+        records = sum(1 for line in lines if not line.startswith(b'{"audit_dropped"'))
+        data = b"".join(lines)
+        started = time.perf_counter()
+        try:
+            if self._handle is None:
+                self._open_segment()
+            self._handle.write(data)
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        except OSError:
+            logger.exception("Audit log write failed", extra={"sentinel_context": {"records": records}})
+            with self._condition:
+                self._buffered -= records
+                self._stats["errors"] += 1
+                self._stats["dropped"] += records
+                self._reported_drops += records  # the log is not writable; no marker
+            return
+        if self._digest is not None:
+            self._digest.update(data)
+        self._size += size
+        self._records += len(lines)
+        with self._condition:
+            self._buffered -= records
+            self._stats["written"] += records
+            self._stats["bytes"] += size
+            self._stats["flushes"] += 1
+        logger.debug(
+            "Flushed audit records",
+            extra={
+                "sentinel_context": {
+                    "records": records,
+                    "bytes": size,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                }
+            },
+        )
+        if self._size >= self.segment_bytes:
+            self._rotate()
+
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+    def _recover(self) -> None:
+        """Resume the active segment left by a previous run, or open one."""
+
+        segments = _segments(self.path)
+        self._index = segments[-1][0] + 1 if segments else 1
+        if not (self.path.exists() and self.path.stat().st_size):
+            if self.hash_chain and segments:
+                self._previous = self._sealed_digest(segments[-1][1])
+            self._open_segment()
+            return
+        content = self.path.read_bytes()
+        self._handle = self.path.open("ab")
+        if not content.endswith(b"\n"):
+            # Torn final line from a crash; terminate it so the next record parses.
+            self._handle.write(b"\n")
+            content += b"\n"
+        header = _marker(content.split(b"\n", 1)[0], HEADER_KEY)
+        if header is not None:
+            self._index = int(header.get("index", self._index))
+        self._size = len(content)
+        self._records = content.count(b"\n") - (header is not None)
+        if self.hash_chain:
+            self._digest = hashlib.sha256(content)
+            if header is None:
+                # Written before chaining was enabled: seal it so the chain starts here.
+                self._rotate()
+
+    @staticmethod
+    def _sealed_digest(segment: Path) -> str | None:
+        lines = _read_segment(segment).rstrip(b"\n").rsplit(b"\n", 1)
+        footer = _marker(lines[-1], FOOTER_KEY)
+        return None if footer is None else footer.get("sha256")
+
+    def _open_segment(self) -> None:
+        self._handle = self.path.open("ab")
+        self._size = self._records = 0
+        self._digest = None
+        if self.hash_chain:
+            self._digest = hashlib.sha256()
+            header = _encode(
+                {
+                    HEADER_KEY: {
+                        "index": self._index,
+                        "previous_sha256": self._previous,
+                        "opened_at": datetime.now(UTC),
+                    }
+                }
+            )
+            self._handle.write(header)
+            self._handle.flush()
+            self._digest.update(header)
+            self._size = len(header)
+
+    def _rotate(self) -> None:
+        assert self._handle is not None
+        digest = None
+        if self._digest is not None:
+            digest = self._digest.hexdigest()
+            footer = {FOOTER_KEY: {"index": self._index, "records": self._records, "sha256": digest}}
+            self._handle.write(_encode(footer))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+        self._handle = None
+        sealed = self.path.with_name(f"{self.path.name}.{self._index:06d}")
+        os.replace(self.path, sealed)
+        if self.compress:
+            compressed = sealed.with_name(sealed.name + ".gz")
+            with sealed.open("rb") as source, gzip.open(compressed.with_suffix(".tmp"), "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.replace(compressed.with_suffix(".tmp"), compressed)
+            sealed.unlink()
+            sealed = compressed
+        logger.info(
+            "Rotated audit segment",
+            extra={"sentinel_context": {"segment": str(sealed), "records": self._records, "sha256": digest}},
+        )
+        with self._condition:
+            self._stats["rotations"] += 1
+        self._previous = digest
+        self._index += 1
+        self._open_segment()
+
+
+def verify_chain(path: Path) -> List[str]:
+    """Check the hash chain of ``path`` and its rotated segments.
+
+    Returns a description of every break found; an empty list means each
+    sealed segment matches its footer and links to its predecessor.
+    """
+
+    problems: List[str] = []
+    previous: str | None = None
+    expected_index: int | None = None
+    chain = [(index, segment, True) for index, segment in _segments(path)]
+    if path.exists():
+        chain.append((None, path, False))
+    for index, segment, sealed in chain:
+        lines = _read_segment(segment).splitlines(keepends=True)
+        header = _marker(lines[0], HEADER_KEY) if lines else None
+        if index is None and header is not None:
+            index = int(header.get("index", 0))
+        if expected_index is not None and index != expected_index:
+            problems.append(f"{segment.name}: expected segment {expected_index}, found {index}")
+        if header is None:
+            if expected_index is not None:
+                problems.append(f"{segment.name}: no chain header")
+        elif header.get("previous_sha256") != previous:
+            problems.append(f"{segment.name}: does not chain to the previous segment")
+        if not sealed:
+            break
+        footer = _marker(lines[-1], FOOTER_KEY) if lines else None
+        if footer is None:
+            problems.append(f"{segment.name}: not sealed")
+            previous = None
+        else:
+            actual = hashlib.sha256(b"".join(lines[:-1])).hexdigest()
+            if actual != footer.get("sha256"):
+                problems.append(f"{segment.name}: content does not match its sealed digest")
+            previous = footer.get("sha256")
+        expected_index = None if index is None else index + 1
+    return problems
+
+
+__all__ = ["AuditLogWriter", "verify_chain"]
@@ -0,0 +1,113 @@
+"""Publish latency benchmark for :class:`EventBus`.
+
+Runs ``--cycles`` telemetry cycles of the configured sources through a
+``TelemetryIngestor`` and compares the original per-message path (a
+``PUBLISH`` and an ``RPUSH`` round trip for each message) with the batched
+pipeline flushed once per ``collect()`` cycle, for JSON and, when installed,
+MessagePack encoding. Each run also checks that the list key was capped at
+``--list-max-len`` and that the newest entry decodes to the last source.
+
+Point ``--redis-url`` at a local ``redis-server``, or pass ``--fake`` to use
+an in-process ``fakeredis`` server (round trips then cost almost nothing, so
+only the encoding and command overhead are compared).
+
+Run with ``python -m sentinel_central_ai.data.bench_event_bus``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import statistics
+import time
+from typing import Any, Dict, List
+
+from ..config import TelemetryConfig
+from . import ingestion_pipeline
+from .ingestion_pipeline import EventBus, TelemetryIngestor, _json_serializer, decode_message
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+    }
+
+
+class _PerMessageBus:
+    """The original write path: two blocking round trips per message."""
+
+    def __init__(self, bus: EventBus) -> None:
+        self.client, self.channel, self.list_key = bus._client, bus.channel, bus.list_key
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        serialized = json.dumps(message, default=_json_serializer)
+        self.client.publish(self.channel, serialized)
+        self.client.rpush(self.list_key, serialized)
+
+    def flush(self) -> int:
+        return 0
+
+
+def _run(config: TelemetryConfig, cycles: int, baseline: bool) -> Dict[str, Any]:
+    ingestor = TelemetryIngestor.from_config(config)
+    bus = ingestor.event_bus
+    if bus._client is None:
+        raise SystemExit(f"could not connect to {config.redis_url}")
+    bus._client.delete(config.redis_list_key)
+    if baseline:
+        ingestor.event_bus = _PerMessageBus(bus)
+    samples = []
+    for _ in range(cycles):
+        started = time.perf_counter()
+        for _event in ingestor.collect():
+            pass
+        samples.append(time.perf_counter() - started)
+    client = ingestion_pipeline.redis.Redis.from_url(config.redis_url)
+    length = client.llen(config.redis_list_key)
+    newest = decode_message(client.lindex(config.redis_list_key, -1))
+    if newest["stream"] != config.sources[-1]:
+        raise SystemExit(f"unexpected newest message: {newest}")
+    result: Dict[str, Any] = {"cycle": _percentiles(samples), "list_length": length}
+    if not baseline:
+        result["bus"] = bus.stats()
+        if config.redis_list_max_len is not None and length > config.redis_list_max_len:
+            raise SystemExit(f"list key holds {length} entries, cap is {config.redis_list_max_len}")
+    bus.close()
+    return result
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15", help="Redis database to write to")
+    parser.add_argument("--fake", action="store_true", help="use an in-process fakeredis server")
+    parser.add_argument("--cycles", type=int, default=500, help="collect() cycles per run")
+    parser.add_argument("--list-max-len", type=int, default=1000, help="LTRIM cap for the list key")
+    args = parser.parse_args(argv)
+    logging.getLogger("sentinel").setLevel(logging.WARNING)
+    if args.fake:
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        ingestion_pipeline.redis.Redis.from_url = classmethod(
+            lambda cls, url, **kwargs: fakeredis.FakeRedis(server=server)
+        )
+    config = TelemetryConfig(
+        redis_url=args.redis_url,
+        redis_channel="sentinel.bench",
+        redis_list_key="sentinel.bench.queue",
+        redis_list_max_len=args.list_max_len,
+    )
+    runs = {"per_message": _run(config, args.cycles, baseline=True)}
+    for encoding in ("json", "msgpack") if ingestion_pipeline.msgpack is not None else ("json",):
+        config.redis_encoding = encoding
+        runs[f"pipelined_{encoding}"] = _run(config, args.cycles, baseline=False)
+    for section, values in runs.items():
+        print(f"{section}: {values}")
+
+
+if __name__ == "__main__":
+    main()
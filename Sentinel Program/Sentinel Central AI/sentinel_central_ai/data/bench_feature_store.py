@@ -0,0 +1,206 @@
+"""Persist and rollup latency benchmark for :class:`FeatureStore`.
+
+Builds a database with ``--rows`` feature values in both the original
+text-keyed layout (v1) and the dictionary schema (v2), then measures:
+
+* ``persist`` – per-call latency of ``FeatureStore.persist`` including its
+  group commits, against the v1 one-transaction-per-window write path;
+* ``rollup`` – ``fetch_rollup`` latency for random features;
+* ``migrate`` – time to upgrade the v1 database in place;
+* ``compact_step`` – one commit-path compaction over the preloaded history,
+  capped at ``compaction_max_buckets`` buckets per tier;
+* ``compact`` – a full :meth:`FeatureStore.compact` of the rest of the
+  history, which rolls it up and drops raw windows older than an hour;
+* ``query`` – :meth:`FeatureStore.query` latency over the last hour, day and
+  three days, answered from the raw, 1-minute and 1-hour tiers.
+
+Run with ``python -m sentinel_central_ai.data.bench_feature_store``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from .feature_store import FeatureStore, StorageTelemetry
+from .ingestion_pipeline import FeatureWindow
+
+
+def _features(count: int) -> List[str]:
+    return [f"bench.feature_{index:03d}" for index in range(count)]
+
+
+def _populate_v1(path: Path, windows: int, names: List[str]) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL;")
+    connection.execute("PRAGMA synchronous=OFF;")
+    connection.execute(
+        "CREATE TABLE feature_windows (id INTEGER PRIMARY KEY AUTOINCREMENT, label TEXT NOT NULL, "
+        "window_seconds REAL NOT NULL, created_at TEXT NOT NULL)"
+    )
+    connection.execute(
+        "CREATE TABLE feature_values (window_id INTEGER NOT NULL, feature TEXT NOT NULL, value REAL NOT NULL, "
+        "FOREIGN KEY(window_id) REFERENCES feature_windows(id))"
+    )
+    start = datetime.now(UTC) - timedelta(seconds=windows)
+    chunk = 10_000
+    for first in range(1, windows + 1, chunk):
+        ids = range(first, min(first + chunk, windows + 1))
+        with connection:
+            connection.executemany(
+                "INSERT INTO feature_windows(id, label, window_seconds, created_at) VALUES (?, 'steady', 1.0, ?)",
+                [(window_id, (start + timedelta(seconds=window_id)).isoformat()) for window_id in ids],
+            )
+            connection.executemany(
+                "INSERT INTO feature_values(window_id, feature, value) VALUES (?, ?, ?)",
+                [(window_id, name, float(window_id % 97)) for window_id in ids for name in names],
+            )
+    connection.close()
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _time_calls(call: Callable[[], object], count: int) -> List[float]:
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _v1_persist(connection: sqlite3.Connection, window: FeatureWindow, audit_log: Path) -> None:
+    """The original write path: one transaction and one audit append per window."""
+
+    created_at = datetime.now(UTC).isoformat()
+    with connection:
+        cursor = connection.execute(
+            "INSERT INTO feature_windows(label, window_seconds, created_at) VALUES (?, ?, ?)",
+            (window.label, window.duration.total_seconds(), created_at),
+        )
+        connection.executemany(
+            "INSERT INTO feature_values(window_id, feature, value) VALUES (?, ?, ?)",
+            [(cursor.lastrowid, feature, float(value)) for feature, value in window.features.items()],
+        )
+    record = {"id": cursor.lastrowid, "label": window.label, "features": window.features, "created_at": created_at}
+    with audit_log.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(record) + "\n")
+
+
+def _v1_rollup(connection: sqlite3.Connection, feature: str) -> list:
+    return connection.execute(
+        """
+        SELECT fw.created_at, fv.value
+        FROM feature_values AS fv
+        JOIN feature_windows AS fw ON fw.id = fv.window_id
+        WHERE fv.feature = ?
+        ORDER BY fw.id DESC
+        LIMIT 64
+        """,
+        (feature,),
+    ).fetchall()
+
+
+def run(rows: int, feature_count: int, commit_batch: int, samples: int, directory: Path) -> Dict[str, Dict]:
+    names = _features(feature_count)
+    windows = max(1, rows // feature_count)
+    window = FeatureWindow(
+        duration=timedelta(seconds=1), features={name: 1.0 for name in names}, label="steady"
+    )
+    results: Dict[str, Dict] = {"setup": {"rows": windows * feature_count, "features": feature_count}}
+
+    v1_path = directory / "v1.db"
+    started = time.perf_counter()
+    _populate_v1(v1_path, windows, names)
+    results["setup"]["populate_seconds"] = round(time.perf_counter() - started, 1)
+
+    connection = sqlite3.connect(v1_path)
+    connection.execute("PRAGMA journal_mode=WAL;")
+    connection.execute("PRAGMA synchronous=NORMAL;")
+    rollup_samples = max(3, samples // 100)  # v1 rollups scan the whole table
+    results["v1"] = {
+        "persist": _percentiles(
+            _time_calls(lambda: _v1_persist(connection, window, directory / "audit_v1.log"), samples)
+        ),
+        "rollup": _percentiles(
+            _time_calls(lambda: _v1_rollup(connection, random.choice(names)), rollup_samples)
+        ),
+    }
+    connection.close()
+
+    storage = StorageTelemetry(
+        engine="sqlite",
+        dsn=f"sqlite:///{v1_path}",
+        digest_interval=timedelta(hours=1),
+        audit_log_path=directory / "audit.log",
+        commit_batch=commit_batch,
+        commit_interval=timedelta(hours=1),
+        compaction_interval=timedelta(days=1),  # compacted explicitly below
+    )
+    started = time.perf_counter()
+    store = FeatureStore(storage=storage)
+    results["v2"] = {"migrate_seconds": round(time.perf_counter() - started, 1)}
+    results["v2"]["persist"] = _percentiles(_time_calls(lambda: store.persist(window), samples))
+    results["v2"]["rollup"] = _percentiles(
+        _time_calls(lambda: store.fetch_rollup(random.choice(names)), samples)
+    )
+    started = time.perf_counter()
+    results["v2"]["compact_step"] = store.compact(max_buckets=storage.compaction_max_buckets)
+    results["v2"]["compact_step"]["seconds"] = round(time.perf_counter() - started, 3)
+    started = time.perf_counter()
+    results["v2"]["compact"] = store.compact()
+    results["v2"]["compact"]["seconds"] = round(time.perf_counter() - started, 1)
+    for label, span, resolution in (
+        ("query_1h", timedelta(hours=1), None),
+        ("query_1d", timedelta(days=1), None),
+        ("query_3d_hourly", timedelta(days=3), timedelta(hours=1)),
+    ):
+        results["v2"][label] = _percentiles(
+            _time_calls(
+                lambda: store.query(random.choice(names), datetime.now(UTC) - span, resolution=resolution),
+                max(3, samples // 10),
+            )
+        )
+    store.close()
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000, help="feature values to preload")
+    parser.add_argument("--features", type=int, default=30, help="features per window")
+    parser.add_argument("--commit-batch", type=int, default=16, help="windows per group commit")
+    parser.add_argument("--samples", type=int, default=1000, help="timed calls per measurement")
+    parser.add_argument("--dir", type=Path, help="working directory (default: a temporary one)")
+    args = parser.parse_args(argv)
+    # The store logs every call at DEBUG; that would dominate the timings.
+    logging.getLogger("sentinel").setLevel(logging.WARNING)
+    if args.dir:
+        args.dir.mkdir(parents=True, exist_ok=True)
+        results = run(args.rows, args.features, args.commit_batch, args.samples, args.dir)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            results = run(args.rows, args.features, args.commit_batch, args.samples, Path(directory))
+    for section, values in results.items():
+        print(f"{section}: {values}")
+
+
+if __name__ == "__main__":
+    main()
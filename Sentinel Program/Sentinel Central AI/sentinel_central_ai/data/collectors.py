@@ -0,0 +1,601 @@
+"""Telemetry collectors and the pool that runs them each ingest cycle.
+
+Every source is a :class:`TelemetryCollector` subclass registered under its
+source name with :func:`register_collector`; ``TelemetryConfig.sources``
+picks which ones run, and names without a collector fall back to
+:class:`GenericCollector`. Adding a real collector means writing a class,
+not editing a dispatch chain::
+
+    @register_collector
+    class SmartCtlCollector(TelemetryCollector):
+        source = "smartctl"
+        cadence = timedelta(minutes=5)
+        timeout = timedelta(seconds=3)
+
+        def collect(self, now):
+            ...
+            return CollectorResult(metrics=..., summary=..., tags=["disk"])
+
+Each class declares its ``cadence`` (rounded to whole ingest cycles), a
+``timeout``, a ``cost_budget`` and a ``priority``; :class:`CollectorPool`
+schedules them (see its docstring) and runs collectors
+marked ``blocking`` (the default, for anything touching the system) on a
+pool of daemon threads and waits for each only until its timeout or the end of the
+cycle, whichever comes first; a collector that overruns is reported and
+left to finish on its own, and is not started again while it is still
+running, so a hung collector costs one worker rather than the cycle, and
+does not keep the process from exiting.
+Non-blocking collectors such as the synthetic baselines below run inline.
+A result that took longer than ``cost_budget`` is still used but counted
+as an overrun.
+"""
+
+from __future__ import annotations
+
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, ClassVar, Dict, List, Tuple
+
+from ..utils.logging_config import configure_logging
+
+logger = configure_logging(context={"component": "telemetry_collectors"})
+
+
+@dataclass(slots=True)
+class CollectorResult:
+    """One collector reading, before it is wrapped into a telemetry payload."""
+
+    metrics: Dict[str, float]
+    summary: str
+    tags: List[str]
+    severity: str = "info"
+
+
+class TelemetryCollector:
+    """Base class for a telemetry source; subclasses implement :meth:`collect`."""
+
+    source: ClassVar[str] = ""
+    cadence: ClassVar[timedelta] = timedelta(seconds=1)
+    timeout: ClassVar[timedelta] = timedelta(milliseconds=500)
+    cost_budget: ClassVar[timedelta] = timedelta(milliseconds=50)
+    priority: ClassVar[int] = 0  # higher runs first when the cycle budget is short
+    blocking: ClassVar[bool] = True  # run on the pool, bounded by ``timeout``
+
+    def collect(self, now: datetime) -> CollectorResult:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def payload(self, now: datetime) -> Dict[str, Any]:
+        result = self.collect(now)
+        return {
+            "summary": result.summary,
+            "severity": result.severity,
+            "metrics": result.metrics,
+            "tags": result.tags,
+            "collected_at": now,
+        }
+
+
+COLLECTORS: Dict[str, type[TelemetryCollector]] = {}
+
+
+def register_collector(cls: type[TelemetryCollector]) -> type[TelemetryCollector]:
+    """Class decorator adding a collector to :data:`COLLECTORS` under its ``source``."""
+
+    if not cls.source:
+        raise ValueError(f"{cls.__name__} does not declare a source")
+    COLLECTORS[cls.source] = cls
+    return cls
+
+
+class GenericCollector(TelemetryCollector):
+    """Heartbeat for configured sources that have no registered collector."""
+
+    blocking = False
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+
+    def collect(self, now: datetime) -> CollectorResult:
+        return CollectorResult(metrics={"events.generic": 1.0}, summary="Generic telemetry event", tags=["generic"])
+
+
+def create_collector(source: str) -> TelemetryCollector:
+    cls = COLLECTORS.get(source)
+    return cls() if cls is not None else GenericCollector(source)
+
+
+# ----------------------------------------------------------------------------
+# Baseline collectors
+# ----------------------------------------------------------------------------
+# Deterministic readings keyed on the minute (``now.minute % 5``) so the
+# pipeline, rules and dashboards can be exercised without live sensors.
+
+
+class BaselineCollector(TelemetryCollector):
+    """Synthetic collector; pure computation, so it runs inline."""
+
+    cost_budget = timedelta(milliseconds=5)
+    blocking = False
+
+    def collect(self, now: datetime) -> CollectorResult:
+        return self.sample(now.minute % 5)
+
+    def sample(self, minute_bucket: int) -> CollectorResult:  # pragma: no cover - interface
+        raise NotImplementedError
+
+
+@register_collector
+class AuthLogsCollector(BaselineCollector):
+    source = "auth_logs"
+    priority = 5
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        failures = 2 + minute_bucket
+        return CollectorResult(
+            metrics={
+                "auth.failures": float(failures),
+                "intrusion.ssh_bruteforce": float(min(failures / 20, 1.0)),
+            },
+            summary=f"{failures} failed authentications observed",
+            tags=["auth", "ssh", "baseline"],
+        )
+
+
+@register_collector
+class ProcessInventoryCollector(BaselineCollector):
+    source = "process_inventory"
+    cadence = timedelta(seconds=10)
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        unsigned = 1 if minute_bucket == 0 else 0
+        return CollectorResult(
+            metrics={
+                "malware.unsigned_binaries": float(unsigned),
+                "malware.unexpected_elf": float(unsigned),
+            },
+            summary="Unsigned binaries present in writable paths" if unsigned else "Process inventory steady",
+            tags=["process", "malware"],
+            severity="warning" if unsigned else "info",
+        )
+
+
+@register_collector
+class OpenSocketsCollector(BaselineCollector):
+    source = "open_sockets"
+    cadence = timedelta(seconds=5)
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        long_lived = 3 + minute_bucket
+        return CollectorResult(
+            metrics={
+                "network.long_lived_connections": float(long_lived),
+                "exfil.egress_volume": float(long_lived * 5),
+            },
+            summary="Socket scan completed",
+            tags=["network", "sockets"],
+        )
+
+
+@register_collector
+class KernelAuditCollector(BaselineCollector):
+    source = "kernel_audit"
+    priority = 5
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        setuid_changes = 1 if minute_bucket == 0 else 0
+        return CollectorResult(
+            metrics={
+                "malware.setuid_change": float(setuid_changes),
+                "kernel.audit.anomalies": float(setuid_changes),
+            },
+            summary="Kernel audit stream analyzed",
+            tags=["kernel", "auditd", "ebpf"],
+            severity="warning" if setuid_changes else "info",
+        )
+
+
+@register_collector
+class FileIntegrityCollector(BaselineCollector):
+    source = "file_integrity"
+    cadence = timedelta(minutes=5)
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        drifts = minute_bucket
+        return CollectorResult(
+            metrics={"fim.aide_deviation": float(drifts)},
+            summary="AIDE baseline verified",
+            tags=["fim", "aide"],
+            severity="warning" if drifts else "info",
+        )
+
+
+@register_collector
+class PackageInventoryCollector(BaselineCollector):
+    source = "package_inventory"
+    cadence = timedelta(hours=1)
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        outdated = 1 if minute_bucket == 4 else 0
+        return CollectorResult(
+            metrics={"packages.outdated_critical": float(outdated)},
+            summary="Package inventory scanned",
+            tags=["packages", "sbom"],
+        )
+
+
+@register_collector
+class SystemdStatesCollector(BaselineCollector):
+    source = "systemd_states"
+    cadence = timedelta(seconds=10)
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        return CollectorResult(
+            metrics={"services.restarts": float(minute_bucket // 2)},
+            summary="Systemd unit snapshot",
+            tags=["systemd", "services"],
+        )
+
+
+@register_collector
+class WireguardStatusCollector(BaselineCollector):
+    source = "wireguard_status"
+    cadence = timedelta(seconds=10)
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        return CollectorResult(
+            metrics={"wireguard.enforced": 1.0, "wireguard.anomaly": 0.0},
+            summary="WireGuard tunnel healthy",
+            tags=["wireguard", "vpn"],
+        )
+
+
+@register_collector
+class ClamavScanCollector(BaselineCollector):
+    source = "clamav_scan"
+    cadence = timedelta(hours=1)
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        hits = 0 if minute_bucket else 1
+        return CollectorResult(
+            metrics={"malware.signature_hits": float(hits)},
+            summary="ClamAV nightly sweep",
+            tags=["malware", "clamav"],
+            severity="warning" if hits else "info",
+        )
+
+
+@register_collector
+class YaraSweepCollector(BaselineCollector):
+    source = "yara_sweep"
+    cadence = timedelta(minutes=15)
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        return CollectorResult(
+            metrics={"malware.yara_hits": 0.0 if minute_bucket else 0.5},
+            summary="YARA sweep complete",
+            tags=["malware", "yara"],
+        )
+
+
+@register_collector
+class EbpfCountersCollector(BaselineCollector):
+    source = "ebpf_counters"
+    priority = 10
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        syn_rate = 50 + minute_bucket * 5
+        return CollectorResult(
+            metrics={
+                "ddos.syn_rate": float(syn_rate),
+                "ddos.udp_flood": float(5 * minute_bucket),
+            },
+            summary="eBPF counters refreshed",
+            tags=["network", "ebpf", "ddos"],
+            severity="warning" if syn_rate > 100 else "info",
+        )
+
+
+@register_collector
+class HttpTelemetryCollector(BaselineCollector):
+    source = "http_telemetry"
+    priority = 10
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        return CollectorResult(
+            metrics={
+                "http.error_rate": float(0.05 * minute_bucket),
+                "http.user_agent_anomaly": float(0.1 * minute_bucket),
+            },
+            summary="HTTP telemetry processed",
+            tags=["http", "application"],
+        )
+
+
+@register_collector
+class DnsWatchCollector(BaselineCollector):
+    source = "dns_watch"
+    priority = 5
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        return CollectorResult(
+            metrics={"exfil.dns_tunnel_score": float(0.1 * minute_bucket)},
+            summary="DNS heuristics evaluated",
+            tags=["dns", "exfil"],
+        )
+
+
+@register_collector
+class ExfilWatchCollector(BaselineCollector):
+    source = "exfil_watch"
+    priority = 5
+
+    def sample(self, minute_bucket: int) -> CollectorResult:
+        return CollectorResult(
+            metrics={"exfil.long_lived_outbound": float(10 * (minute_bucket + 1))},
+            summary="Egress posture analyzed",
+            tags=["exfil", "network"],
+        )
+
+
+# ----------------------------------------------------------------------------
+# Dispatch
+# ----------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class _DaemonWorkers:
+    """Fixed set of daemon threads running submitted calls.
+
+    ``ThreadPoolExecutor`` joins its workers at interpreter exit even after
+    ``shutdown(wait=False)``, so one hung collector would keep the process
+    alive; daemon threads are abandoned instead.
+    """
+
+    max_workers: int
+    name: str
+    _queue: "queue.SimpleQueue[Tuple[Future, Any, tuple] | None]" = field(
+        init=False, default_factory=queue.SimpleQueue
+    )
+    _threads: List[threading.Thread] = field(init=False, default_factory=list)
+    _idle: threading.Semaphore = field(init=False, default_factory=lambda: threading.Semaphore(0))
+
+    def submit(self, fn: Any, *args: Any) -> Future:
+        future: Future = Future()
+        self._queue.put((future, fn, args))
+        if not self._idle.acquire(blocking=False) and len(self._threads) < self.max_workers:
+            thread = threading.Thread(
+                target=self._work, name=f"{self.name}_{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return future
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args)
+                except BaseException as exc:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(result)
+            self._idle.release()
+
+    def shutdown(self) -> None:
+        """Cancel queued calls and let idle workers exit; running calls are abandoned."""
+
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[0].cancel()
+        for _ in self._threads:
+            self._queue.put(None)
+
+
+@dataclass(slots=True)
+class CollectorPool:
+    """Schedules the enabled collectors and runs those that are due.
+
+    Every source has an interval (its collector's ``cadence`` unless
+    ``intervals`` overrides it) counted in whole ``cycle`` steps, so on the
+    default 1-second cycle a 1-hour sweep runs on every 3600th call to
+    :meth:`run`. Due sources start in priority order (``priorities``
+    overrides the class ``priority``), each adding its ``cost_budget`` to
+    the cycle's spend; once ``cycle_budget`` is spent, the rest are deferred
+    to the next cycle. A deferred source gains one priority point per
+    cycle it waits, so low priorities are delayed, never starved. A blocking
+    collector still running from an earlier cycle is skipped for this one
+    and rescheduled a full interval later rather than started twice.
+    :meth:`schedule` shows each source's interval, priority and next-due
+    time.
+    """
+
+    sources: List[str]
+    cycle: timedelta = timedelta(seconds=1)
+    max_workers: int = 4
+    intervals: Dict[str, timedelta] = field(default_factory=dict)
+    priorities: Dict[str, int] = field(default_factory=dict)
+    cycle_budget: timedelta | None = timedelta(milliseconds=500)
+    _collectors: Dict[str, TelemetryCollector] = field(init=False, default_factory=dict)
+    _every: Dict[str, int] = field(init=False, default_factory=dict)  # interval in cycles
+    _priority: Dict[str, int] = field(init=False, default_factory=dict)
+    _due: Dict[str, int] = field(init=False, default_factory=dict)  # cycle the source is next due
+    _last_run: Dict[str, datetime] = field(init=False, default_factory=dict)
+    _running: Dict[str, Future] = field(init=False, default_factory=dict)
+    _executor: _DaemonWorkers | None = field(init=False, default=None)
+    _cycles: int = field(init=False, default=0)
+    _last_now: datetime | None = field(init=False, default=None)
+    _stats: Dict[str, Dict[str, float]] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        cycle = max(self.cycle.total_seconds(), 1e-3)
+        for source in self.sources:
+            collector = create_collector(source)
+            interval = self.intervals.get(source, collector.cadence)
+            self._collectors[source] = collector
+            self._every[source] = max(1, math.ceil(interval.total_seconds() / cycle - 1e-9))
+            self._priority[source] = self.priorities.get(source, collector.priority)
+            self._due[source] = 0
+            self._stats[source] = {
+                "runs": 0,
+                "timeouts": 0,
+                "errors": 0,
+                "over_budget": 0,
+                "skipped_running": 0,
+                "deferred": 0,
+                "last_ms": 0.0,
+            }
+
+    def run(self, now: datetime) -> List[Tuple[str, Dict[str, Any]]]:
+        """Payloads from the collectors run this cycle, in source order.
+
+        Collectors that fail, time out, are deferred, or are still running
+        from an earlier cycle contribute nothing this cycle.
+        """
+
+        cycle, self._cycles = self._cycles, self._cycles + 1
+        self._last_now = now
+        started = time.perf_counter()
+        cycle_deadline = started + self.cycle.total_seconds()
+        budget = self.cycle_budget.total_seconds() if self.cycle_budget is not None else None
+        due = [source for source in self._collectors if self._due[source] <= cycle]
+        # Overdue cycles age a deferred source's priority.
+        due.sort(key=lambda source: self._priority[source] + cycle - self._due[source], reverse=True)
+        spent = 0.0
+        inline: List[str] = []
+        pooled: List[Tuple[str, Future, float]] = []
+        for source in due:
+            collector = self._collectors[source]
+            if collector.blocking and source in self._running:
+                self._stats[source]["skipped_running"] += 1
+                self._due[source] = cycle + self._every[source]
+                continue
+            cost = collector.cost_budget.total_seconds()
+            if budget is not None and spent and spent + cost > budget:
+                self._stats[source]["deferred"] += 1
+                continue
+            spent += cost
+            self._due[source] = cycle + self._every[source]
+            self._last_run[source] = now
+            if not collector.blocking:
+                inline.append(source)
+                continue
+            if self._executor is None:
+                self._executor = _DaemonWorkers(max_workers=self.max_workers, name="sentinel-collector")
+            future = self._executor.submit(self._timed, collector, now)
+            self._running[source] = future
+            future.add_done_callback(lambda _done, source=source: self._running.pop(source, None))
+            pooled.append((source, future, min(started + collector.timeout.total_seconds(), cycle_deadline)))
+        payloads: Dict[str, Dict[str, Any]] = {}
+        for source in inline:  # while the pool works
+            self._call(source, self._collectors[source], now, payloads)
+        for source, future, deadline in sorted(pooled, key=lambda item: item[2]):
+            try:
+                payload, elapsed = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+            except FutureTimeout:
+                self._stats[source]["timeouts"] += 1
+                logger.warning(
+                    "Telemetry collector timed out; skipping it until it finishes",
+                    extra={"sentinel_context": {"source": source, "timeout_ms": round((deadline - started) * 1000, 1)}},
+                )
+                continue
+            except Exception as exc:
+                self._failed(source, exc)
+                continue
+            self._record(source, self._collectors[source], elapsed)
+            payloads[source] = payload
+        return [(source, payloads[source]) for source in self._collectors if source in payloads]
+
+    def schedule(self) -> List[Dict[str, Any]]:
+        """Each source's interval, priority, last run and next-due time, soonest first."""
+
+        # The cycle about to run is due at the last cycle's time plus one step.
+        current = self._cycles
+        base = self._last_now - self.cycle * (current - 1) if self._last_now is not None else None
+        rows = []
+        for source, collector in self._collectors.items():
+            due = max(self._due[source], current)
+            rows.append(
+                {
+                    "source": source,
+                    "interval_s": self._every[source] * self.cycle.total_seconds(),
+                    "priority": self._priority[source],
+                    "blocking": collector.blocking,
+                    "running": source in self._running,
+                    "last_run": self._last_run.get(source),
+                    "next_due": base + self.cycle * due if base is not None else None,
+                    "overdue_cycles": max(0, current - self._due[source]),
+                }
+            )
+        rows.sort(key=lambda row: (max(self._due[row["source"]], current), -row["priority"]))
+        return rows
+
+    @staticmethod
+    def _timed(collector: TelemetryCollector, now: datetime) -> Tuple[Dict[str, Any], float]:
+        started = time.perf_counter()
+        payload = collector.payload(now)
+        return payload, time.perf_counter() - started
+
+    def _call(
+        self, source: str, collector: TelemetryCollector, now: datetime, payloads: Dict[str, Dict[str, Any]]
+    ) -> None:
+        try:
+            payload, elapsed = self._timed(collector, now)
+        except Exception as exc:
+            self._failed(source, exc)
+            return
+        self._record(source, collector, elapsed)
+        payloads[source] = payload
+
+    def _record(self, source: str, collector: TelemetryCollector, elapsed: float) -> None:
+        stats = self._stats[source]
+        stats["runs"] += 1
+        stats["last_ms"] = round(elapsed * 1000, 3)
+        if elapsed > collector.cost_budget.total_seconds():
+            stats["over_budget"] += 1
+            logger.debug(
+                "Telemetry collector over its cost budget",
+                extra={
+                    "sentinel_context": {
+                        "source": source,
+                        "elapsed_ms": stats["last_ms"],
+                        "budget_ms": collector.cost_budget.total_seconds() * 1000,
+                    }
+                },
+            )
+
+    def _failed(self, source: str, exc: Exception) -> None:
+        self._stats[source]["errors"] += 1
+        logger.error(
+            "Telemetry collector failed",
+            exc_info=exc,
+            extra={"sentinel_context": {"source": source}},
+        )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-source run, timeout, error, skip, deferral and budget counters."""
+
+        return {
+            source: dict(stats, running=source in self._running, every_cycles=self._every[source])
+            for source, stats in self._stats.items()
+        }
+
+    def close(self) -> None:
+        """Stop the worker threads without waiting for hung collectors."""
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,316 @@
+"""In-memory feature window history for :class:`FeatureStore`.
+
+With NumPy installed the history is a :class:`FeatureRingBuffer`: one 2-D
+array of ``capacity`` windows by feature column, with feature names
+interned once in a shared index and ``NaN`` where a window lacks a feature.
+Every row is written twice, at ``slot`` and ``slot + capacity``, so the
+last ``n`` windows are always one contiguous slice and :meth:`view` hands
+out read-only :class:`FeatureMatrix` views without copying. Snapshot,
+mean, max and percentile queries are vectorised over that slice, and the
+running per-feature totals are updated with one vector add and subtract
+per window.
+
+Without NumPy, :class:`FeatureDeque` keeps the original ``deque`` of
+:class:`FeatureWindow` objects and answers the same queries in Python;
+only :meth:`view` is unavailable.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any, Deque, Dict, List, Tuple
+
+try:  # pragma: no cover - optional dependency
+    import numpy as np
+except Exception:  # pragma: no cover - runtime only
+    np = None
+
+from .ingestion_pipeline import FeatureWindow
+
+
+@dataclass(slots=True)
+class RunningTotals:
+    """Per-feature sums over a sliding run of windows, updated in place.
+
+    The run is bounded by ``limit`` windows or by ``span`` of time. Leaving
+    windows are subtracted; the sums are recomputed from the retained
+    windows once as many have left as remain, which bounds rounding drift
+    at O(features) amortised per window.
+    """
+
+    limit: int | None = None
+    span: timedelta | None = None
+    entries: Deque[Tuple[datetime, Dict[str, float]]] = field(default_factory=deque)
+    totals: Dict[str, float] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+    removed: int = 0
+
+    def add(self, created_at: datetime, features: Dict[str, float]) -> None:
+        self.entries.append((created_at, features))
+        totals, counts = self.totals, self.counts
+        for feature, value in features.items():
+            totals[feature] = totals.get(feature, 0.0) + value
+            counts[feature] = counts.get(feature, 0) + 1
+        if self.limit is not None:
+            while len(self.entries) > self.limit:
+                self._pop()
+
+    def expire(self, now: datetime) -> None:
+        if self.span is None:
+            return
+        cutoff = now - self.span
+        while self.entries and self.entries[0][0] <= cutoff:
+            self._pop()
+
+    def _pop(self) -> None:
+        _, features = self.entries.popleft()
+        totals, counts = self.totals, self.counts
+        for feature, value in features.items():
+            remaining = counts[feature] - 1
+            if remaining:
+                counts[feature] = remaining
+                totals[feature] -= value
+            else:
+                del counts[feature], totals[feature]
+        self.removed += 1
+        if self.removed >= max(64, len(self.entries)):
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        totals: Dict[str, float] = {}
+        for _, features in self.entries:
+            for feature, value in features.items():
+                totals[feature] = totals.get(feature, 0.0) + value
+        self.totals = totals
+        self.removed = 0
+
+
+@dataclass(slots=True)
+class FeatureMatrix:
+    """Chronological, read-only view of buffered windows.
+
+    ``values`` and ``timestamps`` alias the ring buffer: rows are
+    overwritten as new windows arrive, so consume the view before the next
+    ``persist`` or copy it.
+    """
+
+    names: Tuple[str, ...]
+    values: Any  # ndarray, windows x features; NaN where a window lacks a feature
+    timestamps: Any  # ndarray of POSIX seconds, one per row
+
+
+@dataclass(slots=True)
+class FeatureRingBuffer:
+    """Fixed-capacity window history stored as a NumPy array."""
+
+    capacity: int = 512
+    dtype: str = "float64"
+    _names: List[str] = field(init=False, default_factory=list)
+    _index: Dict[str, int] = field(init=False, default_factory=dict)
+    _values: Any = field(init=False, default=None)  # (2 * capacity, columns), mirrored halves
+    _timestamps: Any = field(init=False, default=None)  # (2 * capacity,), mirrored halves
+    _durations: Any = field(init=False, default=None)
+    _labels: List[str] = field(init=False, default_factory=list)
+    _slot_columns: List[Any] = field(init=False, default_factory=list)  # columns set in each slot
+    _totals: Any = field(init=False, default=None)
+    _counts: Any = field(init=False, default=None)
+    _head: int = field(init=False, default=0)
+    _size: int = field(init=False, default=0)
+    _since_rebuild: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        if np is None:
+            raise RuntimeError("FeatureRingBuffer requires NumPy")
+        if self.capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._values = np.full((2 * self.capacity, 16), np.nan, dtype=self.dtype)
+        self._timestamps = np.zeros(2 * self.capacity)
+        self._durations = np.zeros(self.capacity)
+        self._labels = [""] * self.capacity
+        self._slot_columns = [None] * self.capacity
+        self._totals = np.zeros(16)
+        self._counts = np.zeros(16, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _column(self, name: str) -> int:
+        column = self._index.get(name)
+        if column is None:
+            column = len(self._names)
+            if column == self._values.shape[1]:
+                grown = np.full((self._values.shape[0], column * 2), np.nan, dtype=self.dtype)
+                grown[:, :column] = self._values
+                self._values = grown
+                self._totals = np.concatenate([self._totals, np.zeros(column)])
+                self._counts = np.concatenate([self._counts, np.zeros(column, dtype=np.int64)])
+            self._names.append(name)
+            self._index[name] = column
+        return column
+
+    def append(self, created_at: datetime, window: FeatureWindow) -> None:
+        columns = np.array([self._column(name) for name in window.features], dtype=np.intp)
+        row = np.fromiter(window.features.values(), dtype=np.float64, count=len(columns))
+        slot, mirror = self._head, self._head + self.capacity
+        values, totals, counts = self._values, self._totals, self._counts
+        evicted = self._slot_columns[slot]
+        if evicted is not None:
+            totals[evicted] -= values[slot, evicted]
+            counts[evicted] -= 1
+            values[slot, evicted] = values[mirror, evicted] = np.nan
+        values[slot, columns] = values[mirror, columns] = row
+        totals[columns] += row
+        counts[columns] += 1
+        self._slot_columns[slot] = columns
+        self._timestamps[slot] = self._timestamps[mirror] = created_at.timestamp()
+        self._durations[slot] = window.duration.total_seconds()
+        self._labels[slot] = window.label
+        self._head = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.capacity:
+            # Bound float drift from the running subtractions.
+            live = values[: self.capacity]
+            self._totals = np.nansum(live, axis=0, dtype=np.float64)
+            self._since_rebuild = 0
+
+    def view(self, last: int | None = None) -> FeatureMatrix:
+        """The last ``last`` windows (default all), oldest first, without copying."""
+
+        count = self._size if last is None else max(0, min(last, self._size))
+        end = self._head + self.capacity
+        values = self._values[end - count : end, : len(self._names)]
+        timestamps = self._timestamps[end - count : end]
+        values.flags.writeable = False
+        timestamps.flags.writeable = False
+        return FeatureMatrix(names=tuple(self._names), values=values, timestamps=timestamps)
+
+    def snapshot(self) -> Dict[str, float]:
+        width = len(self._names)
+        if self._counts[:width].all():
+            return dict(zip(self._names, self._totals[:width].tolist()))
+        present = np.flatnonzero(self._counts[:width])
+        return self._named(tuple(self._names), present, self._totals[present])
+
+    def _named(self, names: Tuple[str, ...], present, results) -> Dict[str, float]:
+        return dict(zip([names[column] for column in present], results.tolist()))
+
+    def mean(self, last: int | None = None) -> Dict[str, float]:
+        if last is None or last >= self._size:
+            present = np.flatnonzero(self._counts[: len(self._names)])
+            return self._named(tuple(self._names), present, self._totals[present] / self._counts[present])
+        matrix = self.view(last)
+        counts = (~np.isnan(matrix.values)).sum(axis=0)
+        present = np.flatnonzero(counts)
+        sums = np.nansum(matrix.values[:, present], axis=0, dtype=np.float64)
+        return self._named(matrix.names, present, sums / counts[present])
+
+    def maximum(self, last: int | None = None) -> Dict[str, float]:
+        matrix = self.view(last)
+        if not len(matrix.values):
+            return {}
+        peaks = np.fmax.reduce(matrix.values, axis=0)  # fmax skips NaN
+        present = np.flatnonzero(~np.isnan(peaks))
+        return self._named(matrix.names, present, peaks[present])
+
+    def percentile(self, q: float, last: int | None = None) -> Dict[str, float]:
+        """Per-feature ``q``-th percentile, interpolated like ``numpy.percentile``."""
+
+        matrix = self.view(last)
+        ordered = np.sort(matrix.values, axis=0)  # NaN sorts last
+        counts = (~np.isnan(ordered)).sum(axis=0)
+        present = np.flatnonzero(counts)
+        if not len(present):
+            return {}
+        rank = (counts[present] - 1) * (q / 100)
+        lower = np.floor(rank).astype(np.intp)
+        upper = np.minimum(lower + 1, counts[present] - 1)
+        low = ordered[lower, present].astype(np.float64)
+        high = ordered[upper, present].astype(np.float64)
+        return self._named(matrix.names, present, low + (high - low) * (rank - lower))
+
+    def latest(self, limit: int) -> List[FeatureWindow]:
+        matrix = self.view(limit)
+        windows = []
+        for offset, row in enumerate(matrix.values.tolist()):
+            slot = (self._head - len(matrix.values) + offset) % self.capacity
+            windows.append(
+                FeatureWindow(
+                    duration=timedelta(seconds=float(self._durations[slot])),
+                    features={
+                        name: value for name, value in zip(matrix.names, row) if not math.isnan(value)
+                    },
+                    label=self._labels[slot],
+                )
+            )
+        return windows
+
+
+@dataclass(slots=True)
+class FeatureDeque:
+    """Pure-Python window history used when NumPy is unavailable."""
+
+    windows: Deque[FeatureWindow] = field(default_factory=lambda: deque(maxlen=512))
+    _running: RunningTotals = field(init=False, default_factory=RunningTotals)
+
+    def __post_init__(self) -> None:
+        self._running = RunningTotals(limit=self.windows.maxlen)
+        for window in self.windows:
+            self._running.add(datetime.now(UTC), window.features)
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def append(self, created_at: datetime, window: FeatureWindow) -> None:
+        self.windows.append(window)
+        self._running.add(created_at, window.features)
+
+    def view(self, last: int | None = None) -> FeatureMatrix:
+        raise RuntimeError("FeatureMatrix views require NumPy")
+
+    def snapshot(self) -> Dict[str, float]:
+        return dict(self._running.totals)
+
+    def _columns(self, last: int | None) -> Dict[str, List[float]]:
+        windows = list(self.windows)
+        if last is not None:
+            windows = windows[-last:] if last > 0 else []
+        columns: Dict[str, List[float]] = {}
+        for window in windows:
+            for feature, value in window.features.items():
+                columns.setdefault(feature, []).append(float(value))
+        return columns
+
+    def mean(self, last: int | None = None) -> Dict[str, float]:
+        return {feature: math.fsum(values) / len(values) for feature, values in self._columns(last).items()}
+
+    def maximum(self, last: int | None = None) -> Dict[str, float]:
+        return {feature: max(values) for feature, values in self._columns(last).items()}
+
+    def percentile(self, q: float, last: int | None = None) -> Dict[str, float]:
+        results = {}
+        for feature, values in self._columns(last).items():
+            values.sort()
+            # Linear interpolation between closest ranks, as numpy.percentile does.
+            rank = (len(values) - 1) * q / 100
+            lower = math.floor(rank)
+            upper = min(lower + 1, len(values) - 1)
+            results[feature] = values[lower] + (values[upper] - values[lower]) * (rank - lower)
+        return results
+
+    def latest(self, limit: int) -> List[FeatureWindow]:
+        return list(self.windows)[-limit:] if limit > 0 else []
+
+
+def create_history(windows: Deque[FeatureWindow], dtype: str = "float64") -> FeatureRingBuffer | FeatureDeque:
+    """A ring buffer sized like ``windows``, or ``windows`` itself without NumPy."""
+
+    if np is None or windows.maxlen is None:
+        return FeatureDeque(windows=windows)
+    history = FeatureRingBuffer(capacity=windows.maxlen, dtype=dtype)
+    for window in windows:
+        history.append(datetime.now(UTC), window)
+    return history
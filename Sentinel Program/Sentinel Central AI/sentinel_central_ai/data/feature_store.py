@@ -1,21 +1,61 @@
-"""Feature storage primitives."""
+"""Feature storage primitives.
+
+Schema (``PRAGMA user_version = 3``)::
+
+    feature_windows(id, label, window_seconds, created_at)  -- indexed on created_at
+    features(id, name UNIQUE)                       -- feature dictionary
+    feature_values(feature_id, window_id, value)    -- PRIMARY KEY (feature_id, window_id), WITHOUT ROWID
+    feature_rollups(feature_id, resolution, bucket_start, count, total, minimum, maximum)
+                                                    -- PRIMARY KEY (feature_id, resolution, bucket_start), WITHOUT ROWID
+    rollup_watermarks(resolution, rolled_until)     -- rollups are complete up to rolled_until
+
+``feature_values`` is clustered on ``(feature_id, window_id)``, so a rollup
+for one feature is a range scan that never touches other features' rows.
+Databases created with the original text-keyed ``feature_values`` table are
+migrated in place on open.
+
+History is kept in tiers (``StorageConfig.retention_tiers``): by default raw
+windows for an hour, 1-minute buckets for a week and 1-hour buckets for a
+year. Every ``compaction_interval`` the commit path runs
+:meth:`FeatureStore.compact`, which rolls completed buckets up from the next
+finer tier and deletes rows that are past their retention and already rolled
+up. The commit path rolls up at most ``compaction_max_buckets`` buckets per
+tier, so a large backlog (a first compaction, or a long outage) is worked
+off a slice per commit instead of stalling ingest. SQLite reuses the freed
+pages, so the file stops growing once the coarsest tier is full. :meth:`FeatureStore.query` picks the tier for a time
+range and resolution.
+"""
 
 from __future__ import annotations
 
-import json
 import logging
+import math
 import sqlite3
+import threading
+import time
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import Deque, Dict, List
+from typing import Deque, Dict, List, Optional, Tuple
 
+from ..config import RetentionTier, StorageConfig
+from .audit_log import AuditLogWriter
+from .feature_buffer import FeatureDeque, FeatureMatrix, FeatureRingBuffer, RunningTotals, create_history
 from .ingestion_pipeline import FeatureSink, FeatureWindow
 from ..utils.logging_config import configure_logging
 
 logger = configure_logging(context={"component": "feature_store"})
 
+SCHEMA_VERSION = 3
+
+# Seconds since the epoch of an ISO-8601 ``created_at`` column.
+_EPOCH_SQL = "CAST(strftime('%s', fw.created_at) AS INTEGER)"
+
+# A "last hour" query computes its start a moment before the store looks at
+# the clock; let it still be answered from the one-hour tier.
+_RETENTION_SLACK = timedelta(seconds=5)
+
 
 def _sqlite_path(dsn: str) -> str:
     """Resolve an sqlite:/// style DSN into a filesystem path."""
@@ -27,12 +67,34 @@ def _sqlite_path(dsn: str) -> str:
     raise ValueError(f"Unsupported SQLite DSN: {dsn}")
 
 
-def _json_serializer(value):
-    if isinstance(value, datetime):
-        return value.isoformat()
-    if isinstance(value, timedelta):
-        return value.total_seconds()
-    return value
+def _epoch(moment: datetime) -> int:
+    return int(moment.timestamp())
+
+
+def _iso(seconds: int) -> str:
+    """``created_at`` bound for ``seconds``; ISO-8601 UTC strings sort by time."""
+
+    return datetime.fromtimestamp(seconds, UTC).isoformat()
+
+
+@dataclass(slots=True)
+class RollupPoint:
+    """One timeline point; a raw window is a point with ``count == 1``."""
+
+    timestamp: datetime
+    mean: float
+    minimum: float
+    maximum: float
+    count: int
+
+
+@dataclass(slots=True)
+class FeatureSeries:
+    """Timeline for one feature at a single bucket width."""
+
+    feature: str
+    resolution: timedelta  # zero for raw windows
+    points: List[RollupPoint]
 
 
 @dataclass(slots=True)
@@ -43,6 +105,32 @@ class StorageTelemetry:
     dsn: str
     digest_interval: timedelta
     audit_log_path: Path
+    commit_batch: int = 16
+    commit_interval: timedelta = timedelta(seconds=5)
+    max_pending: int = 10_000
+    retention_tiers: List[RetentionTier] = field(default_factory=lambda: StorageConfig().retention_tiers)
+    compaction_interval: timedelta = timedelta(minutes=1)
+    compaction_max_buckets: int = 60
+    audit_flush_interval: timedelta = timedelta(seconds=1)
+    audit_flush_bytes: int = 64 * 1024
+    audit_max_backlog: int = 10_000
+    audit_segment_bytes: int = 64 * 1024 * 1024
+    audit_compress: bool = True
+    audit_hash_chain: bool = True
+    history_dtype: str = "float64"
+
+    def __post_init__(self) -> None:
+        self.retention_tiers = sorted(self.retention_tiers, key=lambda tier: tier.resolution)
+        if not self.retention_tiers or self.retention_tiers[0].resolution:
+            raise ValueError("retention_tiers must include a raw tier with a zero resolution")
+        previous = 0
+        for tier in self.retention_tiers[1:]:
+            seconds = tier.resolution.total_seconds()
+            if seconds <= previous or seconds != int(seconds) or (previous and seconds % previous):
+                raise ValueError(
+                    f"Rollup resolution {tier.resolution} must be whole seconds and a multiple of the finer tier"
+                )
+            previous = int(seconds)
 
 
 @dataclass(slots=True)
@@ -50,12 +138,27 @@ class FeatureStore(FeatureSink):
     """SQLite-backed feature store with append-only audit trail."""
 
     storage: StorageTelemetry
+    # Sizes the in-memory history; it holds the windows only without NumPy.
     windows: Deque[FeatureWindow] = field(default_factory=lambda: deque(maxlen=512))
+    snapshot_windows: List[timedelta] = field(default_factory=list)
     _connection: sqlite3.Connection | None = field(init=False, default=None)
     _db_path: str = field(init=False, default="")
+    _feature_ids: Dict[str, int] = field(init=False, default_factory=dict)
+    _pending: List[Tuple[FeatureWindow, datetime]] = field(init=False, default_factory=list)
+    _last_commit: float = field(init=False, default=0.0)
+    _commit_stats: Dict[str, int] = field(
+        init=False, default_factory=lambda: {"committed": 0, "failed_commits": 0, "dropped": 0}
+    )
+    _last_compaction: float = field(init=False, default=0.0)
+    _resolutions: List[int] = field(init=False, default_factory=list)
+    _watermarks: Dict[int, int] = field(init=False, default_factory=dict)
+    _audit: AuditLogWriter | None = field(init=False, default=None)
+    _history: FeatureRingBuffer | FeatureDeque | None = field(init=False, default=None)
+    _windowed: Dict[timedelta, RunningTotals] = field(init=False, default_factory=dict)
+    _lock: threading.RLock = field(init=False, default_factory=threading.RLock)
 
     @classmethod
-    def from_config(cls, config) -> "FeatureStore":
+    def from_config(cls, config, snapshot_windows: List[timedelta] | None = None) -> "FeatureStore":
         logger.debug(
             "Provisioning FeatureStore",
             extra={
@@ -64,6 +167,8 @@ class FeatureStore(FeatureSink):
                     "dsn": config.dsn,
                     "digest_interval": config.digest_interval.total_seconds(),
                     "audit_log_path": getattr(config, "audit_log_path", "n/a"),
+                    "commit_batch": getattr(config, "commit_batch", 16),
+                    "retention_tiers": len(getattr(config, "retention_tiers", ())),
                 }
             },
         )
@@ -73,16 +178,40 @@ class FeatureStore(FeatureSink):
                 dsn=config.dsn,
                 digest_interval=config.digest_interval,
                 audit_log_path=Path(getattr(config, "audit_log_path", "audit.log")),
-            )
+                commit_batch=getattr(config, "commit_batch", 16),
+                commit_interval=getattr(config, "commit_interval", timedelta(seconds=5)),
+                max_pending=getattr(config, "max_pending", 10_000),
+                retention_tiers=list(getattr(config, "retention_tiers", StorageConfig().retention_tiers)),
+                compaction_interval=getattr(config, "compaction_interval", timedelta(minutes=1)),
+                compaction_max_buckets=getattr(config, "compaction_max_buckets", 60),
+                audit_flush_interval=getattr(config, "audit_flush_interval", timedelta(seconds=1)),
+                audit_flush_bytes=getattr(config, "audit_flush_bytes", 64 * 1024),
+                audit_max_backlog=getattr(config, "audit_max_backlog", 10_000),
+                audit_segment_bytes=getattr(config, "audit_segment_bytes", 64 * 1024 * 1024),
+                audit_compress=getattr(config, "audit_compress", True),
+                audit_hash_chain=getattr(config, "audit_hash_chain", True),
+                history_dtype=getattr(config, "history_dtype", "float64"),
+            ),
+            snapshot_windows=list(snapshot_windows or []),
         )
 
     def __post_init__(self) -> None:
         if self.storage.engine != "sqlite":  # pragma: no cover - other engines unsupported yet
             raise ValueError(f"Unsupported storage engine: {self.storage.engine}")
+        self._history = create_history(self.windows, self.storage.history_dtype)
+        self._windowed = {span: RunningTotals(span=span) for span in self.snapshot_windows}
         self._db_path = _sqlite_path(self.storage.dsn)
         if self._db_path != ":memory:":
             Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
-        self.storage.audit_log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._audit = AuditLogWriter(
+            path=self.storage.audit_log_path,
+            flush_interval=self.storage.audit_flush_interval,
+            flush_bytes=self.storage.audit_flush_bytes,
+            max_backlog=self.storage.audit_max_backlog,
+            segment_bytes=self.storage.audit_segment_bytes,
+            compress=self.storage.audit_compress,
+            hash_chain=self.storage.audit_hash_chain,
+        )
         self._connection = sqlite3.connect(
             self._db_path,
             detect_types=sqlite3.PARSE_DECLTYPES,
@@ -90,7 +219,9 @@ class FeatureStore(FeatureSink):
         )
         self._connection.execute("PRAGMA journal_mode=WAL;")
         self._connection.execute("PRAGMA synchronous=NORMAL;")
+        self._resolutions = [int(tier.resolution.total_seconds()) for tier in self.storage.retention_tiers]
         self._create_schema()
+        self._last_commit = self._last_compaction = time.monotonic()
         logger.info(
             "FeatureStore online",
             extra={
@@ -104,6 +235,8 @@ class FeatureStore(FeatureSink):
 
     def _create_schema(self) -> None:
         assert self._connection is not None
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        legacy = version < SCHEMA_VERSION and self._has_legacy_values()
         with self._connection:  # pragma: no branch - schema setup
             self._connection.execute(
                 """
@@ -115,19 +248,109 @@ class FeatureStore(FeatureSink):
                 )
                 """
             )
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS features (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                )
+                """
+            )
+            if legacy:
+                self._connection.execute("ALTER TABLE feature_values RENAME TO feature_values_v1")
             self._connection.execute(
                 """
                 CREATE TABLE IF NOT EXISTS feature_values (
-                    window_id INTEGER NOT NULL,
-                    feature TEXT NOT NULL,
+                    feature_id INTEGER NOT NULL REFERENCES features(id),
+                    window_id INTEGER NOT NULL REFERENCES feature_windows(id),
                     value REAL NOT NULL,
-                    FOREIGN KEY(window_id) REFERENCES feature_windows(id)
+                    PRIMARY KEY (feature_id, window_id)
+                ) WITHOUT ROWID
+                """
+            )
+            if legacy:
+                self._migrate_v1()
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS feature_windows_created_at ON feature_windows(created_at)"
+            )
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS feature_rollups (
+                    feature_id INTEGER NOT NULL REFERENCES features(id),
+                    resolution INTEGER NOT NULL,
+                    bucket_start INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    minimum REAL NOT NULL,
+                    maximum REAL NOT NULL,
+                    PRIMARY KEY (feature_id, resolution, bucket_start)
+                ) WITHOUT ROWID
+                """
+            )
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rollup_watermarks (
+                    resolution INTEGER PRIMARY KEY,
+                    rolled_until INTEGER NOT NULL
                 )
                 """
             )
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._feature_ids = {
+            name: feature_id for feature_id, name in self._connection.execute("SELECT id, name FROM features")
+        }
+        self._watermarks = dict(self._connection.execute("SELECT resolution, rolled_until FROM rollup_watermarks"))
+
+    def _has_legacy_values(self) -> bool:
+        assert self._connection is not None
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(feature_values)")}
+        return "feature" in columns
+
+    def _migrate_v1(self) -> None:
+        """Move rows from the text-keyed v1 table into the dictionary schema."""
 
-    def persist(self, window: FeatureWindow) -> None:  # noqa: D401
         assert self._connection is not None
+        started = time.perf_counter()
+        self._connection.execute(
+            "INSERT OR IGNORE INTO features(name) SELECT DISTINCT feature FROM feature_values_v1"
+        )
+        cursor = self._connection.execute(
+            """
+            INSERT OR REPLACE INTO feature_values(feature_id, window_id, value)
+            SELECT f.id, v.window_id, v.value
+            FROM feature_values_v1 AS v
+            JOIN features AS f ON f.name = v.feature
+            ORDER BY f.id, v.window_id
+            """
+        )
+        self._connection.execute("DROP TABLE feature_values_v1")
+        logger.info(
+            "Migrated feature_values to schema v3",
+            extra={
+                "sentinel_context": {
+                    "rows": cursor.rowcount,
+                    "seconds": round(time.perf_counter() - started, 3),
+                }
+            },
+        )
+
+    def _feature_id(self, name: str) -> int:
+        feature_id = self._feature_ids.get(name)
+        if feature_id is None:
+            assert self._connection is not None
+            self._connection.execute("INSERT OR IGNORE INTO features(name) VALUES (?)", (name,))
+            feature_id = self._connection.execute("SELECT id FROM features WHERE name = ?", (name,)).fetchone()[0]
+            self._feature_ids[name] = feature_id
+        return feature_id
+
+    def persist(self, window: FeatureWindow) -> None:  # noqa: D401
+        """Queue a window for the next group commit.
+
+        Windows are written ``commit_batch`` at a time, or once
+        ``commit_interval`` has passed since the last commit, in a single
+        transaction. They are visible to :meth:`snapshot` immediately.
+        """
+
         created_at = datetime.now(UTC)
         logger.debug(
             "Persisting feature window",
@@ -139,77 +362,546 @@ class FeatureStore(FeatureSink):
                 }
             },
         )
-        with self._connection:
-            cursor = self._connection.execute(
-                "INSERT INTO feature_windows(label, window_seconds, created_at) VALUES (?, ?, ?)",
-                (window.label, window.duration.total_seconds(), created_at.isoformat()),
+        with self._lock:
+            self._pending.append((window, created_at))
+            self._history.append(created_at, window)
+            for totals in self._windowed.values():
+                totals.add(created_at, window.features)
+                totals.expire(created_at)
+            due = time.monotonic() - self._last_commit >= self.storage.commit_interval.total_seconds()
+            if len(self._pending) >= self.storage.commit_batch or due:
+                self.flush()
+
+    def flush(self) -> int:
+        """Commit all queued windows in one transaction; returns how many."""
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_commit = time.monotonic()
+            if not pending:
+                return 0
+            assert self._connection is not None
+            started = time.perf_counter()
+            written: List[Tuple[int, FeatureWindow, datetime]] = []
+            known = len(self._feature_ids)
+            try:
+                with self._connection:
+                    rows = []
+                    for window, created_at in pending:
+                        cursor = self._connection.execute(
+                            "INSERT INTO feature_windows(label, window_seconds, created_at) VALUES (?, ?, ?)",
+                            (window.label, window.duration.total_seconds(), created_at.isoformat()),
+                        )
+                        window_id = cursor.lastrowid
+                        rows.extend(
+                            (self._feature_id(feature), window_id, float(value))
+                            for feature, value in window.features.items()
+                        )
+                        written.append((window_id, window, created_at))
+                    self._connection.executemany(
+                        "INSERT INTO feature_values(feature_id, window_id, value) VALUES (?, ?, ?)",
+                        rows,
+                    )
+            except sqlite3.Error:
+                # The transaction was rolled back: requeue the windows for the
+                # next commit and forget feature ids that were never stored.
+                self._requeue(pending)
+                for name in list(self._feature_ids)[known:]:
+                    del self._feature_ids[name]
+                raise
+            self._commit_stats["committed"] += len(written)
+            self._append_audit_records(written)
+            logger.debug(
+                "Committed feature windows",
+                extra={
+                    "sentinel_context": {
+                        "windows": len(written),
+                        "values": len(rows),
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    }
+                },
             )
-            window_id = cursor.lastrowid
-            self._connection.executemany(
-                "INSERT INTO feature_values(window_id, feature, value) VALUES (?, ?, ?)",
-                [(window_id, feature, float(value)) for feature, value in window.features.items()],
+            if time.monotonic() - self._last_compaction >= self.storage.compaction_interval.total_seconds():
+                self.compact(max_buckets=self.storage.compaction_max_buckets)
+            return len(written)
+
+    def _requeue(self, pending: List[Tuple[FeatureWindow, datetime]]) -> None:
+        """Put failed windows back, dropping the oldest beyond ``max_pending``.
+
+        A database that stays locked, full or read-only must not grow the
+        queue without bound; the windows are still in the in-memory history.
+        """
+
+        self._commit_stats["failed_commits"] += 1
+        self._pending = pending + self._pending
+        overflow = len(self._pending) - self.storage.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            if not self._commit_stats["dropped"]:
+                logger.warning(
+                    "Feature commit backlog full; dropping oldest windows",
+                    extra={"sentinel_context": {"max_pending": self.storage.max_pending}},
+                )
+            self._commit_stats["dropped"] += overflow
+
+    def commit_stats(self) -> Dict[str, int]:
+        """Committed, failed-commit and dropped counters plus the pending queue."""
+
+        with self._lock:
+            return dict(self._commit_stats, pending=len(self._pending), max_pending=self.storage.max_pending)
+
+    # ------------------------------------------------------------------
+    # Tiered retention
+    # ------------------------------------------------------------------
+    def compact(self, now: datetime | None = None, max_buckets: int | None = None) -> Dict[str, int]:
+        """Roll completed buckets up each tier, then apply retention.
+
+        A tier is rolled up to the last bucket boundary its source tier is
+        complete for, and its progress is kept in ``rollup_watermarks`` so
+        every bucket is aggregated exactly once. Rows past their tier's
+        retention are only deleted once the next tier has rolled them up.
+        With ``max_buckets`` a tier advances at most that many of its own
+        buckets; ``stats["behind"]`` is then 1 and the next commit compacts
+        again instead of waiting for ``compaction_interval``.
+        """
+
+        now_seconds = _epoch(now or datetime.now(UTC))
+        stats = {"buckets": 0, "windows_deleted": 0, "buckets_deleted": 0, "behind": 0}
+        with self._lock:
+            self._last_compaction = time.monotonic()
+            self.flush()
+            assert self._connection is not None
+            started = time.perf_counter()
+            watermarks = dict(self._watermarks)
+            resolutions = self._resolutions
+            with self._connection:
+                for index in range(1, len(resolutions)):
+                    resolution, source = resolutions[index], resolutions[index - 1]
+                    limit = now_seconds // resolution * resolution
+                    if source:
+                        # A rollup tier is only complete up to its own watermark.
+                        limit = min(limit, watermarks.get(source, 0) // resolution * resolution)
+                    mark = watermarks.get(resolution)
+                    if mark is None:
+                        earliest = self._earliest(source)
+                        mark = limit if earliest is None else earliest // resolution * resolution
+                    if max_buckets is not None and limit > mark + max_buckets * resolution:
+                        limit = mark + max_buckets * resolution
+                        stats["behind"] = 1
+                    if limit > mark:
+                        stats["buckets"] += self._roll_up(source, resolution, mark, limit)
+                        mark = limit
+                    watermarks[resolution] = mark
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO rollup_watermarks(resolution, rolled_until) VALUES (?, ?)",
+                        (resolution, mark),
+                    )
+                for index, tier in enumerate(self.storage.retention_tiers):
+                    cutoff = now_seconds - int(tier.retention.total_seconds())
+                    if index + 1 < len(resolutions):
+                        cutoff = min(cutoff, watermarks[resolutions[index + 1]])
+                    if index == 0:
+                        stats["windows_deleted"] += self._expire_windows(cutoff)
+                    else:
+                        stats["buckets_deleted"] += self._expire_buckets(resolutions[index], cutoff)
+            self._watermarks = watermarks
+            if stats["behind"]:
+                self._last_compaction = 0.0
+        deleted = stats["windows_deleted"] + stats["buckets_deleted"]
+        (logger.info if deleted else logger.debug)(
+            "Compacted feature history",
+            extra={
+                "sentinel_context": {
+                    **stats,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                }
+            },
+        )
+        return stats
+
+    def _earliest(self, resolution: int) -> Optional[int]:
+        """Oldest timestamp held by a tier, or ``None`` when it is empty."""
+
+        assert self._connection is not None
+        if not resolution:
+            (oldest,) = self._connection.execute("SELECT MIN(created_at) FROM feature_windows").fetchone()
+            return None if oldest is None else _epoch(datetime.fromisoformat(oldest))
+        (oldest,) = self._connection.execute(
+            """
+            SELECT MIN((SELECT MIN(bucket_start) FROM feature_rollups
+                        WHERE feature_id = f.id AND resolution = ?))
+            FROM features AS f
+            """,
+            (resolution,),
+        ).fetchone()
+        return oldest
+
+    def _window_span(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """First and last window id created in ``[start, end)``."""
+
+        assert self._connection is not None
+        first, last = self._connection.execute(
+            "SELECT MIN(id), MAX(id) FROM feature_windows WHERE created_at >= ? AND created_at < ?",
+            (_iso(start), _iso(end)),
+        ).fetchone()
+        return None if first is None else (first, last)
+
+    def _roll_up(self, source: int, resolution: int, start: int, end: int) -> int:
+        """Aggregate tier ``source`` into ``resolution`` buckets over ``[start, end)``."""
+
+        assert self._connection is not None
+        if not source:
+            span = self._window_span(start, end)
+            if span is None:
+                return 0
+            cursor = self._connection.execute(
+                f"""
+                INSERT OR REPLACE INTO feature_rollups
+                    (feature_id, resolution, bucket_start, count, total, minimum, maximum)
+                SELECT fv.feature_id, :resolution, {_EPOCH_SQL} / :resolution * :resolution AS bucket,
+                       COUNT(*), SUM(fv.value), MIN(fv.value), MAX(fv.value)
+                FROM features AS f
+                JOIN feature_values AS fv ON fv.feature_id = f.id AND fv.window_id BETWEEN :first AND :last
+                JOIN feature_windows AS fw ON fw.id = fv.window_id
+                WHERE fw.created_at >= :start AND fw.created_at < :end
+                GROUP BY fv.feature_id, bucket
+                """,
+                {
+                    "resolution": resolution,
+                    "first": span[0],
+                    "last": span[1],
+                    "start": _iso(start),
+                    "end": _iso(end),
+                },
             )
-        self.windows.append(window)
-        self._append_audit_record(window_id, window, created_at)
-
-    def _append_audit_record(self, window_id: int, window: FeatureWindow, created_at: datetime) -> None:
-        record = {
-            "id": window_id,
-            "label": window.label,
-            "window_seconds": window.duration.total_seconds(),
-            "features": window.features,
-            "created_at": created_at,
-        }
-        line = json.dumps(record, default=_json_serializer)
-        with self.storage.audit_log_path.open("a", encoding="utf-8") as handle:
-            handle.write(line + "\n")
+            return cursor.rowcount
+        cursor = self._connection.execute(
+            """
+            INSERT OR REPLACE INTO feature_rollups
+                (feature_id, resolution, bucket_start, count, total, minimum, maximum)
+            SELECT r.feature_id, :resolution, r.bucket_start / :resolution * :resolution AS bucket,
+                   SUM(r.count), SUM(r.total), MIN(r.minimum), MAX(r.maximum)
+            FROM features AS f
+            JOIN feature_rollups AS r
+              ON r.feature_id = f.id AND r.resolution = :source
+             AND r.bucket_start >= :start AND r.bucket_start < :end
+            GROUP BY r.feature_id, bucket
+            """,
+            {"resolution": resolution, "source": source, "start": start, "end": end},
+        )
+        return cursor.rowcount
+
+    def _expire_windows(self, cutoff: int) -> int:
+        assert self._connection is not None
+        (last,) = self._connection.execute(
+            "SELECT MAX(id) FROM feature_windows WHERE created_at < ?", (_iso(cutoff),)
+        ).fetchone()
+        if last is None:
+            return 0
+        self._connection.execute(
+            "DELETE FROM feature_values WHERE feature_id IN (SELECT id FROM features) AND window_id <= ?",
+            (last,),
+        )
+        return self._connection.execute("DELETE FROM feature_windows WHERE id <= ?", (last,)).rowcount
+
+    def _expire_buckets(self, resolution: int, cutoff: int) -> int:
+        assert self._connection is not None
+        return self._connection.execute(
+            """
+            DELETE FROM feature_rollups
+            WHERE feature_id IN (SELECT id FROM features) AND resolution = ? AND bucket_start <= ?
+            """,
+            (resolution, cutoff - resolution),
+        ).rowcount
+
+    def close(self) -> None:
+        """Flush queued windows, drain the audit writer, and close the database."""
+
+        with self._lock:
+            self.flush()
+            if self._audit is not None:
+                self._audit.close()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def audit_stats(self) -> Dict[str, int]:
+        """Audit writer counters, including its current and maximum backlog."""
+
+        assert self._audit is not None
+        return self._audit.stats()
+
+    def _append_audit_records(self, written: List[Tuple[int, FeatureWindow, datetime]]) -> None:
+        # Serialisation and file I/O happen on the audit writer's thread.
+        assert self._audit is not None
+        self._audit.submit(
+            {
+                "id": window_id,
+                "label": window.label,
+                "window_seconds": window.duration.total_seconds(),
+                "features": window.features,
+                "created_at": created_at,
+            }
+            for window_id, window, created_at in written
+        )
         logger.debug(
-            "Appended audit record",
-            extra={"sentinel_context": {"window_id": window_id, "bytes": len(line)}},
+            "Queued audit records",
+            extra={"sentinel_context": {"window_ids": [window_id for window_id, _, _ in written]}},
         )
 
     def latest(self, limit: int = 10) -> List[FeatureWindow]:
         """Return the most recent feature windows."""
 
-        items = list(self.windows)[-limit:]
+        with self._lock:
+            items = self._history.latest(limit)
         logger.debug(
             "Retrieved feature windows",
             extra={"sentinel_context": {"requested": limit, "returned": len(items)}},
         )
         return items
 
-    def snapshot(self) -> Dict[str, float]:
-        """Produce a consolidated snapshot for UI queries."""
+    def snapshot(self, window: timedelta | None = None) -> Dict[str, float]:
+        """Per-feature sums for UI queries and inference.
+
+        Without ``window`` the sums cover the in-memory window history;
+        with one of :attr:`snapshot_windows` they cover the windows persisted
+        within that span. The sums are maintained on :meth:`persist`, so
+        this is a copy of one value per feature.
+        """
 
-        snapshot: Dict[str, float] = {}
-        for window in self.windows:
-            for feature, value in window.features.items():
-                snapshot[feature] = snapshot.get(feature, 0.0) + value
+        with self._lock:
+            if window is None:
+                snapshot = self._history.snapshot()
+            else:
+                totals = self._windowed.get(window)
+                if totals is None:
+                    raise ValueError(f"No running snapshot configured for {window}")
+                totals.expire(datetime.now(UTC))
+                snapshot = dict(totals.totals)
         logger.debug(
             "Computed feature snapshot",
-            extra={"sentinel_context": {"feature_count": len(snapshot)}},
+            extra={
+                "sentinel_context": {
+                    "feature_count": len(snapshot),
+                    "window_seconds": window.total_seconds() if window else None,
+                }
+            },
         )
         return snapshot
 
-    def fetch_rollup(self, feature: str) -> List[tuple[datetime, float]]:
-        """Return historical values for a single feature for UI timelines."""
+    def feature_matrix(self, last: int | None = None) -> FeatureMatrix:
+        """Zero-copy view of the last ``last`` windows in memory; needs NumPy."""
 
-        assert self._connection is not None
-        cursor = self._connection.execute(
-            """
-            SELECT fw.created_at, fv.value
-            FROM feature_values AS fv
-            JOIN feature_windows AS fw ON fw.id = fv.window_id
-            WHERE fv.feature = ?
-            ORDER BY fw.id DESC
-            LIMIT 64
-            """,
-            (feature,),
-        )
-        rows = cursor.fetchall()
+        with self._lock:
+            return self._history.view(last)
+
+    def feature_mean(self, last: int | None = None) -> Dict[str, float]:
+        """Per-feature mean over the last ``last`` windows in memory."""
+
+        with self._lock:
+            return self._history.mean(last)
+
+    def feature_max(self, last: int | None = None) -> Dict[str, float]:
+        """Per-feature maximum over the last ``last`` windows in memory."""
+
+        with self._lock:
+            return self._history.maximum(last)
+
+    def feature_percentile(self, q: float, last: int | None = None) -> Dict[str, float]:
+        """Per-feature ``q``-th percentile over the last ``last`` windows in memory."""
+
+        with self._lock:
+            return self._history.percentile(q, last)
+
+    def fetch_rollup(self, feature: str, limit: int = 64) -> List[tuple[datetime, float]]:
+        """Return the most recent raw values of a single feature.
+
+        Only the raw tier is consulted; use :meth:`query` for timelines over
+        a time range.
+        """
+
+        with self._lock:
+            self.flush()
+            assert self._connection is not None
+            feature_id = self._feature_ids.get(feature)
+            rows = []
+            if feature_id is not None:
+                # Range scan on the (feature_id, window_id) primary key, then
+                # ``limit`` rowid lookups for the timestamps.
+                rows = self._connection.execute(
+                    """
+                    SELECT fw.created_at, fv.value
+                    FROM feature_values AS fv
+                    JOIN feature_windows AS fw ON fw.id = fv.window_id
+                    WHERE fv.feature_id = ?
+                    ORDER BY fv.window_id DESC
+                    LIMIT ?
+                    """,
+                    (feature_id, limit),
+                ).fetchall()
         result = [(datetime.fromisoformat(ts), float(value)) for ts, value in rows]
         logger.debug(
             "Fetched rollup history",
             extra={"sentinel_context": {"feature": feature, "points": len(result)}},
         )
         return result
+
+    def query(
+        self,
+        feature: str,
+        start: datetime,
+        end: datetime | None = None,
+        resolution: timedelta | None = None,
+        max_points: int = 720,
+    ) -> FeatureSeries:
+        """Return a feature's timeline over ``[start, end)`` for dashboards.
+
+        The bucket width is at least ``resolution`` and wide enough to fit
+        the range in ``max_points``. The coarsest tier no wider than that and
+        still retaining ``start`` answers the query, rounded up to a multiple
+        of its resolution; the part of the range it has not rolled up yet is
+        filled in from the finer tiers.
+        """
+
+        now = datetime.now(UTC)
+        end = (end or now).astimezone(UTC)
+        start = start.astimezone(UTC)
+        # Rounded so a range a few microseconds over an even split keeps its bucket.
+        wanted = round(
+            max(
+                (resolution or timedelta(0)).total_seconds(),
+                (end - start).total_seconds() / max(1, max_points),
+            ),
+            3,
+        )
+        tiers = self.storage.retention_tiers
+        covering = [
+            index for index, tier in enumerate(tiers) if now - tier.retention <= start + _RETENTION_SLACK
+        ] or [len(tiers) - 1]
+        fitting = [index for index in covering if self._resolutions[index] <= wanted]
+        index = fitting[-1] if fitting else covering[0]
+        tier_seconds = self._resolutions[index]
+        if tier_seconds:
+            bucket = max(1, math.ceil(wanted / tier_seconds)) * tier_seconds
+        else:
+            bucket = math.ceil(wanted) if wanted >= 1 else 0  # below a second, return the windows
+        points: List[RollupPoint] = []
+        with self._lock:
+            self.flush()
+            feature_id = self._feature_ids.get(feature)
+            if feature_id is not None:
+                if bucket:
+                    merged: Dict[int, List[float]] = {}
+                    # Whole seconds, rounded outwards so the current second is included.
+                    for key, count, total, minimum, maximum in self._buckets(
+                        index, feature_id, _epoch(start), math.ceil(end.timestamp()), bucket
+                    ):
+                        current = merged.get(key)
+                        if current is None:
+                            merged[key] = [count, total, minimum, maximum]
+                        else:
+                            current[0] += count
+                            current[1] += total
+                            current[2] = min(current[2], minimum)
+                            current[3] = max(current[3], maximum)
+                    points = [
+                        RollupPoint(
+                            timestamp=datetime.fromtimestamp(key, UTC),
+                            mean=total / count,
+                            minimum=minimum,
+                            maximum=maximum,
+                            count=int(count),
+                        )
+                        for key, (count, total, minimum, maximum) in sorted(merged.items())
+                    ]
+                else:
+                    points = [
+                        RollupPoint(datetime.fromisoformat(created_at), value, value, value, 1)
+                        for created_at, value in self._raw_values(feature_id, start, end)
+                    ]
+        series = FeatureSeries(feature=feature, resolution=timedelta(seconds=bucket), points=points)
+        logger.debug(
+            "Queried feature timeline",
+            extra={
+                "sentinel_context": {
+                    "feature": feature,
+                    "tier_seconds": tier_seconds,
+                    "bucket_seconds": bucket,
+                    "points": len(points),
+                }
+            },
+        )
+        return series
+
+    def _raw_values(self, feature_id: int, start: datetime, end: datetime) -> List[Tuple[str, float]]:
+        assert self._connection is not None
+        span = self._window_span(_epoch(start), _epoch(end) + 1)
+        if span is None:
+            return []
+        return self._connection.execute(
+            """
+            SELECT fw.created_at, fv.value
+            FROM feature_values AS fv
+            JOIN feature_windows AS fw ON fw.id = fv.window_id
+            WHERE fv.feature_id = ? AND fv.window_id BETWEEN ? AND ?
+              AND fw.created_at >= ? AND fw.created_at < ?
+            ORDER BY fv.window_id
+            """,
+            (feature_id, span[0], span[1], start.isoformat(), end.isoformat()),
+        ).fetchall()
+
+    def _buckets(self, index: int, feature_id: int, start: int, end: int, bucket: int) -> List[tuple]:
+        """``(bucket_start, count, total, minimum, maximum)`` rows of tier ``index``.
+
+        Rows come from the tier up to its watermark and from the next finer
+        tier after it, so the newest buckets are never missing.
+        """
+
+        assert self._connection is not None
+        resolution = self._resolutions[index]
+        if not resolution:
+            span = self._window_span(start, end)
+            if span is None:
+                return []
+            return self._connection.execute(
+                f"""
+                SELECT {_EPOCH_SQL} / :bucket * :bucket AS bucket,
+                       COUNT(*), SUM(fv.value), MIN(fv.value), MAX(fv.value)
+                FROM feature_values AS fv
+                JOIN feature_windows AS fw ON fw.id = fv.window_id
+                WHERE fv.feature_id = :feature_id AND fv.window_id BETWEEN :first AND :last
+                  AND fw.created_at >= :start AND fw.created_at < :end
+                GROUP BY bucket
+                """,
+                {
+                    "bucket": bucket,
+                    "feature_id": feature_id,
+                    "first": span[0],
+                    "last": span[1],
+                    "start": _iso(start),
+                    "end": _iso(end),
+                },
+            ).fetchall()
+        mark = self._watermarks.get(resolution, start)
+        rows: List[tuple] = []
+        if min(end, mark) > start:
+            rows = self._connection.execute(
+                """
+                SELECT bucket_start / :bucket * :bucket AS bucket,
+                       SUM(count), SUM(total), MIN(minimum), MAX(maximum)
+                FROM feature_rollups
+                WHERE feature_id = :feature_id AND resolution = :resolution
+                  AND bucket_start >= :start AND bucket_start < :end
+                GROUP BY bucket
+                """,
+                {
+                    "bucket": bucket,
+                    "feature_id": feature_id,
+                    "resolution": resolution,
+                    "start": start,
+                    "end": min(end, mark),
+                },
+            ).fetchall()
+        if end > max(start, mark):
+            rows.extend(self._buckets(index - 1, feature_id, max(start, mark), end, bucket))
+        return rows
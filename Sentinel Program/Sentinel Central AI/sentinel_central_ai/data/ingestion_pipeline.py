@@ -2,19 +2,31 @@
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
+import itertools
 import json
-import queue
+from pathlib import Path
+import random
 import socket
-from typing import Any, Dict, Iterable, Iterator, List, MutableMapping
+import struct
+import threading
+import time
+from typing import Any, BinaryIO, Deque, Dict, Iterable, Iterator, List, MutableMapping, Tuple
 
 try:  # pragma: no cover - optional dependency
     import redis
 except Exception:  # pragma: no cover - runtime only
     redis = None
 
+try:  # pragma: no cover - optional dependency
+    import msgpack
+except Exception:  # pragma: no cover - runtime only
+    msgpack = None
+
 from ..utils.logging_config import configure_logging
+from .collectors import CollectorPool
 
 logger = configure_logging(context={"component": "telemetry_ingestion"})
 
@@ -38,18 +50,226 @@ def _json_serializer(value: Any) -> Any:
     return value
 
 
+ENCODINGS = ("json", "msgpack")
+TRANSPORTS = ("list", "stream")
+
+
+def decode_message(serialized: str | bytes) -> Dict[str, Any]:
+    """Decode an event bus message written as JSON or MessagePack.
+
+    JSON messages are objects, so their first byte is ``{``; a MessagePack
+    map never starts with that byte.
+    """
+
+    if isinstance(serialized, str):
+        return json.loads(serialized)
+    if serialized[:1] == b"{":
+        return json.loads(serialized)
+    if msgpack is None:
+        raise RuntimeError("msgpack is required to decode this message")
+    return msgpack.unpackb(serialized)
+
+
+_SPILL_RECORD = struct.Struct(">dI")  # enqueued_at (POSIX seconds), payload length
+
+Backlogged = Tuple[float, str | bytes]  # enqueued_at, encoded message
+
+
+@dataclass(slots=True)
+class BacklogSpill:
+    """Append-only overflow file holding the oldest undelivered messages.
+
+    Records are ``enqueued_at`` and a length prefix followed by the encoded
+    message. Replay reads from ``_offset`` and the file is truncated once it
+    has been consumed. A file left by a previous run is replayed first; a
+    torn final record from a crash is cut off.
+    """
+
+    path: Path
+    max_bytes: int = 64 * 1024 * 1024
+    _count: int = field(init=False, default=0)
+    _offset: int = field(init=False, default=0)  # start of the oldest unsent record
+    _size: int = field(init=False, default=0)
+    _oldest: float | None = field(init=False, default=None)
+    _generation: int = field(init=False, default=0)  # bumped on truncation
+
+    def __post_init__(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            return
+        with self.path.open("rb") as handle:
+            records, end = self._read(handle, None)
+        if end < self.path.stat().st_size:
+            with self.path.open("r+b") as handle:
+                handle.truncate(end)
+        self._count, self._size = len(records), end
+        self._oldest = records[0][0] if records else None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def oldest(self) -> float | None:
+        return self._oldest
+
+    def append(self, entries: List[Backlogged]) -> int:
+        """Write entries in order until ``max_bytes``; return how many fit."""
+
+        chunks = []
+        size = self._size
+        for enqueued_at, payload in entries:
+            data = payload.encode("utf-8") if isinstance(payload, str) else payload
+            if size + _SPILL_RECORD.size + len(data) > self.max_bytes:
+                break
+            chunks.append(_SPILL_RECORD.pack(enqueued_at, len(data)) + data)
+            size += _SPILL_RECORD.size + len(data)
+        if chunks:
+            with self.path.open("ab") as handle:
+                handle.write(b"".join(chunks))
+            if not self._count:
+                self._oldest = entries[0][0]
+            self._count += len(chunks)
+            self._size = size
+        return len(chunks)
+
+    def peek(self, limit: int | None) -> Tuple[List[Backlogged], Tuple[int, int]]:
+        """The oldest ``limit`` records and a position to :meth:`consume` them."""
+
+        if not self._count:
+            return [], (self._generation, self._offset)
+        with self.path.open("rb") as handle:
+            handle.seek(self._offset)
+            records, end = self._read(handle, limit)
+        return records, (self._generation, self._offset + end)
+
+    def consume(self, count: int, position: Tuple[int, int]) -> None:
+        generation, offset = position
+        if generation != self._generation or offset <= self._offset:
+            return  # truncated or already consumed meanwhile
+        self._count -= count
+        self._offset = offset
+        if self._count <= 0:
+            self.truncate()
+            return
+        with self.path.open("rb") as handle:
+            handle.seek(offset)
+            header = handle.read(_SPILL_RECORD.size)
+        self._oldest = _SPILL_RECORD.unpack(header)[0]
+
+    def truncate(self) -> None:
+        with self.path.open("wb"):
+            pass
+        self._count = self._offset = self._size = 0
+        self._oldest = None
+        self._generation += 1
+
+    @staticmethod
+    def _read(handle: BinaryIO, limit: int | None) -> Tuple[List[Backlogged], int]:
+        records: List[Backlogged] = []
+        consumed = 0
+        while limit is None or len(records) < limit:
+            header = handle.read(_SPILL_RECORD.size)
+            if len(header) < _SPILL_RECORD.size:
+                break
+            enqueued_at, length = _SPILL_RECORD.unpack(header)
+            data = handle.read(length)
+            if len(data) < length:
+                break
+            records.append((enqueued_at, data))
+            consumed += _SPILL_RECORD.size + length
+        return records, consumed
+
+
 @dataclass(slots=True)
 class EventBus:
-    """Redis-backed transport with local queue fallback."""
+    """Redis-backed transport with a bounded local backlog.
+
+    :meth:`publish` encodes a message and buffers it; :meth:`flush` sends the
+    buffer in one pipelined round trip (a ``PUBLISH`` per message, a single
+    variadic ``RPUSH`` and, when ``list_max_len`` is set, an ``LTRIM`` that
+    keeps only the newest entries). With ``transport="stream"`` the
+    ``RPUSH`` is replaced by an ``XADD`` per message to ``stream_key``, trimmed
+    to roughly ``list_max_len`` entries, for consumer groups to read (see
+    :mod:`.telemetry_consumer`). ``TelemetryIngestor.collect`` flushes
+    once per cycle; the buffer also flushes itself at ``batch_size``.
+    Messages are JSON, or MessagePack with ``encoding="msgpack"`` when the
+    ``msgpack`` package is installed; :func:`decode_message` reads either.
+
+    While Redis is unreachable, flushed messages join a backlog of at most
+    ``max_backlog`` messages. Beyond that the oldest are moved to a
+    :class:`BacklogSpill` at ``spill_path`` when one is configured, and
+    dropped otherwise (or once the spill is full). A daemon thread
+    reconnects with jittered exponential backoff between
+    ``reconnect_backoff`` and ``reconnect_backoff_max`` and replays the
+    backlog oldest first, spill before memory, in ``batch_size`` pipelines;
+    new messages queue behind it until it is empty, so the list key stays in
+    collection order. Replay is at-least-once: a batch interrupted by a
+    failure is sent again.
+    """
 
     redis_url: str
     channel: str
     list_key: str
-    local_queue: "queue.SimpleQueue[str]" = field(default_factory=queue.SimpleQueue)
+    encoding: str = "json"
+    transport: str = "list"
+    stream_key: str = "sentinel.telemetry.stream"
+    list_max_len: int | None = None
+    batch_size: int = 256
+    max_backlog: int = 10_000
+    spill_path: Path | None = None
+    spill_max_bytes: int = 64 * 1024 * 1024
+    reconnect_backoff: timedelta = timedelta(milliseconds=500)
+    reconnect_backoff_max: timedelta = timedelta(seconds=30)
     _client: Any = field(init=False, default=None)
+    _pending: List[str | bytes] = field(init=False, default_factory=list)
+    _backlog: Deque[Backlogged] = field(init=False, default_factory=deque)
+    _backlog_head: int = field(init=False, default=0)  # sequence number of _backlog[0]
+    _spill: BacklogSpill | None = field(init=False, default=None)
+    _condition: threading.Condition = field(init=False, default_factory=threading.Condition)
+    _thread: threading.Thread | None = field(init=False, default=None)
+    _closing: bool = field(init=False, default=False)
+    _flushes: int = field(init=False, default=0)
+    _published: int = field(init=False, default=0)
+    _queued: int = field(init=False, default=0)
+    _last_batch: int = field(init=False, default=0)
+    _last_flush: float = field(init=False, default=0.0)
+    _flush_seconds: float = field(init=False, default=0.0)
+    _max_flush: float = field(init=False, default=0.0)
+    _dropped: int = field(init=False, default=0)
+    _spilled: int = field(init=False, default=0)
+    _replayed: int = field(init=False, default=0)
+    _reconnects: int = field(init=False, default=0)
+    _failures: int = field(init=False, default=0)
 
     def __post_init__(self) -> None:
+        if self.encoding not in ENCODINGS:
+            raise ValueError(f"Unknown event bus encoding: {self.encoding}")
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"Unknown event bus transport: {self.transport}")
+        if self.encoding == "msgpack" and msgpack is None:
+            logger.warning(
+                "msgpack dependency unavailable; encoding telemetry as JSON",
+                extra={"sentinel_context": {"channel": self.channel}},
+            )
+            self.encoding = "json"
+        if self.list_max_len is not None and self.list_max_len < 1:
+            raise ValueError("list_max_len must be at least 1")
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if self.max_backlog < 1:
+            raise ValueError("max_backlog must be at least 1")
+        if self.spill_path is not None:
+            self.spill_path = Path(self.spill_path)
+            self._spill = BacklogSpill(path=self.spill_path, max_bytes=self.spill_max_bytes)
+            if len(self._spill):
+                logger.info(
+                    "Found spilled telemetry backlog; replaying once Redis is reachable",
+                    extra={"sentinel_context": {"path": str(self.spill_path), "messages": len(self._spill)}},
+                )
         self._connect()
+        if redis is not None:
+            self._thread = threading.Thread(target=self._run, name="sentinel-eventbus", daemon=True)
+            self._thread.start()
 
     def _connect(self) -> None:
         if redis is None:
@@ -60,8 +280,7 @@ class EventBus:
             self._client = None
             return
         try:
-            self._client = redis.Redis.from_url(self.redis_url, socket_timeout=1, socket_connect_timeout=1)
-            self._client.ping()
+            self._client = self._open()
             logger.info(
                 "Connected to Redis event bus",
                 extra={
@@ -69,58 +288,262 @@ class EventBus:
                         "url": self.redis_url,
                         "channel": self.channel,
                         "list_key": self.list_key,
+                        "transport": self.transport,
+                        "encoding": self.encoding,
                     }
                 },
             )
         except Exception as exc:  # pragma: no cover - network failures
             logger.error(
-                "Failed to connect to Redis; falling back to local queue",
+                "Failed to connect to Redis; buffering locally until it is reachable",
                 exc_info=exc,
                 extra={"sentinel_context": {"url": self.redis_url, "channel": self.channel}},
             )
             self._client = None
 
+    def _open(self) -> Any:
+        client = redis.Redis.from_url(self.redis_url, socket_timeout=1, socket_connect_timeout=1)
+        client.ping()
+        return client
+
+    def encode(self, message: MutableMapping[str, Any]) -> str | bytes:
+        if self.encoding == "msgpack":
+            return msgpack.packb(message, default=_json_serializer)
+        return json.dumps(message, default=_json_serializer)
+
     def publish(self, message: MutableMapping[str, Any]) -> None:
-        """Publish a telemetry message to Redis with queue fallback."""
-
-        serialized = json.dumps(message, default=_json_serializer)
-        if self._client is not None:
-            try:
-                self._client.publish(self.channel, serialized)
-                self._client.rpush(self.list_key, serialized)
-                logger.debug(
-                    "Published telemetry to Redis",
-                    extra={"sentinel_context": {"channel": self.channel, "size": len(serialized)}},
-                )
-                return
-            except Exception as exc:  # pragma: no cover - runtime only
-                logger.error(
-                    "Redis publish failed; switching to local queue",
-                    exc_info=exc,
-                    extra={"sentinel_context": {"channel": self.channel}},
-                )
-                self._client = None
-        self.local_queue.put(serialized)
-        backlog = 0
-        if hasattr(self.local_queue, "qsize"):
-            try:  # pragma: no cover - platform specific
-                backlog = self.local_queue.qsize()
-            except NotImplementedError:
-                backlog = 0
+        """Buffer a telemetry message for the next :meth:`flush`."""
+
+        self._pending.append(self.encode(message))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """Send buffered messages to Redis in one round trip, or queue them locally.
+
+        Returns the number of messages flushed.
+        """
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        with self._condition:
+            if self._client is not None and not self._backlog and not (self._spill and len(self._spill)):
+                try:
+                    self._send(self._client, batch)
+                except Exception as exc:  # pragma: no cover - runtime only
+                    self._disconnect(exc, len(batch))
+                else:
+                    self._published += len(batch)
+                    self._record_flush(len(batch), time.perf_counter() - started)
+                    logger.debug(
+                        "Published telemetry batch to Redis",
+                        extra={
+                            "sentinel_context": {
+                                "channel": self.channel,
+                                "messages": len(batch),
+                                "size": sum(len(serialized) for serialized in batch),
+                                "flush_ms": round(self._last_flush * 1000, 3),
+                            }
+                        },
+                    )
+                    return len(batch)
+            self._enqueue(batch)
+            self._queued += len(batch)
+            self._record_flush(len(batch), time.perf_counter() - started)
+            backlog = self._backlog_depth()
         logger.debug(
             "Queued telemetry locally",
-            extra={"sentinel_context": {"backlog": backlog}},
+            extra={"sentinel_context": {"messages": len(batch), "backlog": backlog}},
         )
-
-    def drain_local(self) -> List[str]:
-        """Return any locally buffered messages for observability hooks."""
-
-        drained: List[str] = []
+        return len(batch)
+
+    def _send(self, client: Any, batch: List[str | bytes]) -> None:
+        pipe = client.pipeline(transaction=False)
+        for serialized in batch:
+            pipe.publish(self.channel, serialized)
+        if self.transport == "stream":
+            for serialized in batch:
+                pipe.xadd(self.stream_key, {"m": serialized}, maxlen=self.list_max_len, approximate=True)
+        else:
+            pipe.rpush(self.list_key, *batch)
+            if self.list_max_len is not None:
+                pipe.ltrim(self.list_key, -self.list_max_len, -1)
+        pipe.execute()
+
+    def _disconnect(self, exc: Exception, messages: int) -> None:
+        """Drop the client and wake the reconnect thread (lock held)."""
+
+        logger.error(
+            "Redis publish failed; buffering locally until it reconnects",
+            exc_info=exc,
+            extra={"sentinel_context": {"channel": self.channel, "messages": messages}},
+        )
+        self._client = None
+        self._failures += 1
+        self._condition.notify_all()
+
+    def _enqueue(self, batch: List[str | bytes]) -> None:
+        """Append to the backlog, spilling or dropping the oldest (lock held)."""
+
+        now = time.time()
+        backlog = self._backlog
+        backlog.extend((now, serialized) for serialized in batch)
+        overflow = len(backlog) - self.max_backlog
+        if overflow <= 0:
+            return
+        oldest = [backlog.popleft() for _ in range(overflow)]
+        self._backlog_head += overflow
+        spilled = self._spill.append(oldest) if self._spill is not None else 0
+        self._spilled += spilled
+        dropped = overflow - spilled
+        if dropped:
+            if not self._dropped:
+                logger.warning(
+                    "Telemetry backlog full; dropping oldest messages",
+                    extra={
+                        "sentinel_context": {
+                            "max_backlog": self.max_backlog,
+                            "spill_path": str(self.spill_path) if self.spill_path else None,
+                        }
+                    },
+                )
+            self._dropped += dropped
+
+    def _backlog_depth(self) -> int:
+        return len(self._backlog) + (len(self._spill) if self._spill is not None else 0)
+
+    def _record_flush(self, messages: int, elapsed: float) -> None:
+        self._flushes += 1
+        self._last_batch = messages
+        self._last_flush = elapsed
+        self._flush_seconds += elapsed
+        self._max_flush = max(self._max_flush, elapsed)
+
+    # ------------------------------------------------------------------
+    # Reconnect and replay thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        delay = self.reconnect_backoff.total_seconds()
         while True:
-            try:
-                drained.append(self.local_queue.get_nowait())
-            except queue.Empty:
-                break
+            with self._condition:
+                while not self._closing and self._client is not None and not self._backlog_depth():
+                    self._condition.wait()
+                client = self._client
+                if self._closing and (client is None or not self._backlog_depth()):
+                    return
+            if client is None:
+                try:
+                    client = self._open()
+                except Exception:  # pragma: no cover - network failures
+                    with self._condition:
+                        self._condition.wait(delay * random.uniform(0.5, 1.0))
+                    delay = min(delay * 2, self.reconnect_backoff_max.total_seconds())
+                    continue
+                with self._condition:
+                    self._client = client
+                    self._reconnects += 1
+                    backlog = self._backlog_depth()
+                logger.info(
+                    "Reconnected to Redis event bus; replaying backlog",
+                    extra={"sentinel_context": {"url": self.redis_url, "backlog": backlog}},
+                )
+            if self._replay(client):
+                delay = self.reconnect_backoff.total_seconds()
+                continue
+            # Connecting is not proof the batch can be written (e.g. WRONGTYPE
+            # on the key), so the backoff only resets after a successful send.
+            with self._condition:
+                self._condition.wait(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, self.reconnect_backoff_max.total_seconds())
+
+    def _replay(self, client: Any) -> bool:
+        """Send the oldest backlog batch; new flushes queue behind it.
+
+        Returns ``False`` if the send failed and the bus was disconnected.
+        """
+
+        with self._condition:
+            if self._spill is not None and len(self._spill):
+                entries, position = self._spill.peek(self.batch_size)
+            else:
+                entries = list(itertools.islice(self._backlog, self.batch_size))
+                position = None
+            start = self._backlog_head
+            if not entries:
+                if position is not None:
+                    self._spill.truncate()  # counted records are unreadable
+                return True
+        try:
+            self._send(client, [serialized for _, serialized in entries])
+        except Exception as exc:  # pragma: no cover - network failures
+            with self._condition:
+                if self._client is client:
+                    self._disconnect(exc, len(entries))
+            return False
+        with self._condition:
+            if position is not None:
+                self._spill.consume(len(entries), position)
+            else:
+                # Entries may have been spilled or drained meanwhile; pop only what is left of them.
+                while self._backlog and self._backlog_head < start + len(entries):
+                    self._backlog.popleft()
+                    self._backlog_head += 1
+            self._replayed += len(entries)
+            if not self._backlog_depth():
+                logger.info(
+                    "Telemetry backlog replayed",
+                    extra={"sentinel_context": {"replayed": self._replayed}},
+                )
+        return True
+
+    # ------------------------------------------------------------------
+    # Observability and shutdown
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        """Flush, backlog and reconnect counters for the dashboard and benchmarks."""
+
+        with self._condition:
+            flushes = self._flushes
+            oldest = self._spill.oldest if self._spill is not None and len(self._spill) else None
+            if oldest is None and self._backlog:
+                oldest = self._backlog[0][0]
+            return {
+                "connected": self._client is not None,
+                "encoding": self.encoding,
+                "pending": len(self._pending),
+                "flushes": flushes,
+                "published": self._published,
+                "queued_locally": self._queued,
+                "last_batch": self._last_batch,
+                "mean_batch": round((self._published + self._queued) / flushes, 1) if flushes else 0.0,
+                "last_flush_ms": round(self._last_flush * 1000, 3),
+                "mean_flush_ms": round(self._flush_seconds / flushes * 1000, 3) if flushes else 0.0,
+                "max_flush_ms": round(self._max_flush * 1000, 3),
+                "backlog": self._backlog_depth(),
+                "backlog_spilled": len(self._spill) if self._spill is not None else 0,
+                "max_backlog": self.max_backlog,
+                "oldest_age_s": round(max(0.0, time.time() - oldest), 3) if oldest is not None else 0.0,
+                "dropped": self._dropped,
+                "spilled": self._spilled,
+                "replayed": self._replayed,
+                "reconnects": self._reconnects,
+                "failures": self._failures,
+            }
+
+    def drain_local(self) -> List[str | bytes]:
+        """Remove and return the undelivered backlog, oldest first."""
+
+        with self._condition:
+            drained: List[str | bytes] = []
+            if self._spill is not None and len(self._spill):
+                entries, _ = self._spill.peek(None)
+                drained.extend(serialized for _, serialized in entries)
+                self._spill.truncate()
+            drained.extend(serialized for _, serialized in self._backlog)
+            self._backlog_head += len(self._backlog)
+            self._backlog.clear()
         if drained:
             logger.debug(
                 "Drained local telemetry backlog",
@@ -128,6 +551,29 @@ class EventBus:
             )
         return drained
 
+    def close(self) -> None:
+        """Flush, finish replaying if connected, and stop the reconnect thread.
+
+        With a spill file, whatever is still in memory is written to it so
+        the next run replays it.
+        """
+
+        self.flush()
+        with self._condition:
+            if self._closing:
+                return
+            self._closing = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        with self._condition:
+            if self._spill is not None and self._backlog:
+                spilled = self._spill.append(list(self._backlog))
+                self._spilled += spilled
+                self._dropped += len(self._backlog) - spilled
+                self._backlog_head += len(self._backlog)
+                self._backlog.clear()
+
 
 @dataclass(slots=True)
 class TelemetryEvent:
@@ -148,149 +594,48 @@ class TelemetryEvent:
             "payload": self.payload,
         }
 
-
-def _baseline_payload(source: str, collected_at: datetime) -> Dict[str, Any]:
-    """Return deterministic payloads for the telemetry baseline."""
-
-    minute_bucket = collected_at.minute % 5
-    severity = "info"
-    metrics: Dict[str, float] = {}
-    summary: str
-    tags: List[str]
-
-    if source == "auth_logs":
-        failures = 2 + minute_bucket
-        metrics = {
-            "auth.failures": float(failures),
-            "intrusion.ssh_bruteforce": float(min(failures / 20, 1.0)),
-        }
-        summary = f"{failures} failed authentications observed"
-        tags = ["auth", "ssh", "baseline"]
-    elif source == "process_inventory":
-        unsigned = 1 if minute_bucket == 0 else 0
-        metrics = {
-            "malware.unsigned_binaries": float(unsigned),
-            "malware.unexpected_elf": float(unsigned),
-        }
-        severity = "warning" if unsigned else "info"
-        summary = "Unsigned binaries present in writable paths" if unsigned else "Process inventory steady"
-        tags = ["process", "malware"]
-    elif source == "open_sockets":
-        long_lived = 3 + minute_bucket
-        metrics = {
-            "network.long_lived_connections": float(long_lived),
-            "exfil.egress_volume": float(long_lived * 5),
-        }
-        summary = "Socket scan completed"
-        tags = ["network", "sockets"]
-    elif source == "kernel_audit":
-        setuid_changes = 1 if minute_bucket == 0 else 0
-        metrics = {
-            "malware.setuid_change": float(setuid_changes),
-            "kernel.audit.anomalies": float(setuid_changes),
-        }
-        severity = "warning" if setuid_changes else "info"
-        summary = "Kernel audit stream analyzed"
-        tags = ["kernel", "auditd", "ebpf"]
-    elif source == "file_integrity":
-        drifts = minute_bucket
-        metrics = {
-            "fim.aide_deviation": float(drifts),
-        }
-        severity = "warning" if drifts else "info"
-        summary = "AIDE baseline verified"
-        tags = ["fim", "aide"]
-    elif source == "package_inventory":
-        outdated = 1 if minute_bucket == 4 else 0
-        metrics = {
-            "packages.outdated_critical": float(outdated),
-        }
-        summary = "Package inventory scanned"
-        tags = ["packages", "sbom"]
-    elif source == "systemd_states":
-        restarts = minute_bucket // 2
-        metrics = {
-            "services.restarts": float(restarts),
-        }
-        summary = "Systemd unit snapshot"
-        tags = ["systemd", "services"]
-    elif source == "wireguard_status":
-        enforced = 1.0
-        metrics = {
-            "wireguard.enforced": enforced,
-            "wireguard.anomaly": 0.0,
-        }
-        summary = "WireGuard tunnel healthy"
-        tags = ["wireguard", "vpn"]
-    elif source == "clamav_scan":
-        hits = 0 if minute_bucket else 1
-        metrics = {
-            "malware.signature_hits": float(hits),
-        }
-        severity = "warning" if hits else "info"
-        summary = "ClamAV nightly sweep"
-        tags = ["malware", "clamav"]
-    elif source == "yara_sweep":
-        hits = 0 if minute_bucket else 0.5
-        metrics = {
-            "malware.yara_hits": float(hits),
-        }
-        summary = "YARA sweep complete"
-        tags = ["malware", "yara"]
-    elif source == "ebpf_counters":
-        syn_rate = 50 + minute_bucket * 5
-        udp_flood = 5 * minute_bucket
-        metrics = {
-            "ddos.syn_rate": float(syn_rate),
-            "ddos.udp_flood": float(udp_flood),
-        }
-        severity = "warning" if syn_rate > 100 else "info"
-        summary = "eBPF counters refreshed"
-        tags = ["network", "ebpf", "ddos"]
-    elif source == "http_telemetry":
-        error_rate = 0.05 * minute_bucket
-        metrics = {
-            "http.error_rate": float(error_rate),
-            "http.user_agent_anomaly": float(0.1 * minute_bucket),
-        }
-        summary = "HTTP telemetry processed"
-        tags = ["http", "application"]
-    elif source == "dns_watch":
-        tunnel_score = 0.1 * minute_bucket
-        metrics = {
-            "exfil.dns_tunnel_score": float(tunnel_score),
-        }
-        summary = "DNS heuristics evaluated"
-        tags = ["dns", "exfil"]
-    elif source == "exfil_watch":
-        outbound = 10 * (minute_bucket + 1)
-        metrics = {
-            "exfil.long_lived_outbound": float(outbound),
-        }
-        summary = "Egress posture analyzed"
-        tags = ["exfil", "network"]
-    else:
-        metrics = {"events.generic": 1.0}
-        summary = "Generic telemetry event"
-        tags = ["generic"]
-
-    payload = {
-        "summary": summary,
-        "severity": severity,
-        "metrics": metrics,
-        "tags": tags,
-        "collected_at": collected_at,
-    }
-    return payload
+    @classmethod
+    def from_message(cls, data: MutableMapping[str, Any]) -> "TelemetryEvent":
+        """Rebuild an event from the ``data`` of a transported message."""
+
+        collected_at = data["collected_at"]
+        if isinstance(collected_at, str):
+            collected_at = datetime.fromisoformat(collected_at)
+        return cls(
+            source=data["source"],
+            payload=data.get("payload", {}),
+            collected_at=collected_at,
+            hostname=data.get("hostname", "unknown-host"),
+        )
 
 
 @dataclass(slots=True)
 class TelemetryIngestor:
-    """Loads raw telemetry from configured sources at strict cadence."""
+    """Loads raw telemetry from configured sources at strict cadence.
+
+    Each ``cadence_seconds`` cycle runs only the sources that are due; see
+    :class:`CollectorPool` for per-source intervals, priorities and the
+    cycle budget, and :meth:`schedule` for when each source runs next.
+    """
 
     sources: List[str]
     cadence_seconds: int
     event_bus: EventBus
+    collector_workers: int = 4
+    source_intervals: Dict[str, timedelta] = field(default_factory=dict)
+    source_priorities: Dict[str, int] = field(default_factory=dict)
+    cycle_budget: timedelta | None = timedelta(milliseconds=500)
+    _pool: CollectorPool = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._pool = CollectorPool(
+            sources=list(self.sources),
+            cycle=timedelta(seconds=self.cadence_seconds),
+            max_workers=self.collector_workers,
+            intervals=dict(self.source_intervals),
+            priorities=dict(self.source_priorities),
+            cycle_budget=self.cycle_budget,
+        )
 
     @classmethod
     def from_config(cls, config) -> "TelemetryIngestor":
@@ -308,15 +653,42 @@ class TelemetryIngestor:
             redis_url=getattr(config, "redis_url", "redis://localhost:6379/0"),
             channel=getattr(config, "redis_channel", "sentinel.telemetry"),
             list_key=getattr(config, "redis_list_key", "sentinel.telemetry.queue"),
+            encoding=getattr(config, "redis_encoding", "json"),
+            transport=getattr(config, "redis_transport", "list"),
+            stream_key=getattr(config, "redis_stream_key", "sentinel.telemetry.stream"),
+            list_max_len=getattr(config, "redis_list_max_len", None),
+            batch_size=getattr(config, "publish_batch", 256),
+            max_backlog=getattr(config, "local_backlog", 10_000),
+            spill_path=getattr(config, "spill_path", None),
+            spill_max_bytes=getattr(config, "spill_max_bytes", 64 * 1024 * 1024),
+            reconnect_backoff=getattr(config, "reconnect_backoff", timedelta(milliseconds=500)),
+            reconnect_backoff_max=getattr(config, "reconnect_backoff_max", timedelta(seconds=30)),
+        )
+        return cls(
+            sources=config.sources,
+            cadence_seconds=config.cadence_seconds,
+            event_bus=bus,
+            collector_workers=getattr(config, "collector_workers", 4),
+            source_intervals=getattr(config, "source_intervals", {}),
+            source_priorities=getattr(config, "source_priorities", {}),
+            cycle_budget=getattr(config, "collector_cycle_budget", timedelta(milliseconds=500)),
         )
-        return cls(sources=config.sources, cadence_seconds=config.cadence_seconds, event_bus=bus)
 
     def collect(self) -> Iterator[TelemetryEvent]:
-        """Yield telemetry events, forwarding each record to the event bus."""
+        """Yield telemetry events, forwarding each record to the event bus.
+
+        The cycle's messages are flushed together once the sources are
+        exhausted (or the caller stops iterating).
+        """
+
+        try:
+            yield from self._collect()
+        finally:
+            self.event_bus.flush()
 
+    def _collect(self) -> Iterator[TelemetryEvent]:
         now = datetime.now(UTC)
-        for source in self.sources:
-            payload = _baseline_payload(source, now)
+        for source, payload in self._pool.run(now):
             event = TelemetryEvent(source=source, payload=payload, collected_at=now)
             message = {
                 "stream": source,
@@ -336,6 +708,18 @@ class TelemetryIngestor:
             )
             yield event
 
+    def collector_stats(self) -> Dict[str, Dict[str, float]]:
+        return self._pool.stats()
+
+    def schedule(self) -> List[Dict[str, Any]]:
+        return self._pool.schedule()
+
+    def close(self) -> None:
+        """Stop collector threads and close the event bus."""
+
+        self._pool.close()
+        self.event_bus.close()
+
 
 @dataclass(slots=True)
 class FeatureWindow:
@@ -0,0 +1,402 @@
+"""Coordinator-side reader for telemetry published by sensor :class:`EventBus` instances.
+
+With ``transport="stream"`` sensors ``XADD`` each message to a Redis
+Stream and every coordinator joins one consumer group, so messages are
+shared across coordinators and each is delivered to one of them. An entry
+stays in the group's pending list until :meth:`TelemetryConsumer.ack`; on
+start a consumer first re-reads its own pending entries, and entries left
+idle by a dead consumer for ``claim_idle`` are claimed with ``XAUTOCLAIM``.
+
+With ``transport="list"`` (or when the server has no stream commands)
+messages are taken from the ``RPUSH`` list in batches: one blocking
+``BLMOVE`` followed by pipelined ``LMOVE`` calls, which move them onto a
+per-consumer processing list rather than popping them outright as
+``BLPOP`` would. Acknowledging removes each message from the processing
+list by value, and anything still on it when the consumer restarts is
+delivered again.
+
+Both recovery paths key on the consumer name, so it defaults to the
+hostname and survives restarts; give each coordinator on one host its own
+``consumer`` name.
+
+Either way delivery is at-least-once: acknowledge a batch only after its
+feature window has been persisted, and :meth:`TelemetryConsumer.release`
+it if persisting fails, so the next read delivers it again. Backpressure
+comes from ``max_inflight``, which caps how many messages may be
+delivered and not yet acknowledged; until the caller catches up,
+:meth:`TelemetryConsumer.read` returns empty batches instead of taking
+more from Redis, and unread telemetry waits in Redis (capped there by the
+producers' ``MAXLEN``/``LTRIM``).
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, List, Tuple
+
+try:  # pragma: no cover - optional dependency
+    import redis
+except Exception:  # pragma: no cover - runtime only
+    redis = None
+
+from ..utils.logging_config import configure_logging
+from .ingestion_pipeline import TRANSPORTS, TelemetryEvent, _default_hostname, decode_message
+
+logger = configure_logging(context={"component": "telemetry_consumer"})
+
+
+@dataclass(slots=True)
+class ConsumedBatch:
+    """Telemetry events read in one call, plus what is needed to acknowledge them."""
+
+    events: List[TelemetryEvent] = field(default_factory=list)
+    ids: List[Any] = field(default_factory=list)  # stream entry ids, or the raw list messages
+    redelivered: int = 0
+    malformed: int = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass(slots=True)
+class TelemetryConsumer:
+    """Consumer-group reader over a telemetry stream, or a reliable list queue."""
+
+    redis_url: str
+    stream_key: str = "sentinel.telemetry.stream"
+    list_key: str = "sentinel.telemetry.queue"
+    group: str = "sentinel-coordinator"
+    consumer: str = ""
+    transport: str = "list"
+    batch_size: int = 512
+    block: timedelta = timedelta(seconds=1)
+    max_inflight: int = 4096
+    claim_idle: timedelta = timedelta(minutes=1)
+    reconnect_backoff: timedelta = timedelta(seconds=1)
+    _client: Any = field(init=False, default=None)
+    _retry_at: float = field(init=False, default=0.0)
+    _recovering: bool = field(init=False, default=True)  # re-reading our own pending entries after a restart
+    _recover_from: Any = field(init=False, default="0")
+    _next_claim: float = field(init=False, default=0.0)
+    _inflight: int = field(init=False, default=0)
+    _stats: Dict[str, int] = field(
+        init=False,
+        default_factory=lambda: {
+            "delivered": 0,
+            "acked": 0,
+            "released": 0,
+            "redelivered": 0,
+            "claimed": 0,
+            "malformed": 0,
+            "throttled": 0,
+            "errors": 0,
+        },
+    )
+
+    @classmethod
+    def from_config(cls, config) -> "TelemetryConsumer":
+        return cls(
+            redis_url=config.redis_url,
+            stream_key=getattr(config, "stream_key", "sentinel.telemetry.stream"),
+            list_key=getattr(config, "list_key", "sentinel.telemetry.queue"),
+            group=getattr(config, "group", "sentinel-coordinator"),
+            consumer=getattr(config, "consumer", "") or "",
+            transport=getattr(config, "transport", "list"),
+            batch_size=getattr(config, "batch_size", 512),
+            block=getattr(config, "block", timedelta(seconds=1)),
+            max_inflight=getattr(config, "max_inflight", 4096),
+            claim_idle=getattr(config, "claim_idle", timedelta(minutes=1)),
+        )
+
+    def __post_init__(self) -> None:
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"Unknown telemetry transport: {self.transport}")
+        if self.batch_size < 1 or self.max_inflight < 1:
+            raise ValueError("batch_size and max_inflight must be at least 1")
+        if not self.consumer:
+            # Stable across restarts, so the new process finds its processing list.
+            self.consumer = _default_hostname()
+
+    @property
+    def processing_key(self) -> str:
+        return f"{self.list_key}.processing.{self.consumer}"
+
+    # ------------------------------------------------------------------
+    # Connection
+    # ------------------------------------------------------------------
+    def _connect(self) -> Any:
+        if self._client is not None:
+            return self._client
+        if redis is None:
+            raise RuntimeError("TelemetryConsumer requires the redis package")
+        if time.monotonic() < self._retry_at:
+            return None
+        try:
+            client = redis.Redis.from_url(self.redis_url, socket_timeout=None, socket_connect_timeout=1)
+            client.ping()
+            if self.transport == "stream":
+                self._create_group(client)
+        except Exception as exc:  # pragma: no cover - network failures
+            self._fail("Failed to connect telemetry consumer to Redis", exc)
+            return None
+        self._client = client
+        logger.info(
+            "Telemetry consumer connected",
+            extra={
+                "sentinel_context": {
+                    "url": self.redis_url,
+                    "transport": self.transport,
+                    "group": self.group,
+                    "consumer": self.consumer,
+                }
+            },
+        )
+        return client
+
+    def _create_group(self, client: Any) -> None:
+        try:
+            client.xgroup_create(self.stream_key, self.group, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            message = str(exc)
+            if "BUSYGROUP" in message:
+                return
+            if "unknown command" in message.lower():
+                logger.warning(
+                    "Redis has no stream support; consuming the telemetry list instead",
+                    extra={"sentinel_context": {"list_key": self.list_key}},
+                )
+                self.transport = "list"
+                return
+            raise
+
+    def _fail(self, message: str, exc: Exception) -> None:
+        logger.error(
+            message,
+            exc_info=exc,
+            extra={"sentinel_context": {"url": self.redis_url, "transport": self.transport}},
+        )
+        self._stats["errors"] += 1
+        self._client = None
+        self._retry_at = time.monotonic() + self.reconnect_backoff.total_seconds()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def read(self) -> ConsumedBatch:
+        """Deliver up to ``batch_size`` messages, blocking for at most ``block``.
+
+        Returns an empty batch when Redis is unreachable or ``max_inflight``
+        messages are awaiting :meth:`ack`.
+        """
+
+        count = min(self.batch_size, self.max_inflight - self._inflight)
+        if count <= 0:
+            self._stats["throttled"] += 1
+            logger.debug(
+                "Telemetry consumer throttled; waiting for acknowledgements",
+                extra={"sentinel_context": {"inflight": self._inflight, "max_inflight": self.max_inflight}},
+            )
+            return ConsumedBatch()
+        client = self._connect()
+        if client is None:
+            return ConsumedBatch()
+        try:
+            if self.transport == "stream":
+                batch = self._read_stream(client, count)
+            else:
+                batch = self._read_list(client, count)
+        except Exception as exc:  # pragma: no cover - network failures
+            self._fail("Telemetry consumer read failed", exc)
+            return ConsumedBatch()
+        self._inflight += len(batch)
+        self._stats["delivered"] += len(batch)
+        self._stats["redelivered"] += batch.redelivered
+        self._stats["malformed"] += batch.malformed
+        if batch.ids:
+            logger.debug(
+                "Consumed telemetry batch",
+                extra={
+                    "sentinel_context": {
+                        "messages": len(batch),
+                        "events": len(batch.events),
+                        "redelivered": batch.redelivered,
+                        "inflight": self._inflight,
+                    }
+                },
+            )
+        return batch
+
+    def _read_stream(self, client: Any, count: int) -> ConsumedBatch:
+        batch = ConsumedBatch()
+        if self._recovering:
+            # Entries delivered to this consumer name before a restart and never acknowledged.
+            entries = self._entries(
+                client.xreadgroup(self.group, self.consumer, {self.stream_key: self._recover_from}, count=count)
+            )
+            if len(entries) < count:
+                self._recovering = False
+            if entries:
+                self._recover_from = entries[-1][0]
+                self._add_entries(batch, entries, redelivered=True)
+                return batch
+        if time.monotonic() >= self._next_claim:
+            self._next_claim = time.monotonic() + self.claim_idle.total_seconds()
+            claimed = self._claim(client, count)
+            if claimed:
+                self._stats["claimed"] += len(claimed)
+                self._add_entries(batch, claimed, redelivered=True)
+                return batch
+        response = client.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.stream_key: ">"},
+            count=count,
+            block=max(1, int(self.block.total_seconds() * 1000)),
+        )
+        self._add_entries(batch, self._entries(response), redelivered=False)
+        return batch
+
+    def _claim(self, client: Any, count: int) -> List[Tuple[Any, Dict]]:
+        """Take over entries another consumer left pending for ``claim_idle``."""
+
+        try:
+            response = client.xautoclaim(
+                self.stream_key,
+                self.group,
+                self.consumer,
+                min_idle_time=int(self.claim_idle.total_seconds() * 1000),
+                start_id="0-0",
+                count=count,
+            )
+        except redis.ResponseError:  # pragma: no cover - Redis < 6.2
+            return []
+        return [(entry_id, fields) for entry_id, fields in response[1] if fields is not None]
+
+    @staticmethod
+    def _entries(response: Any) -> List[Tuple[Any, Dict]]:
+        entries: List[Tuple[Any, Dict]] = []
+        for _stream, stream_entries in response or []:
+            entries.extend((entry_id, fields) for entry_id, fields in stream_entries if fields is not None)
+        return entries
+
+    def _add_entries(self, batch: ConsumedBatch, entries: List[Tuple[Any, Dict]], redelivered: bool) -> None:
+        for entry_id, fields in entries:
+            batch.ids.append(entry_id)
+            self._decode(batch, fields.get(b"m") or fields.get("m"))
+        if redelivered:
+            batch.redelivered += len(entries)
+
+    def _read_list(self, client: Any, count: int) -> ConsumedBatch:
+        batch = ConsumedBatch()
+        if self._recovering:
+            self._recovering = False
+            pending = client.lrange(self.processing_key, 0, -1)
+            if pending:
+                # Delivered before a restart (or released) and never acknowledged.
+                for serialized in pending:
+                    batch.ids.append(serialized)
+                    self._decode(batch, serialized)
+                batch.redelivered = len(pending)
+                return batch
+        first = client.blmove(
+            self.list_key, self.processing_key, max(0.01, self.block.total_seconds()), "LEFT", "RIGHT"
+        )
+        if first is None:
+            return batch
+        moved = [first]
+        if count > 1:
+            pipe = client.pipeline(transaction=False)
+            for _ in range(count - 1):
+                pipe.lmove(self.list_key, self.processing_key, "LEFT", "RIGHT")
+            moved.extend(serialized for serialized in pipe.execute() if serialized is not None)
+        for serialized in moved:
+            batch.ids.append(serialized)
+            self._decode(batch, serialized)
+        return batch
+
+    def _decode(self, batch: ConsumedBatch, serialized: Any) -> None:
+        try:
+            message = decode_message(serialized)
+            batch.events.append(TelemetryEvent.from_message(message["data"]))
+        except Exception as exc:
+            # Undecodable entries are still acknowledged with the batch so they cannot wedge the group.
+            batch.malformed += 1
+            logger.warning(
+                "Skipping malformed telemetry message",
+                extra={"sentinel_context": {"error": repr(exc), "transport": self.transport}},
+            )
+
+    # ------------------------------------------------------------------
+    # Acknowledgement
+    # ------------------------------------------------------------------
+    def ack(self, batch: ConsumedBatch) -> None:
+        """Acknowledge a batch once its telemetry has been persisted."""
+
+        if not batch.ids:
+            return
+        client = self._connect()
+        if client is None:
+            raise RuntimeError("Cannot acknowledge telemetry while Redis is unreachable")
+        try:
+            if self.transport == "stream":
+                client.xack(self.stream_key, self.group, *batch.ids)
+            else:
+                # Identical messages are interchangeable, so removing one copy
+                # per id acknowledges exactly this batch whatever else is in flight.
+                pipe = client.pipeline(transaction=False)
+                for serialized in batch.ids:
+                    pipe.lrem(self.processing_key, 1, serialized)
+                pipe.execute()
+        except Exception as exc:  # pragma: no cover - network failures
+            self._fail("Telemetry acknowledgement failed", exc)
+            raise
+        self._inflight = max(0, self._inflight - len(batch.ids))
+        self._stats["acked"] += len(batch.ids)
+
+    def release(self, batch: ConsumedBatch) -> None:
+        """Give back a batch that could not be persisted.
+
+        Its messages stay pending in Redis (the group's pending list, or the
+        processing list) and the next :meth:`read` re-reads this consumer's
+        unacknowledged messages before taking new ones. That includes any
+        other batch not yet acknowledged, so release with no other batch
+        outstanding, as :class:`~sentinel_central_ai.coordinator.ingest.RemoteIngestPipeline` does.
+        """
+
+        if not batch.ids:
+            return
+        self._inflight = max(0, self._inflight - len(batch.ids))
+        self._recovering = True
+        self._recover_from = "0"
+        self._stats["released"] += len(batch.ids)
+        logger.warning(
+            "Released unpersisted telemetry batch for redelivery",
+            extra={"sentinel_context": {"messages": len(batch.ids), "transport": self.transport}},
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Delivery counters plus what is waiting in Redis."""
+
+        stats: Dict[str, Any] = dict(self._stats)
+        stats.update(
+            {
+                "transport": self.transport,
+                "consumer": self.consumer,
+                "connected": self._client is not None,
+                "inflight": self._inflight,
+                "max_inflight": self.max_inflight,
+            }
+        )
+        if self._client is not None:
+            try:
+                if self.transport == "stream":
+                    stats["pending"] = self._client.xpending(self.stream_key, self.group)["pending"]
+                    stats["stream_length"] = self._client.xlen(self.stream_key)
+                else:
+                    stats["pending"] = self._client.llen(self.processing_key)
+                    stats["queued"] = self._client.llen(self.list_key)
+            except Exception:  # pragma: no cover - network failures
+                pass
+        return stats
@@ -12,6 +12,8 @@ def run_demo() -> None:
     """Run a demonstration loop producing verbose telemetry."""
 
     context = bootstrap_environment()
+    if context.remote_ingest is not None:
+        context.remote_ingest.start()
     # Simulate ingest + inference + policy evaluation
     feature_window = context.ingest_pipeline.pump()
     batch = context.inference_engine.score()
@@ -36,6 +38,10 @@ def run_demo() -> None:
     suggestions = context.feedback_loop.suggested_automations()
     print("Policy decision:", decision)
     print("Suggestions:", suggestions)
+    if context.remote_ingest is not None:
+        context.remote_ingest.stop()
+    context.ingest_pipeline.ingestor.close()
+    context.coordinator.feature_store.close()
 
 
 if __name__ == "__main__":
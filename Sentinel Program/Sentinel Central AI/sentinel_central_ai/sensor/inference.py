@@ -6,6 +6,7 @@ from datetime import UTC, datetime, timedelta
 from dataclasses import dataclass
 from typing import Dict
 
+from ..data.feature_buffer import FeatureMatrix
 from ..data.feature_store import FeatureStore
 from ..utils.logging_config import configure_logging
 
@@ -35,10 +36,11 @@ class InferenceEngine:
 
         start = datetime.now(UTC)
         features = self.feature_store.snapshot()
-        scores: Dict[str, float] = {}
-        for feature, value in features.items():
-            scores[feature] = float(value)
-            scores[f"anomaly.{feature}"] = float(value) * 0.1
+        try:
+            history = self.feature_store.feature_matrix()
+        except RuntimeError:  # no NumPy, so no array history to share
+            history = None
+        scores = self._score(features, history)
         batch = InferenceBatch(
             started_at=start,
             completed_at=datetime.now(UTC),
@@ -56,3 +58,17 @@ class InferenceEngine:
             },
         )
         return batch
+
+    def _score(self, features: Dict[str, float], history: FeatureMatrix | None) -> Dict[str, float]:
+        """Raw and anomaly scores for ``features``.
+
+        ``history`` is a zero-copy, read-only view of the store's ring buffer
+        for accelerator backends. It is only valid during this call: the
+        next ``persist`` overwrites its rows, so copy anything kept longer.
+        """
+
+        scores: Dict[str, float] = {}
+        for feature, value in features.items():
+            scores[feature] = float(value)
+            scores[f"anomaly.{feature}"] = float(value) * 0.1
+        return scores
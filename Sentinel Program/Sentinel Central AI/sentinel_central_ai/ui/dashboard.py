@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 from typing import Dict, List
 
 from ..coordinator.services import Alert, Coordinator
+from ..data.feature_store import FeatureSeries
 from ..utils.logging_config import configure_logging
 
 logger = configure_logging(context={"component": "ui_dashboard"})
@@ -28,6 +30,8 @@ class Dashboard:
             "latest_alerts": [alert.summary for alert in alerts],
             "feature_snapshot": snapshot,
             "latency_ms": self.coordinator.last_ingest_latency_ms,
+            "audit_log": self.coordinator.feature_store.audit_stats(),
+            "feature_commits": self.coordinator.feature_store.commit_stats(),
             "https_enabled": self.coordinator.config.ui_endpoint.startswith("https://"),
         }
         logger.debug(
@@ -51,6 +55,30 @@ class Dashboard:
         )
         return alerts
 
+    def feature_timeline(
+        self,
+        feature: str,
+        span: timedelta = timedelta(hours=1),
+        resolution: timedelta | None = None,
+    ) -> FeatureSeries:
+        """History of one feature over the last ``span`` for timeline charts."""
+
+        series = self.coordinator.feature_store.query(
+            feature, datetime.now(UTC) - span, resolution=resolution
+        )
+        logger.debug(
+            "Fetched feature timeline",
+            extra={
+                "sentinel_context": {
+                    "feature": feature,
+                    "span_seconds": span.total_seconds(),
+                    "resolution_seconds": series.resolution.total_seconds(),
+                    "points": len(series.points),
+                }
+            },
+        )
+        return series
+
     def decision_console(self) -> Dict[str, object]:
         """Expose the coordinator's latest decision context."""
 
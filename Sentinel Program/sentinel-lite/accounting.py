@@ -0,0 +1,72 @@
+"""Per-probe usage accounting shared by the scheduler and the probes.
+
+This is kept apart from :mod:`scheduler` so that low-level modules such as
+:mod:`hashing` and :mod:`netwatch` can report work without importing
+asyncio. The scheduler binds a :class:`ProbeRun` to the worker thread for
+the duration of a probe; :func:`charge` and :func:`cancelled` are no-ops
+when nothing is bound.
+"""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+_context = threading.local()
+
+
+@dataclass
+class ProbeRun:
+    """Usage and outcome of a single probe execution."""
+
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    io_bytes: int = 0
+    files: int = 0
+    sockets: int = 0
+    alerts: int = 0
+    failed: bool = False
+    results: List[dict] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        del data["results"]
+        data["wall_seconds"] = round(self.wall_seconds, 3)
+        data["cpu_seconds"] = round(self.cpu_seconds, 3)
+        return data
+
+
+@contextmanager
+def bound(run: ProbeRun, stopping: Optional[threading.Event] = None) -> Iterator[ProbeRun]:
+    """Charge work done on this thread to ``run`` until the block exits."""
+
+    _context.run = run
+    _context.stopping = stopping
+    try:
+        yield run
+    finally:
+        _context.run = None
+        _context.stopping = None
+
+
+def charge(cpu_seconds: float = 0.0, io_bytes: int = 0, files: int = 0, sockets: int = 0) -> None:
+    """Attribute work (including work done on helper threads) to the running probe."""
+
+    run = getattr(_context, "run", None)
+    if run is not None:
+        run.cpu_seconds += cpu_seconds
+        run.io_bytes += io_bytes
+        run.files += files
+        run.sockets += sockets
+
+
+def cancelled() -> bool:
+    """Return ``True`` if the probe running on this thread should stop early."""
+
+    stopping = getattr(_context, "stopping", None)
+    return stopping is not None and stopping.is_set()
+
+
+__all__ = ["ProbeRun", "bound", "cancelled", "charge"]
@@ -0,0 +1,156 @@
+"""Compiled remote-address allowlist for :mod:`netwatch`.
+
+Entries may be single IPs, IPv4/IPv6 CIDRs or hostnames. Networks are
+collapsed and compiled into one hash set per distinct prefix length, so a
+lookup costs one mask-and-probe per prefix length in use (typically a
+handful) instead of a bit-by-bit trie walk in Python. Hostnames are
+resolved on a background thread and the compiled table is swapped
+atomically when their addresses change.
+"""
+from __future__ import annotations
+
+import ipaddress
+import logging
+import socket
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+LOGGER = logging.getLogger("sentinel.allowlist")
+
+_CACHE_LIMIT = 65536
+
+_V4_MAPPED_PREFIX = b"\x00" * 10 + b"\xff\xff"
+
+# prefix length -> (mask, set of masked network integers)
+_Table = Tuple[Tuple[int, FrozenSet[int]], ...]
+
+
+def _compile(networks: Iterable[ipaddress._BaseNetwork], bits: int) -> _Table:
+    by_length: Dict[int, Set[int]] = {}
+    for network in ipaddress.collapse_addresses(networks):
+        by_length.setdefault(network.prefixlen, set()).add(int(network.network_address))
+    full = (1 << bits) - 1
+    # Shortest prefixes first: broad CDN ranges match before host entries.
+    return tuple(
+        (full ^ ((1 << (bits - length)) - 1), frozenset(values))
+        for length, values in sorted(by_length.items())
+    )
+
+
+def _parse_ip(raw: str) -> Optional[Tuple[int, int]]:
+    """Return ``(version, integer)`` for an IP string, unwrapping v4-mapped v6."""
+
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, raw), "big")
+    except OSError:
+        pass
+    try:
+        packed = socket.inet_pton(socket.AF_INET6, raw.split("%", 1)[0])
+    except OSError:
+        return None
+    if packed[:12] == _V4_MAPPED_PREFIX:
+        return 4, int.from_bytes(packed[12:], "big")
+    return 6, int.from_bytes(packed, "big")
+
+
+class IpAllowlist:
+    """Match remote addresses against IPs, CIDRs and resolved hostnames."""
+
+    def __init__(self, entries: Iterable[str] = (), refresh_seconds: float = 600.0) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._networks: List[ipaddress._BaseNetwork] = []
+        self.hostnames: List[str] = []
+        for entry in entries:
+            entry = entry.strip()
+            if not entry:
+                continue
+            try:
+                network = ipaddress.ip_network(entry, strict=False)
+            except ValueError:
+                self.hostnames.append(entry.lower())
+                continue
+            mapped = getattr(network.network_address, "ipv4_mapped", None)
+            if mapped is not None and network.prefixlen >= 96:
+                # Lookups unwrap v4-mapped addresses, so store these as IPv4.
+                network = ipaddress.ip_network(f"{mapped}/{network.prefixlen - 96}")
+            self._networks.append(network)
+        self._resolved: Dict[str, FrozenSet[str]] = {}
+        self._tables: Dict[int, _Table] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._recompile()
+
+    def _recompile(self) -> None:
+        networks = list(self._networks)
+        for addresses in self._resolved.values():
+            networks.extend(ipaddress.ip_network(address) for address in addresses)
+        v4 = [network for network in networks if network.version == 4]
+        v6 = [network for network in networks if network.version == 6]
+        self._tables = {4: _compile(v4, 32), 6: _compile(v6, 128)}
+        # Busy hosts hold many sockets to the same peers; memoise verdicts.
+        self._cache: Dict[str, bool] = {}
+
+    def __contains__(self, raw_ip: object) -> bool:
+        if not isinstance(raw_ip, str):
+            return False
+        cache = self._cache
+        verdict = cache.get(raw_ip)
+        if verdict is None:
+            verdict = self._lookup(raw_ip)
+            if len(cache) >= _CACHE_LIMIT:
+                cache.clear()
+            cache[raw_ip] = verdict
+        return verdict
+
+    def _lookup(self, raw_ip: str) -> bool:
+        parsed = _parse_ip(raw_ip)
+        if parsed is None:
+            return False
+        version, value = parsed
+        for mask, networks in self._tables[version]:
+            if (value & mask) in networks:
+                return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Hostname resolution
+    # ------------------------------------------------------------------
+    def resolve_once(self) -> bool:
+        """Resolve hostnames; returns ``True`` if the compiled table changed."""
+
+        changed = False
+        for hostname in self.hostnames:
+            try:
+                infos = socket.getaddrinfo(hostname, None, proto=socket.IPPROTO_TCP)
+            except (OSError, UnicodeError) as exc:
+                LOGGER.warning("Unable to resolve allowlisted host %s: %s", hostname, exc)
+                continue
+            addresses = frozenset(info[4][0].split("%", 1)[0] for info in infos)
+            if self._resolved.get(hostname) != addresses:
+                self._resolved[hostname] = addresses
+                changed = True
+        if changed:
+            self._recompile()
+            LOGGER.info("Allowlist recompiled with %s resolved hostnames", len(self._resolved))
+        return changed
+
+    def start(self) -> None:
+        if not self.hostnames or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._resolve_loop, name="allowlist-resolver", daemon=True)
+        self._thread.start()
+
+    def _resolve_loop(self) -> None:
+        while not self._stop.is_set():
+            self.resolve_once()
+            self._stop.wait(self.refresh_seconds)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+__all__ = ["IpAllowlist"]
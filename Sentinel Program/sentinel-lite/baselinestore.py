@@ -0,0 +1,376 @@
+"""Crash-safe binary store for ProcGuard hash baselines.
+
+The store is a sorted snapshot file plus an append-only log of changes made
+since the snapshot was written:
+
+* ``<name>`` — the snapshot. A header, a table of record offsets sorted by
+  key, then the records. It is memory-mapped on open and looked up by
+  binary search, so startup cost does not grow with the number of entries.
+* ``<name>.log`` — records appended (and fsynced) by :meth:`BaselineStore.put_many`.
+  It is replayed into memory on open. A torn tail from a crash is truncated:
+  a record cut short at end of file, or records that fail their CRC with no
+  intact record after them (delayed allocation can leave a zero-filled
+  tail). A bad record followed by intact ones raises
+  :class:`CorruptRecordError` rather than dropping what follows.
+
+Compaction merges both into a new snapshot written to a temporary file and
+renamed into place, then starts a fresh log. Both files carry a generation
+number, so a crash between the two renames never replays a log that the
+snapshot already contains.
+
+Layout (little endian)::
+
+    snapshot header: char[8] magic | uint16 version | uint16 reserved | uint32 count
+                     | uint64 generation | uint32 crc32(offset table) | uint32 crc32(header)
+    offset table:    uint64 record_offset * count
+    log header:      char[8] magic | uint64 generation | uint32 crc32(header)
+    record:          uint32 crc32(rest) | uint16 key_len | uint8 kind | uint32 value_len | key | value
+
+A record's CRC is checked when it is read, so a damaged entry is reported
+instead of silently turning into "no baseline".
+"""
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+LOGGER = logging.getLogger("sentinel.baselinestore")
+
+_SNAP_MAGIC = b"SNTLBASE"
+_LOG_MAGIC = b"SNTLBLOG"
+_VERSION = 1
+_SNAP_HEADER = struct.Struct("<8sHHIQII")
+_LOG_HEADER = struct.Struct("<8sQI")
+_META = struct.Struct("<HBI")
+_RECORD = struct.Struct("<IHBI")
+_OFFSET = struct.Struct("<Q")
+
+KIND_SHA256 = 0  # value is a raw 32-byte digest
+KIND_BYTES = 1  # value is opaque bytes (e.g. a JSON-encoded chunked entry)
+
+Record = Tuple[int, bytes]  # kind, value
+
+
+class CorruptRecordError(ValueError):
+    """A baseline record or file failed its CRC check."""
+
+
+def _crc(key: bytes, kind: int, value: bytes) -> int:
+    return zlib.crc32(value, zlib.crc32(key, zlib.crc32(_META.pack(len(key), kind, len(value)))))
+
+
+def _encode_record(key: bytes, kind: int, value: bytes) -> bytes:
+    return _RECORD.pack(_crc(key, kind, value), len(key), kind, len(value)) + key + value
+
+
+def _fsync_dir(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class BaselineStore:
+    """Sorted, mmap-backed snapshot plus an append-only change log."""
+
+    def __init__(self, path: Path, compact_min_records: int = 1024) -> None:
+        self.path = path
+        self.log_path = path.with_name(path.name + ".log")
+        self.compact_min_records = compact_min_records
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._count = 0
+        self._map: Optional[mmap.mmap] = None
+        self._overlay: Dict[bytes, Record] = {}
+        self._log_records = 0
+        self._log_fd: Optional[int] = None
+        self._open()
+
+    # ------------------------------------------------------------------
+    # Opening
+    # ------------------------------------------------------------------
+    def exists(self) -> bool:
+        return self.path.exists() or self.log_path.exists()
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self._map_snapshot()
+        try:
+            self._replay_log()
+        except CorruptRecordError:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            raise
+
+    def _map_snapshot(self) -> None:
+        with self.path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < _SNAP_HEADER.size:
+                raise CorruptRecordError(f"Baseline snapshot {self.path} is truncated")
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _reserved, count, generation, table_crc, header_crc = _SNAP_HEADER.unpack_from(mapped, 0)
+        table_end = _SNAP_HEADER.size + count * _OFFSET.size
+        if (
+            magic != _SNAP_MAGIC
+            or version != _VERSION
+            or zlib.crc32(mapped[: _SNAP_HEADER.size - 4]) != header_crc
+            or table_end > size
+            or zlib.crc32(mapped[_SNAP_HEADER.size : table_end]) != table_crc
+        ):
+            mapped.close()
+            raise CorruptRecordError(f"Baseline snapshot {self.path} failed its header check")
+        self._map = mapped
+        self._count = count
+        self._generation = generation
+
+    def _replay_log(self) -> None:
+        if not self.log_path.exists():
+            self._start_log(self._generation)
+            return
+        with self.log_path.open("rb") as handle:
+            header = handle.read(_LOG_HEADER.size)
+            if len(header) < _LOG_HEADER.size:
+                # Crash while creating the log; nothing was appended yet.
+                generation = -1
+            else:
+                magic, generation, crc = _LOG_HEADER.unpack(header)
+                if magic != _LOG_MAGIC or zlib.crc32(header[:-4]) != crc:
+                    raise CorruptRecordError(f"Baseline log {self.log_path} failed its header check")
+            if generation != self._generation:
+                if generation > self._generation:
+                    raise CorruptRecordError(
+                        f"Baseline log {self.log_path} is newer than its snapshot; refusing to guess"
+                    )
+                LOGGER.info("Discarding baseline log from generation %s; already compacted", generation)
+                handle.close()
+                self._start_log(self._generation)
+                return
+            offset = _LOG_HEADER.size
+            while True:
+                parsed = self._read_log_record(handle)
+                if parsed is None:
+                    break
+                key, kind, value, size, intact = parsed
+                if not intact:
+                    if self._intact_record_follows(handle):
+                        raise CorruptRecordError(
+                            f"Baseline log record for {key.decode('utf-8', 'replace')} failed its CRC"
+                        )
+                    break  # torn tail; truncated below
+                self._overlay[key] = (kind, value)
+                self._log_records += 1
+                offset += size
+        if offset < self.log_path.stat().st_size:
+            LOGGER.warning("Truncating torn baseline log record in %s at byte %s", self.log_path.name, offset)
+            with self.log_path.open("r+b") as writer:
+                writer.truncate(offset)
+        self._log_fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND)
+
+    @staticmethod
+    def _read_log_record(handle) -> Optional[Tuple[bytes, int, bytes, int, bool]]:
+        """Next record as ``(key, kind, value, size, crc_ok)``; ``None`` at a short read."""
+
+        header = handle.read(_RECORD.size)
+        if len(header) < _RECORD.size:
+            return None
+        crc, key_len, kind, value_len = _RECORD.unpack(header)
+        body = handle.read(key_len + value_len)
+        if len(body) < key_len + value_len:
+            return None
+        key, value = body[:key_len], body[key_len:]
+        return key, kind, value, _RECORD.size + len(body), _crc(key, kind, value) == crc
+
+    @classmethod
+    def _intact_record_follows(cls, handle) -> bool:
+        """Whether any record between here and end of file passes its CRC."""
+
+        while True:
+            parsed = cls._read_log_record(handle)
+            if parsed is None:
+                return False
+            if parsed[4]:
+                return True
+
+    def _start_log(self, generation: int) -> None:
+        """Atomically replace the log with an empty one for ``generation``."""
+
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = None
+        header = _LOG_HEADER.pack(_LOG_MAGIC, generation, 0)
+        header = header[:-4] + struct.pack("<I", zlib.crc32(header[:-4]))
+        tmp_path = self.log_path.with_name(self.log_path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(header)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.log_path)
+        _fsync_dir(self.log_path.parent)
+        self._log_records = 0
+        self._log_fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(1 for _ in self._iter_keys())
+
+    def _record_at(self, index: int) -> Tuple[bytes, int, int, int, int]:
+        """Return ``(key, kind, value_offset, value_len, crc)`` of snapshot record ``index``."""
+
+        (offset,) = _OFFSET.unpack_from(self._map, _SNAP_HEADER.size + index * _OFFSET.size)
+        crc, key_len, kind, value_len = _RECORD.unpack_from(self._map, offset)
+        start = offset + _RECORD.size
+        return self._map[start : start + key_len], kind, start + key_len, value_len, crc
+
+    def _snapshot_get(self, key: bytes) -> Optional[Record]:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._record_at(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._count:
+            return None
+        found, kind, value_offset, value_len, crc = self._record_at(low)
+        if found != key:
+            return None
+        value = self._map[value_offset : value_offset + value_len]
+        if _crc(key, kind, value) != crc:
+            raise CorruptRecordError(f"Baseline record for {key.decode('utf-8', 'replace')} failed its CRC")
+        return kind, value
+
+    def get(self, key: bytes) -> Optional[Record]:
+        """Return ``(kind, value)`` for ``key`` or ``None``; O(log n) in the snapshot."""
+
+        with self._lock:
+            if key in self._overlay:
+                return self._overlay[key]
+            if self._map is None:
+                return None
+            return self._snapshot_get(key)
+
+    def _iter_keys(self) -> Iterator[bytes]:
+        seen = set(self._overlay)
+        yield from self._overlay
+        for index in range(self._count):
+            key = self._record_at(index)[0]
+            if key not in seen:
+                yield key
+
+    def items(self) -> List[Tuple[bytes, Record]]:
+        """All entries, snapshot and log merged, sorted by key."""
+
+        with self._lock:
+            merged: Dict[bytes, Record] = {}
+            for index in range(self._count):
+                key, kind, value_offset, value_len, crc = self._record_at(index)
+                value = self._map[value_offset : value_offset + value_len]
+                if _crc(key, kind, value) != crc:
+                    raise CorruptRecordError(
+                        f"Baseline record for {key.decode('utf-8', 'replace')} failed its CRC"
+                    )
+                merged[key] = (kind, value)
+            merged.update(self._overlay)
+            return sorted(merged.items())
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def put_many(self, records: Iterable[Tuple[bytes, int, bytes]]) -> int:
+        """Append ``(key, kind, value)`` records to the log and fsync once.
+
+        Compacts afterwards when the log has grown past a quarter of the
+        snapshot (and at least ``compact_min_records``).
+        """
+
+        with self._lock:
+            payload = bytearray()
+            written: Dict[bytes, Record] = {}
+            for key, kind, value in records:
+                if self._overlay.get(key) == (kind, value):
+                    continue
+                if key not in self._overlay and self._map is not None and self._snapshot_get(key) == (kind, value):
+                    continue
+                payload += _encode_record(key, kind, value)
+                written[key] = (kind, value)
+            if not written:
+                return 0
+            os.write(self._log_fd, payload)
+            os.fsync(self._log_fd)
+            self._overlay.update(written)
+            self._log_records += len(written)
+            if self._log_records >= max(self.compact_min_records, self._count // 4):
+                self._compact_locked()
+            return len(written)
+
+    def compact(self) -> None:
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        merged: Dict[bytes, Record] = {}
+        for index in range(self._count):
+            key, kind, value_offset, value_len, crc = self._record_at(index)
+            value = self._map[value_offset : value_offset + value_len]
+            if _crc(key, kind, value) != crc:
+                raise CorruptRecordError(
+                    f"Baseline record for {key.decode('utf-8', 'replace')} failed its CRC; not compacting"
+                )
+            merged[key] = (kind, value)
+        merged.update(self._overlay)
+        keys = sorted(merged)
+        generation = self._generation + 1
+
+        records = [_encode_record(key, *merged[key]) for key in keys]
+        offsets = bytearray()
+        position = _SNAP_HEADER.size + len(keys) * _OFFSET.size
+        for record in records:
+            offsets += _OFFSET.pack(position)
+            position += len(record)
+        header = _SNAP_HEADER.pack(_SNAP_MAGIC, _VERSION, 0, len(keys), generation, zlib.crc32(offsets), 0)
+        header = header[:-4] + struct.pack("<I", zlib.crc32(header[:-4]))
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(header)
+            handle.write(offsets)
+            for record in records:
+                handle.write(record)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.path)
+        _fsync_dir(self.path.parent)
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._count = 0
+        self._map_snapshot()
+        # The snapshot now holds the log; a crash before this leaves an
+        # older-generation log that _replay_log discards.
+        self._start_log(generation)
+        self._overlay.clear()
+        LOGGER.debug("Compacted baseline %s: %s entries, generation %s", self.path.name, len(keys), generation)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log_fd is not None:
+                os.close(self._log_fd)
+                self._log_fd = None
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+
+__all__ = ["BaselineStore", "CorruptRecordError", "KIND_BYTES", "KIND_SHA256"]
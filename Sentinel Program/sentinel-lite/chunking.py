@@ -0,0 +1,243 @@
+"""Chunked file digests with a Merkle root for Sentinel Lite manifests.
+
+A whole-file SHA-256 says *that* a large binary or database changed but not
+*where*, and every check has to read the whole file. A chunked manifest
+entry records the SHA-256 of each chunk plus a Merkle root over them::
+
+    {
+      "chunking": "fixed",        # or "cdc" (content-defined)
+      "chunk_size": 1048576,      # fixed size, or average size for cdc
+      "size": 734003200,
+      "merkle_root": "5f1c...",
+      "chunks": [[0, 1048576, "9a0b..."], ...]
+    }
+
+Flat manifests map a path to a hex digest string; both forms may be mixed
+in one file, so existing manifests keep working unchanged. The root makes a
+full rehash a single comparison, the chunk list lets a mismatch name the
+byte ranges that changed, and individual chunks can be re-read with a seek
+to spot-check files whose stat fingerprint has not moved.
+
+Fixed chunks are cheap and are the default. Content-defined chunks (a gear
+rolling hash picks the boundaries) keep unchanged regions aligned when
+bytes are inserted or removed, but the boundary search runs in pure Python
+at a few MB/s, so reserve it for files that are edited in place.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from accounting import charge
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+MODES = ("fixed", "cdc")
+
+Chunk = Tuple[int, int, str]  # offset, length, sha256 hex
+ManifestEntry = Union[str, dict]
+
+# 64-bit gear table for content-defined chunking; derived, not random, so
+# every host cuts the same file at the same offsets.
+_GEAR = [int.from_bytes(hashlib.sha256(bytes([value])).digest()[:8], "little") for value in range(256)]
+_MASK64 = (1 << 64) - 1
+
+
+@dataclass
+class ChunkSpec:
+    mode: str = "fixed"
+    size: int = DEFAULT_CHUNK_SIZE  # chunk size for fixed, average size for cdc
+
+    def __post_init__(self) -> None:
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown chunking mode: {self.mode}")
+        if self.size < 4096:
+            raise ValueError("chunk_size must be at least 4096 bytes")
+
+    @classmethod
+    def from_entry(cls, entry: dict) -> "ChunkSpec":
+        return cls(mode=entry.get("chunking", "fixed"), size=int(entry.get("chunk_size", DEFAULT_CHUNK_SIZE)))
+
+
+@dataclass
+class ChunkedDigest:
+    """Per-chunk digests of one file and their Merkle root."""
+
+    spec: ChunkSpec
+    size: int = 0
+    chunks: List[Chunk] = field(default_factory=list)
+
+    @property
+    def root(self) -> str:
+        return merkle_root([digest for _, _, digest in self.chunks])
+
+    def to_entry(self) -> dict:
+        return {
+            "chunking": self.spec.mode,
+            "chunk_size": self.spec.size,
+            "size": self.size,
+            "merkle_root": self.root,
+            "chunks": [list(chunk) for chunk in self.chunks],
+        }
+
+
+# ----------------------------------------------------------------------------
+# Manifest entries
+# ----------------------------------------------------------------------------
+
+def is_chunked(entry: Optional[ManifestEntry]) -> bool:
+    return isinstance(entry, dict)
+
+
+def entry_digest(entry: Optional[ManifestEntry]) -> Optional[str]:
+    """The value to compare against: the hex digest or the Merkle root."""
+
+    if is_chunked(entry):
+        return entry.get("merkle_root")
+    return entry
+
+
+def merkle_root(digests: Sequence[str]) -> str:
+    """Binary Merkle root over chunk digests (RFC 6962 style prefixes)."""
+
+    level = [hashlib.sha256(b"\x00" + bytes.fromhex(digest)).digest() for digest in digests]
+    if not level:
+        return hashlib.sha256(b"").hexdigest()
+    while len(level) > 1:
+        paired = [
+            hashlib.sha256(b"\x01" + level[index] + level[index + 1]).digest()
+            for index in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            paired.append(level[-1])  # odd node is promoted unchanged
+        level = paired
+    return level[0].hex()
+
+
+# ----------------------------------------------------------------------------
+# Chunking
+# ----------------------------------------------------------------------------
+
+def _cdc_cut(data: bytes, start: int, spec: ChunkSpec) -> int:
+    """Length of the next content-defined chunk starting at ``data[start]``."""
+
+    min_size, max_size = spec.size // 4, spec.size * 4
+    end = min(len(data), start + max_size)
+    if end - start <= min_size:
+        return end - start
+    bits = max(1, spec.size.bit_length() - 1)
+    # Test the high bits: they depend on the last 64 bytes, the low bits on fewer.
+    mask = ((1 << bits) - 1) << (64 - bits)
+    gear = _GEAR
+    rolling = 0
+    for index in range(start + min_size, end):
+        rolling = ((rolling << 1) + gear[data[index]]) & _MASK64
+        if not rolling & mask:
+            return index + 1 - start
+    return end - start
+
+
+def iter_chunks(handle, spec: ChunkSpec) -> Iterator[Tuple[int, bytes]]:
+    """Yield ``(offset, data)`` for each chunk read from ``handle``."""
+
+    offset = 0
+    if spec.mode == "fixed":
+        for data in iter(lambda: handle.read(spec.size), b""):
+            yield offset, data
+            offset += len(data)
+        return
+    window = spec.size * 4  # max chunk size
+    buffer, start = b"", 0
+    while True:
+        if len(buffer) - start < window:
+            buffer, start = buffer[start:] + handle.read(window * 4), 0
+            if not buffer:
+                return
+        cut = _cdc_cut(buffer, start, spec)
+        yield offset, buffer[start : start + cut]
+        offset += cut
+        start += cut
+
+
+def chunk_file(path: Path, spec: ChunkSpec) -> ChunkedDigest:
+    result = ChunkedDigest(spec=spec)
+    with path.open("rb") as handle:
+        for offset, data in iter_chunks(handle, spec):
+            result.chunks.append((offset, len(data), hashlib.sha256(data).hexdigest()))
+            result.size = offset + len(data)
+    return result
+
+
+def sample_chunks(path: Path, entry: dict, indices: Iterable[int]) -> List[Chunk]:
+    """Re-read the given chunks of ``entry`` and return those that differ."""
+
+    chunks = entry.get("chunks", [])
+    bad: List[Chunk] = []
+    read = 0
+    with path.open("rb") as handle:
+        for index in indices:
+            offset, length, digest = chunks[index]
+            handle.seek(offset)
+            data = handle.read(length)
+            read += len(data)
+            if len(data) != length or hashlib.sha256(data).hexdigest() != digest:
+                bad.append((offset, length, digest))
+    charge(io_bytes=read)
+    return bad
+
+
+# ----------------------------------------------------------------------------
+# Diffing
+# ----------------------------------------------------------------------------
+
+def merge_ranges(ranges: Iterable[Tuple[int, int]]) -> List[List[int]]:
+    """Merge overlapping or adjacent ``(start, end)`` byte ranges."""
+
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def changed_ranges(expected: dict, actual: ChunkedDigest) -> List[List[int]]:
+    """Byte ranges of the current file that do not match ``expected``.
+
+    Fixed chunks are compared at the same offset. Content-defined chunks
+    are matched by digest anywhere in the file, so an insertion only flags
+    the chunks around it. Bytes missing from the end are reported as the
+    range past the current size.
+    """
+
+    known = expected.get("chunks", [])
+    if actual.spec.mode == "cdc":
+        digests = {digest for _, _, digest in known}
+        ranges = [(offset, offset + length) for offset, length, digest in actual.chunks if digest not in digests]
+    else:
+        by_offset = {(offset, length): digest for offset, length, digest in known}
+        ranges = [
+            (offset, offset + length)
+            for offset, length, digest in actual.chunks
+            if by_offset.get((offset, length)) != digest
+        ]
+    expected_size = int(expected.get("size", 0))
+    if expected_size > actual.size:
+        ranges.append((actual.size, expected_size))
+    return merge_ranges(ranges)
+
+
+__all__ = [
+    "ChunkSpec",
+    "ChunkedDigest",
+    "DEFAULT_CHUNK_SIZE",
+    "changed_ranges",
+    "chunk_file",
+    "entry_digest",
+    "is_chunked",
+    "merge_ranges",
+    "merkle_root",
+    "sample_chunks",
+]
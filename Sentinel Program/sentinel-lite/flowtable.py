@@ -0,0 +1,135 @@
+"""Connection state tracking and alert rate limiting for :mod:`netwatch`.
+
+Long-lived suspicious connections would otherwise be re-reported on every
+poll. :class:`FlowTable` remembers each flow with its first- and last-seen
+times so only new flows raise an alert, rate-limits those alerts per remote
+address with a token bucket, and periodically emits a summary of the flows
+that are still open. Both tables are bounded LRUs so memory stays flat on
+busy hosts.
+"""
+from __future__ import annotations
+
+import logging
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional, Tuple
+
+LOGGER = logging.getLogger("sentinel.flowtable")
+
+
+@dataclass
+class Flow:
+    local: str
+    remote: str
+    first_seen: float
+    last_seen: float
+    pid: Optional[int] = None
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+class FlowTable:
+    """Bounded LRU of suspicious flows with per-remote alert budgets."""
+
+    def __init__(
+        self,
+        max_flows: int = 10000,
+        alert_rate: float = 0.1,
+        alert_burst: int = 3,
+        summary_interval: float = 300.0,
+        idle_timeout: float = 3600.0,
+    ) -> None:
+        self.max_flows = max_flows
+        self.alert_rate = alert_rate
+        self.alert_burst = alert_burst
+        self.summary_interval = summary_interval
+        self.idle_timeout = idle_timeout
+        self._flows: "OrderedDict[Hashable, Flow]" = OrderedDict()
+        self._buckets: "OrderedDict[str, _TokenBucket]" = OrderedDict()
+        self._suppressed: Counter = Counter()
+        self._last_summary: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._flows)
+
+    def observe(self, key: Hashable, local: str, remote: str, now: float) -> Tuple[Flow, bool]:
+        """Record a sighting of ``key``; returns the flow and whether it is new."""
+
+        flow = self._flows.get(key)
+        if flow is not None:
+            flow.last_seen = now
+            self._flows.move_to_end(key)
+            return flow, False
+        flow = Flow(local=local, remote=remote, first_seen=now, last_seen=now)
+        self._flows[key] = flow
+        if len(self._flows) > self.max_flows:
+            self._flows.popitem(last=False)
+        return flow, True
+
+    def allow_alert(self, remote: str, now: float) -> bool:
+        """Spend one token from ``remote``'s bucket, refilling at ``alert_rate``/s."""
+
+        bucket = self._buckets.get(remote)
+        if bucket is None:
+            bucket = _TokenBucket(float(self.alert_burst), now)
+            self._buckets[remote] = bucket
+            if len(self._buckets) > self.max_flows:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(remote)
+            bucket.tokens = min(
+                float(self.alert_burst), bucket.tokens + (now - bucket.updated) * self.alert_rate
+            )
+            bucket.updated = now
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            return True
+        self._suppressed[remote] += 1
+        return False
+
+    def summary(self, now: float) -> Optional[Dict]:
+        """Return a periodic digest of open flows, or ``None`` if not due."""
+
+        if self._last_summary is None:
+            self._last_summary = now
+            return None
+        if now - self._last_summary < self.summary_interval:
+            return None
+        self._expire(now)
+        since = self._last_summary
+        self._last_summary = now
+        active = [flow for flow in self._flows.values() if flow.last_seen >= since]
+        suppressed = sum(self._suppressed.values())
+        if not active and not suppressed:
+            return None
+        remotes = Counter(flow.remote for flow in active)
+        oldest = min((flow.first_seen for flow in active), default=now)
+        digest = {
+            "type": "network",
+            "status": "flow_summary",
+            "active_flows": len(active),
+            "tracked_flows": len(self._flows),
+            "oldest_flow_age": round(now - oldest, 1),
+            "top_remotes": remotes.most_common(10),
+            "suppressed_alerts": suppressed,
+            "suppressed_by_remote": self._suppressed.most_common(10),
+        }
+        self._suppressed.clear()
+        return digest
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.idle_timeout
+        while self._flows:
+            key, flow = next(iter(self._flows.items()))
+            if flow.last_seen >= cutoff:
+                break
+            del self._flows[key]
+
+
+__all__ = ["Flow", "FlowTable"]
@@ -0,0 +1,200 @@
+"""Shared file hashing engine for Sentinel Lite.
+
+Both :mod:`procguard` and :mod:`integrity` hash files with SHA-256. This
+module spreads that work across a thread pool (``hashlib`` releases the GIL
+while digesting large buffers) and memory-maps big binaries so they are
+hashed without copying them through Python-level read buffers. Results are
+streamed back in completion order so callers can raise alerts as soon as
+each file finishes. Paths with a :class:`chunking.ChunkSpec` are hashed chunk
+by chunk and reported by their Merkle root instead.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+from accounting import cancelled, charge
+from chunking import ChunkedDigest, ChunkSpec, chunk_file
+
+LOGGER = logging.getLogger("sentinel.hashing")
+
+DEFAULT_WORKERS = 4
+CHUNK_SIZE = 1024 * 1024
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+
+@dataclass
+class HashResult:
+    """Outcome of hashing a single path."""
+
+    path: Path
+    digest: Optional[str]
+    size: int = 0
+    error: Optional[OSError] = None
+    cpu_seconds: float = 0.0
+    chunks: Optional[ChunkedDigest] = None  # set when hashed with a ChunkSpec
+
+
+class HashEngine:
+    """Hash files concurrently and keep throughput counters."""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        chunk_size: int = CHUNK_SIZE,
+        mmap_threshold: int = MMAP_THRESHOLD,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.mmap_threshold = mmap_threshold
+        self._lock = threading.Lock()
+        self.stats: Dict[str, float] = {"files": 0, "bytes": 0, "seconds": 0.0}
+
+    # ------------------------------------------------------------------
+    # Single file
+    # ------------------------------------------------------------------
+    def hash_file(self, path: Path) -> str:
+        """Return the SHA-256 hex digest of ``path``."""
+
+        started = time.perf_counter()
+        digest, size = self._digest(path)
+        elapsed = time.perf_counter() - started
+        charge(io_bytes=size, files=1)
+        with self._lock:
+            self.stats["files"] += 1
+            self.stats["bytes"] += size
+            self.stats["seconds"] += elapsed
+        return digest
+
+    def hash_chunked(self, path: Path, spec: ChunkSpec) -> ChunkedDigest:
+        """Return per-chunk digests and the Merkle root of ``path``."""
+
+        started = time.perf_counter()
+        chunked = chunk_file(path, spec)
+        elapsed = time.perf_counter() - started
+        charge(io_bytes=chunked.size, files=1)
+        with self._lock:
+            self.stats["files"] += 1
+            self.stats["bytes"] += chunked.size
+            self.stats["seconds"] += elapsed
+        return chunked
+
+    def _digest(self, path: Path):
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size >= self.mmap_threshold:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest.update(mapped)
+            else:
+                size = 0
+                for chunk in iter(lambda: handle.read(self.chunk_size), b""):
+                    digest.update(chunk)
+                    size += len(chunk)
+        return digest.hexdigest(), size
+
+    def _hash_result(self, path: Path, spec: Optional[ChunkSpec] = None) -> HashResult:
+        started = time.thread_time()
+        chunked = None
+        try:
+            if spec is None:
+                digest, size = self._digest(path)
+            else:
+                chunked = chunk_file(path, spec)
+                digest, size = chunked.root, chunked.size
+        except OSError as exc:
+            return HashResult(path=path, digest=None, error=exc)
+        return HashResult(
+            path=path,
+            digest=digest,
+            size=size,
+            cpu_seconds=time.thread_time() - started,
+            chunks=chunked,
+        )
+
+    # ------------------------------------------------------------------
+    # Batches
+    # ------------------------------------------------------------------
+    def hash_many(
+        self, paths: Iterable[Path], chunking: Optional[Dict[Path, ChunkSpec]] = None
+    ) -> Iterator[HashResult]:
+        """Hash ``paths`` concurrently, yielding results as each completes.
+
+        Paths listed in ``chunking`` are hashed per chunk; their result's
+        digest is the Merkle root and :attr:`HashResult.chunks` holds the
+        chunk list. Unreadable files are reported through :attr:`HashResult.error`
+        rather than raised so one bad path cannot abort a sweep. When run as
+        a scheduler probe the work is charged to that probe, and the batch
+        stops early once the scheduler is shutting down.
+        """
+
+        paths = list(paths)
+        chunking = chunking or {}
+        if not paths:
+            return
+        started = time.perf_counter()
+        hashed_files = hashed_bytes = 0
+        try:
+            if self.workers == 1 or len(paths) == 1:
+                for path in paths:
+                    if cancelled():
+                        break
+                    result = self._hash_result(path, chunking.get(path))
+                    if result.error is None:
+                        hashed_files += 1
+                    hashed_bytes += result.size
+                    # CPU is already on this thread's clock.
+                    charge(io_bytes=result.size, files=1)
+                    yield result
+            else:
+                workers = min(self.workers, len(paths))
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sentinel-hash")
+                try:
+                    futures = [pool.submit(self._hash_result, path, chunking.get(path)) for path in paths]
+                    for future in as_completed(futures):
+                        result = future.result()
+                        if result.error is None:
+                            hashed_files += 1
+                        hashed_bytes += result.size
+                        charge(result.cpu_seconds, result.size, files=1)
+                        yield result
+                        if cancelled():
+                            break
+                finally:
+                    pool.shutdown(wait=True, cancel_futures=True)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stats["files"] += hashed_files
+                self.stats["bytes"] += hashed_bytes
+                self.stats["seconds"] += elapsed
+            LOGGER.debug(
+                "Hashed %s files (%.1f MB) in %.2fs: %.1f MB/s",
+                hashed_files,
+                hashed_bytes / 1e6,
+                elapsed,
+                self._throughput(hashed_bytes, elapsed),
+            )
+
+    @staticmethod
+    def _throughput(hashed_bytes: float, seconds: float) -> float:
+        if seconds <= 0:
+            return 0.0
+        return hashed_bytes / 1e6 / seconds
+
+    def throughput_mb_s(self) -> float:
+        """Average hashing throughput across all batches, in MB/s."""
+
+        with self._lock:
+            return self._throughput(self.stats["bytes"], self.stats["seconds"])
+
+
+__all__ = ["HashEngine", "HashResult"]
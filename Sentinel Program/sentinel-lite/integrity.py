@@ -1,82 +1,414 @@
-"""Integrity verification routines for Sentinel Lite."""
+"""Integrity verification routines for Sentinel Lite.
+
+Manifest entries are either a whole-file SHA-256 hex digest or a chunked
+entry with a Merkle root (see :mod:`chunking`). Chunked entries let a
+mismatch alert name the byte ranges that changed and let unchanged files be
+spot-checked a few chunks per sweep instead of being trusted on stat alone.
+"""
 from __future__ import annotations
 
 import json
 import logging
+import os
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 
-import hashlib
+from chunking import (
+    ChunkedDigest,
+    ChunkSpec,
+    ManifestEntry,
+    changed_ranges,
+    entry_digest,
+    is_chunked,
+    merge_ranges,
+    sample_chunks,
+)
+from hashing import HashEngine
+from optional import optional_import
 
 LOGGER = logging.getLogger("sentinel.integrity")
 
+Fingerprint = Tuple[int, int, int, int, int]
+
 
 @dataclass
 class IntegrityConfig:
     manifest_path: Path
     interval_seconds: int = 600
+    cache_path: Optional[Path] = None
+    paranoid_every: int = 0  # full rehash every N sweeps; 0 disables
+    mode: str = "poll"  # or "watch" for watchdog-driven rehashing
+    debounce_seconds: float = 2.0
+    safety_interval_seconds: int = 3600
+    sample_chunks: int = 0  # chunks re-read per sweep for unchanged chunked entries
 
 
 class IntegrityVerifier:
     """Verify checksums of key config files."""
 
-    def __init__(self, config: IntegrityConfig) -> None:
+    def __init__(self, config: IntegrityConfig, hasher: Optional[HashEngine] = None) -> None:
         self.config = config
+        self.hasher = hasher or HashEngine()
         self.manifest = self._load_manifest()
+        self._chunk_specs: Dict[str, ChunkSpec] = {
+            filename: ChunkSpec.from_entry(entry)
+            for filename, entry in self.manifest.items()
+            if is_chunked(entry)
+        }
+        self._cache: Dict[str, dict] = self._load_cache()
+        self._sweeps = 0
+        # The watch-mode event thread and scheduled sweeps share the cache.
+        self._lock = threading.Lock()
+        self._watcher: Optional["_ManifestWatcher"] = None
+        self.stats: Dict[str, int] = {"sweeps": 0, "cache_hits": 0, "rehashes": 0, "sampled_chunks": 0}
 
-    def _load_manifest(self) -> Dict[str, str]:
+    def _load_manifest(self) -> Dict[str, ManifestEntry]:
         if not self.config.manifest_path.exists():
             raise FileNotFoundError(
                 f"Manifest file {self.config.manifest_path} does not exist"
             )
         return json.loads(self.config.manifest_path.read_text())
 
+    # ----------------------------- Stat cache -----------------------------
+    def _load_cache(self) -> Dict[str, dict]:
+        path = self.config.cache_path
+        if path is None or not path.exists():
+            return {}
+        try:
+            cache = json.loads(path.read_text())
+        except json.JSONDecodeError:
+            LOGGER.warning("Integrity cache %s corrupted; rehashing everything", path)
+            return {}
+        return {name: entry for name, entry in cache.items() if name in self.manifest}
+
+    def _save_cache(self) -> None:
+        path = self.config.cache_path
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self._cache, sort_keys=True))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _fingerprint(stat: os.stat_result) -> Fingerprint:
+        return (
+            stat.st_dev,
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime_ns,
+            stat.st_ctime_ns,
+        )
+
     def _hash_file(self, path: Path) -> str:
-        digest = hashlib.sha256()
-        with path.open("rb") as handle:
-            for chunk in iter(lambda: handle.read(8192), b""):
-                digest.update(chunk)
-        return digest.hexdigest()
+        return self.hasher.hash_file(path)
 
-    def verify_once(self) -> Iterable[dict]:
-        alerts: List[dict] = []
-        for filename, expected_hash in self.manifest.items():
+    def _digest_form(self, filename: str) -> str:
+        """How the manifest entry's digest is computed, as recorded in the cache.
+
+        A cached flat SHA-256 must not be compared against a Merkle root (or a
+        root built with another chunk spec) after the manifest is rebuilt.
+        """
+
+        spec = self._chunk_specs.get(filename)
+        return "sha256" if spec is None else f"merkle:{spec.mode}:{spec.size}"
+
+    def _check(
+        self,
+        filename: str,
+        expected: ManifestEntry,
+        actual_hash: str,
+        chunks: Optional[ChunkedDigest] = None,
+    ) -> Optional[dict]:
+        expected_hash = entry_digest(expected)
+        if not expected_hash:
+            LOGGER.debug("Manifest entry for %s missing hash; skipping comparison", filename)
+            return None
+        if actual_hash != expected_hash:
+            alert = {
+                "type": "integrity",
+                "status": "checksum_mismatch",
+                "path": filename,
+                "expected": expected_hash,
+                "actual": actual_hash,
+            }
+            if chunks is not None and is_chunked(expected):
+                alert["ranges"] = changed_ranges(expected, chunks)
+            return alert
+        return None
+
+    def _sample(self, filename: str, path: Path, entry: dict, cached: dict) -> Optional[dict]:
+        """Re-read the next ``sample_chunks`` chunks of an unchanged file.
+
+        The window rotates each sweep, so every chunk is re-verified once per
+        ``len(chunks) / sample_chunks`` sweeps. This catches writes that
+        restored the stat fingerprint without rehashing the whole file.
+        """
+
+        total = len(entry.get("chunks", []))
+        if not total:
+            return None
+        cursor = cached.get("cursor", 0) % total
+        count = min(self.config.sample_chunks, total)
+        try:
+            bad = sample_chunks(path, entry, [(cursor + step) % total for step in range(count)])
+        except OSError as exc:
+            LOGGER.warning("Unable to sample %s: %s", filename, exc)
+            return None
+        self.stats["sampled_chunks"] += count
+        cached["cursor"] = (cursor + count) % total
+        if not bad:
+            return None
+        # Force a full rehash next time so the alert can be confirmed.
+        self._cache.pop(filename, None)
+        return {
+            "type": "integrity",
+            "status": "checksum_mismatch",
+            "path": filename,
+            "expected": entry_digest(entry),
+            "actual": None,
+            "ranges": merge_ranges((offset, offset + length) for offset, length, _ in bad),
+            "sampled": True,
+        }
+
+    def iter_verify(self) -> Iterator[dict]:
+        """Yield alerts as soon as each manifest entry has been checked.
+
+        Entries whose stat fingerprint matches the cache are compared
+        immediately; the rest are hashed concurrently by :attr:`hasher` and
+        reported in completion order.
+        """
+
+        self._sweeps += 1
+        self.stats["sweeps"] = self._sweeps
+        paranoid = bool(self.config.paranoid_every) and self._sweeps % self.config.paranoid_every == 0
+        if paranoid:
+            LOGGER.info("Paranoid sweep %s: rehashing every manifest entry", self._sweeps)
+        yield from self._verify_entries(self.manifest, paranoid)
+
+    def verify_paths(self, filenames: Iterable[str]) -> Iterator[dict]:
+        """Re-check only the given manifest entries (used by watch mode)."""
+
+        yield from self._verify_entries(
+            [filename for filename in filenames if filename in self.manifest], paranoid=False
+        )
+
+    def _verify_entries(self, filenames: Iterable[str], paranoid: bool) -> Iterator[dict]:
+        with self._lock:
+            yield from self._verify_entries_locked(filenames, paranoid)
+
+    def _verify_entries_locked(self, filenames: Iterable[str], paranoid: bool) -> Iterator[dict]:
+        hits = sampled = 0
+        pending: Dict[Path, Tuple[str, Fingerprint]] = {}
+        chunking: Dict[Path, ChunkSpec] = {}
+        for filename in filenames:
+            expected = self.manifest[filename]
             path = Path(filename)
-            if not path.exists():
-                alerts.append(
-                    {
-                        "type": "integrity",
-                        "status": "missing",
-                        "path": filename,
-                    }
-                )
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                self._cache.pop(filename, None)
+                yield {
+                    "type": "integrity",
+                    "status": "missing",
+                    "path": filename,
+                }
                 continue
-            actual_hash = self._hash_file(path)
-            if not expected_hash:
-                LOGGER.debug("Manifest entry for %s missing hash; skipping comparison", filename)
+            fingerprint = self._fingerprint(stat)
+            cached = self._cache.get(filename)
+            if (
+                not paranoid
+                and cached
+                and tuple(cached.get("fingerprint", ())) == fingerprint
+                and cached.get("form", "sha256") == self._digest_form(filename)
+            ):
+                hits += 1
+                alert = self._check(filename, expected, cached["sha256"])
+                if alert and "ranges" in cached:
+                    alert["ranges"] = cached["ranges"]
+                if alert is None and self.config.sample_chunks > 0 and is_chunked(expected):
+                    sampled += 1
+                    alert = self._sample(filename, path, expected, cached)
+                if alert:
+                    yield alert
                 continue
-            if actual_hash != expected_hash:
-                alerts.append(
-                    {
-                        "type": "integrity",
-                        "status": "checksum_mismatch",
-                        "path": filename,
-                        "expected": expected_hash,
-                        "actual": actual_hash,
-                    }
-                )
-        return alerts
-
-    def run_forever(self, callback) -> None:
+            pending[path] = (filename, fingerprint)
+            if filename in self._chunk_specs:
+                chunking[path] = self._chunk_specs[filename]
+
+        rehashed = 0
+        try:
+            for result in self.hasher.hash_many(pending, chunking):
+                filename, fingerprint = pending[result.path]
+                if result.error is not None:
+                    LOGGER.warning("Unable to hash %s: %s", filename, result.error)
+                    continue
+                rehashed += 1
+                entry = {
+                    "fingerprint": list(fingerprint),
+                    "form": self._digest_form(filename),
+                    "sha256": result.digest,
+                }
+                alert = self._check(filename, self.manifest[filename], result.digest, result.chunks)
+                if alert:
+                    if "ranges" in alert:
+                        # Keep naming the ranges while the file stays tampered.
+                        entry["ranges"] = alert["ranges"]
+                    yield alert
+                self._cache[filename] = entry
+        finally:
+            self.stats["cache_hits"] += hits
+            self.stats["rehashes"] += rehashed
+            if rehashed or sampled:
+                self._save_cache()
+            LOGGER.debug(
+                "Integrity check of %s entries: %s cache hits, %s rehashes",
+                hits + len(pending),
+                hits,
+                rehashed,
+            )
+
+    def verify_once(self) -> Iterable[dict]:
+        return list(self.iter_verify())
+
+    @property
+    def sweep_interval(self) -> int:
+        """Seconds between full sweeps: the safety sweep once watching."""
+
+        if self._watcher is not None:
+            return self.config.safety_interval_seconds
+        return self.config.interval_seconds
+
+    def run_forever(self, callback, stop_event: Optional[threading.Event] = None) -> None:
+        """Sweep every :attr:`sweep_interval` seconds until ``stop_event`` is set."""
+
+        stop_event = stop_event or threading.Event()
+        self.start_watch(callback)
+        LOGGER.info("Integrity verifier sweeping every %s seconds", self.sweep_interval)
+        try:
+            while not stop_event.is_set():
+                for alert in self.iter_verify():
+                    callback(alert)
+                    if stop_event.is_set():
+                        break
+                stop_event.wait(self.sweep_interval)
+        finally:
+            self.stop_watch()
+
+    # ---------------------------- Watchdog support ----------------------------
+    def start_watch(self, callback) -> bool:
+        """Rehash manifest entries on filesystem events when ``mode = watch``.
+
+        Returns ``False`` when watching is disabled or unavailable, in which
+        case callers should keep polling at ``interval_seconds``.
+        """
+
+        if self.config.mode != "watch" or self._watcher is not None:
+            return self._watcher is not None
+        if optional_import("watchdog.observers") is None:
+            LOGGER.warning("watchdog not available; falling back to polling integrity checks")
+            return False
+        self._watcher = _ManifestWatcher(self, callback)
+        self._watcher.start()
+        return True
+
+    def stop_watch(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+
+class _ManifestWatcher:
+    """Debounce filesystem events for manifest entries and rehash them."""
+
+    def __init__(self, verifier: IntegrityVerifier, callback) -> None:
+        self.verifier = verifier
+        self.callback = callback
+        # watchdog reports normalised paths; map them back to manifest keys.
+        self.watched = {str(Path(filename)): filename for filename in verifier.manifest}
+        self._pending: Dict[str, Tuple[float, float]] = {}
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._observer = None
+        self._thread: Optional[threading.Thread] = None
+
+    def dispatch(self, event) -> None:
+        # Observers only call dispatch(), so watchdog's base handler class
+        # (and the import it needs) is unnecessary.
+        self.on_any_event(event)
+
+    def on_any_event(self, event) -> None:
+        if event.is_directory:
+            return
+        touched = [event.src_path, getattr(event, "dest_path", "")]
+        now = time.monotonic()
+        with self._condition:
+            for raw in touched:
+                filename = self.watched.get(raw) if raw else None
+                if filename is None:
+                    continue
+                first_event, _ = self._pending.get(filename, (now, now))
+                self._pending[filename] = (first_event, now)
+            self._condition.notify()
+
+    def _due(self, now: float) -> Tuple[list, Optional[float]]:
+        debounce = self.verifier.config.debounce_seconds
+        due, next_deadline = [], None
+        for filename, (first_event, last_event) in list(self._pending.items()):
+            # A file rewritten continuously must not postpone its check forever.
+            deadline = min(last_event + debounce, first_event + debounce * 5)
+            if deadline <= now:
+                due.append(filename)
+                del self._pending[filename]
+            elif next_deadline is None or deadline < next_deadline:
+                next_deadline = deadline
+        return due, next_deadline
+
+    def start(self) -> None:
+        observer = optional_import("watchdog.observers").Observer()
+        directories = {str(Path(filename).parent) for filename in self.watched}
+        for directory in sorted(directories):
+            if not Path(directory).is_dir():
+                LOGGER.warning("Cannot watch %s; directory missing", directory)
+                continue
+            observer.schedule(self, path=directory, recursive=False)
+        observer.start()
+        self._observer = observer
+        self._thread = threading.Thread(target=self._process, name="integrity-watch", daemon=True)
+        self._thread.start()
         LOGGER.info(
-            "Integrity verifier running every %s seconds", self.config.interval_seconds
+            "Integrity verifier watching %s directories (safety sweep every %s seconds)",
+            len(directories),
+            self.verifier.config.safety_interval_seconds,
         )
+
+    def _process(self) -> None:
         while True:
-            for alert in self.verify_once():
-                callback(alert)
-            time.sleep(self.config.interval_seconds)
+            with self._condition:
+                due, next_deadline = self._due(time.monotonic())
+                while not due and not self._stopped:
+                    timeout = None if next_deadline is None else max(0.0, next_deadline - time.monotonic())
+                    self._condition.wait(timeout=timeout)
+                    due, next_deadline = self._due(time.monotonic())
+                if self._stopped:
+                    return
+            for alert in self.verifier.verify_paths(due):
+                self.callback(alert)
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
 
 
 __all__ = ["IntegrityVerifier", "IntegrityConfig"]
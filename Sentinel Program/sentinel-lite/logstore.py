@@ -0,0 +1,468 @@
+"""Rotating, indexed log files for Sentinel Lite.
+
+``logs/sentinel.log`` receives both the runtime's log records and the
+reporter's JSON alert lines. :class:`LogStore` appends to it and keeps a
+sparse sidecar index (``sentinel.log.idx``) of ``(timestamp, byte offset)``
+pairs, one roughly every ``index_every`` bytes, so readers can jump to a
+point in time instead of scanning from the start. When the live file grows
+past ``max_bytes`` it is rotated to ``sentinel.log.1.gz``: every index block
+is compressed as its own gzip member and the segment gets an index of
+compressed offsets, so rotated history stays seekable and still reads with
+plain ``zcat``.
+
+:class:`LogReader` is the read side used by ``sentinelctl status``: a
+reverse-seeking tail, time-range and alert-type filtering, and ``follow``.
+
+Index record layout (little endian)::
+
+    float64 unix_timestamp | uint64 byte_offset
+"""
+from __future__ import annotations
+
+import bisect
+import fcntl
+import gzip
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+_ENTRY = struct.Struct("<dQ")
+_INDEX_SUFFIX = ".idx"
+_READ_CHUNK = 64 * 1024
+
+# (timestamp, offset); offsets are compressed offsets for .gz segments
+IndexEntry = Tuple[float, int]
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + _INDEX_SUFFIX)
+
+
+def _segment_path(path: Path, number: int) -> Path:
+    return path.with_name(f"{path.name}.{number}.gz")
+
+
+def read_index(path: Path) -> List[IndexEntry]:
+    """Load the sidecar index of ``path`` (a log file or gzip segment)."""
+
+    try:
+        data = _index_path(path).read_bytes()
+    except FileNotFoundError:
+        return []
+    usable = len(data) - len(data) % _ENTRY.size  # ignore a torn final entry
+    entries = [_ENTRY.unpack_from(data, offset) for offset in range(0, usable, _ENTRY.size)]
+    # Several processes may append to the same log; keep entries in file order.
+    entries.sort(key=lambda entry: entry[1])
+    return entries
+
+
+def line_time(line: str) -> Optional[float]:
+    """Timestamp of a ``logging`` line (``2024-01-31 12:00:00,123 ...``)."""
+
+    if len(line) < 23 or line[4] != "-" or line[10] != " " or line[19] != ",":
+        return None
+    try:
+        return time.mktime(time.strptime(line[:19], "%Y-%m-%d %H:%M:%S")) + int(line[20:23]) / 1000
+    except ValueError:
+        return None
+
+
+def line_type(line: str) -> Optional[str]:
+    """Alert ``type`` of a reporter JSON line, ``None`` for log records."""
+
+    if not line.startswith("{"):
+        return None
+    try:
+        payload = json.loads(line)
+    except ValueError:
+        return None
+    return payload.get("type") if isinstance(payload, dict) else None
+
+
+# ----------------------------------------------------------------------------
+# Writing
+# ----------------------------------------------------------------------------
+
+@dataclass
+class LogStoreConfig:
+    path: Path
+    max_bytes: int = 16 * 1024 * 1024
+    backups: int = 5
+    index_every: int = 64 * 1024
+
+
+class LogStore:
+    """Append-only log file with a sparse time index and gzip rotation.
+
+    One instance is shared per path (see :meth:`for_path`) so the logging
+    handler and the reporter's local log never race each other inside a
+    process. Other processes appending to the same file are tolerated:
+    rotation is serialised with ``flock`` and writers reopen the file when
+    they notice it has been rotated underneath them.
+    """
+
+    _stores: Dict[Path, "LogStore"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, config: LogStoreConfig) -> None:
+        self.config = config
+        self._lock = threading.Lock()
+        self._handle = None
+        self._index = None
+        self._next_index = 0
+
+    @classmethod
+    def for_path(cls, path: Path, **overrides) -> "LogStore":
+        """Return the process-wide store for ``path``, updating its limits."""
+
+        resolved = Path(path).resolve()
+        with cls._registry_lock:
+            store = cls._stores.get(resolved)
+            if store is None:
+                store = cls(LogStoreConfig(path=resolved))
+                cls._stores[resolved] = store
+        for key, value in overrides.items():
+            if value is not None:
+                setattr(store.config, key, value)
+        return store
+
+    def _open(self) -> None:
+        path = self.config.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = open(path, "ab")
+        self._index = open(_index_path(path), "ab")
+        size = os.fstat(self._handle.fileno()).st_size
+        last_offset = None
+        usable = os.fstat(self._index.fileno()).st_size // _ENTRY.size * _ENTRY.size
+        if usable:
+            with open(_index_path(path), "rb") as index:
+                index.seek(usable - _ENTRY.size)
+                _, last_offset = _ENTRY.unpack(index.read(_ENTRY.size))
+        if last_offset is None:
+            # A log written before indexing existed starts its index here.
+            self._next_index = size
+        else:
+            self._next_index = last_offset + self.config.index_every
+
+    def _close_handles(self) -> None:
+        for handle in (self._handle, self._index):
+            if handle is not None:
+                handle.close()
+        self._handle = self._index = None
+
+    def _rotated_elsewhere(self) -> bool:
+        try:
+            return os.stat(self.config.path).st_ino != os.fstat(self._handle.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def write(self, text: str, timestamp: Optional[float] = None) -> None:
+        """Append ``text`` (whole lines) and index it under ``timestamp``."""
+
+        data = text.encode("utf-8")
+        with self._lock:
+            if self._handle is None:
+                self._open()
+            elif self._rotated_elsewhere():
+                self._close_handles()
+                self._open()
+            offset = os.fstat(self._handle.fileno()).st_size
+            if offset >= self._next_index:
+                self._index.write(_ENTRY.pack(timestamp or time.time(), offset))
+                self._index.flush()
+                self._next_index = offset + self.config.index_every
+            self._handle.write(data)
+            self._handle.flush()
+            if offset + len(data) >= self.config.max_bytes:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        path = self.config.path
+        lock_path = path.with_name(path.name + ".lock")
+        with open(lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if self._rotated_elsewhere():
+                self._close_handles()
+                self._open()
+                return
+            self._close_handles()
+            staged = path.with_name(path.name + ".rotating")
+            os.replace(path, staged)
+            if _index_path(path).exists():
+                os.replace(_index_path(path), _index_path(staged))
+            for number in range(self.config.backups, 0, -1):
+                older = _segment_path(path, number)
+                if not older.exists():
+                    continue
+                if number == self.config.backups:
+                    older.unlink()
+                    _index_path(older).unlink(missing_ok=True)
+                else:
+                    os.replace(older, _segment_path(path, number + 1))
+                    if _index_path(older).exists():
+                        os.replace(_index_path(older), _index_path(_segment_path(path, number + 1)))
+            if self.config.backups > 0:
+                compress_segment(staged, _segment_path(path, 1))
+            staged.unlink()
+            _index_path(staged).unlink(missing_ok=True)
+        self._open()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_handles()
+
+
+def compress_segment(source: Path, destination: Path) -> None:
+    """Gzip ``source`` one index block per member, writing a seekable index."""
+
+    entries = read_index(source)
+    if not entries or entries[0][1] != 0:
+        # Unindexed prefix (a log that predates indexing): time unknown.
+        entries.insert(0, (0.0, 0))
+    size = source.stat().st_size
+    tmp = destination.with_name(destination.name + ".tmp")
+    tmp_index = _index_path(tmp)
+    with source.open("rb") as reader, tmp.open("wb") as writer, tmp_index.open("wb") as index:
+        for position, (timestamp, start) in enumerate(entries):
+            end = entries[position + 1][1] if position + 1 < len(entries) else size
+            if end <= start:
+                continue
+            reader.seek(start)
+            index.write(_ENTRY.pack(timestamp, writer.tell()))
+            writer.write(gzip.compress(reader.read(end - start)))
+        writer.flush()
+        os.fsync(writer.fileno())
+    os.replace(tmp, destination)
+    os.replace(tmp_index, _index_path(destination))
+
+
+class LogStoreHandler(logging.Handler):
+    """``logging`` handler that writes through a :class:`LogStore`."""
+
+    def __init__(self, store: LogStore) -> None:
+        super().__init__()
+        self.store = store
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.store.write(self.format(record) + "\n", record.created)
+        except Exception:  # pragma: no cover - logging must never raise
+            self.handleError(record)
+
+
+# ----------------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------------
+
+@dataclass
+class _Segment:
+    path: Path
+    compressed: bool
+    entries: List[IndexEntry]
+
+    @property
+    def start_time(self) -> Optional[float]:
+        return self.entries[0][0] if self.entries else None
+
+
+class LogReader:
+    """Query a :class:`LogStore` file and its rotated gzip segments."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def segments(self) -> List[_Segment]:
+        """All segments, oldest first; the live file (if any) is last."""
+
+        numbered = []
+        for candidate in self.path.parent.glob(f"{self.path.name}.*.gz"):
+            number = candidate.name[len(self.path.name) + 1 : -len(".gz")]
+            if number.isdigit():
+                numbered.append((int(number), candidate))
+        segments = [
+            _Segment(candidate, True, read_index(candidate))
+            for _, candidate in sorted(numbered, reverse=True)
+        ]
+        if self.path.exists():
+            segments.append(_Segment(self.path, False, read_index(self.path)))
+        return segments
+
+    # ------------------------------------------------------------------
+    # Tail
+    # ------------------------------------------------------------------
+    def tail(self, count: int, types: Optional[Iterable[str]] = None) -> List[str]:
+        """Last ``count`` lines (optionally only alerts of ``types``)."""
+
+        wanted = set(types or ())
+        lines: List[str] = []
+        for segment in reversed(self.segments()):
+            for line in self._reverse_lines(segment):
+                if wanted and line_type(line) not in wanted:
+                    continue
+                lines.append(line)
+                if len(lines) >= count:
+                    return lines[::-1]
+        return lines[::-1]
+
+    def _reverse_lines(self, segment: _Segment) -> Iterator[str]:
+        if not segment.compressed:
+            yield from _reverse_file_lines(segment.path)
+            return
+        with segment.path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if not segment.entries:
+                text = gzip.decompress(handle.read()).decode("utf-8", "replace")
+                yield from reversed(text.splitlines())
+                return
+            ends = [offset for _, offset in segment.entries[1:]] + [size]
+            for (_, start), end in reversed(list(zip(segment.entries, ends))):
+                handle.seek(start)
+                block = zlib.decompress(handle.read(end - start), wbits=31)
+                yield from reversed(block.decode("utf-8", "replace").splitlines())
+
+    # ------------------------------------------------------------------
+    # Time range
+    # ------------------------------------------------------------------
+    def iter_range(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        types: Optional[Iterable[str]] = None,
+    ) -> Iterator[str]:
+        """Yield lines logged between ``since`` and ``until`` in order.
+
+        Reporter JSON lines carry no timestamp of their own; they inherit
+        the time of the preceding log record (or index entry).
+        """
+
+        wanted = set(types or ())
+        segments = self.segments()
+        for position, segment in enumerate(segments):
+            following = segments[position + 1].start_time if position + 1 < len(segments) else None
+            if since is not None and following is not None and following < since:
+                continue  # every line here predates the window
+            if until is not None and segment.start_time is not None and segment.start_time > until:
+                return
+            current, lines = self._lines_from(segment, since)
+            for line in lines:
+                current = line_time(line) or current
+                if since is not None and current < since:
+                    continue
+                if until is not None and current > until:
+                    return
+                if wanted and line_type(line) not in wanted:
+                    continue
+                yield line
+
+    @staticmethod
+    def _lines_from(segment: _Segment, since: Optional[float]) -> Tuple[float, Iterator[str]]:
+        entries = segment.entries
+        if entries and entries[0][1] != 0:
+            entries = [(0.0, 0)] + entries
+        position = 0
+        if since is not None and entries:
+            position = max(0, bisect.bisect_right([entry[0] for entry in entries], since) - 1)
+        start_time, offset = entries[position] if entries else (0.0, 0)
+
+        def lines() -> Iterator[str]:
+            with segment.path.open("rb") as handle:
+                handle.seek(offset)
+                stream = gzip.GzipFile(fileobj=handle) if segment.compressed else handle
+                for raw in stream:
+                    yield raw.decode("utf-8", "replace").rstrip("\n")
+
+        return start_time, lines()
+
+    # ------------------------------------------------------------------
+    # Follow
+    # ------------------------------------------------------------------
+    def follow(
+        self,
+        types: Optional[Iterable[str]] = None,
+        poll_seconds: float = 0.5,
+        stop: Optional[threading.Event] = None,
+    ) -> Iterator[str]:
+        """Yield lines appended after the call, surviving rotation."""
+
+        wanted = set(types or ())
+        stop = stop or threading.Event()
+        handle = None
+        inode = None
+        from_start = not self.path.exists()
+        pending = b""
+        try:
+            while not stop.is_set():
+                if handle is None:
+                    try:
+                        handle = self.path.open("rb")
+                    except FileNotFoundError:
+                        from_start = True
+                        stop.wait(poll_seconds)
+                        continue
+                    inode = os.fstat(handle.fileno()).st_ino
+                    if not from_start:
+                        handle.seek(0, os.SEEK_END)
+                    pending = b""
+                chunk = handle.read()
+                if chunk:
+                    pending += chunk
+                    *complete, pending = pending.split(b"\n")
+                    for raw in complete:
+                        line = raw.decode("utf-8", "replace")
+                        if not wanted or line_type(line) in wanted:
+                            yield line
+                    continue
+                try:
+                    stat = os.stat(self.path)
+                except FileNotFoundError:
+                    stat = None
+                if stat is None or stat.st_ino != inode or stat.st_size < handle.tell():
+                    # Rotated or truncated and the old handle is drained:
+                    # continue from the top of the new file.
+                    handle.close()
+                    handle = None
+                    from_start = True
+                    continue
+                stop.wait(poll_seconds)
+        finally:
+            if handle is not None:
+                handle.close()
+
+
+def _reverse_file_lines(path: Path) -> Iterator[str]:
+    """Yield lines of a plain file last-first, reading backwards in chunks."""
+
+    with path.open("rb") as handle:
+        position = os.fstat(handle.fileno()).st_size
+        remainder = b""
+        while position > 0:
+            step = min(_READ_CHUNK, position)
+            position -= step
+            handle.seek(position)
+            buffer = handle.read(step) + remainder
+            lines = buffer.split(b"\n")
+            remainder = lines.pop(0)
+            for raw in reversed(lines):
+                if raw:
+                    yield raw.decode("utf-8", "replace")
+        if remainder:
+            yield remainder.decode("utf-8", "replace")
+
+
+__all__ = [
+    "LogReader",
+    "LogStore",
+    "LogStoreConfig",
+    "LogStoreHandler",
+    "compress_segment",
+    "line_time",
+    "line_type",
+    "read_index",
+]
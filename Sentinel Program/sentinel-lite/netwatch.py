@@ -1,8 +1,9 @@
 """Network monitoring for Sentinel Lite.
 
-This module inspects outbound connections using psutil and flags any
-connection that is not routed through the configured VPN interface or
-outside an allowlist of remote endpoints.
+This module inspects outbound connections and flags any connection that
+is not routed through the configured VPN interface or outside an allowlist
+of remote endpoints. Socket tables are read through :mod:`sockscan`
+(sock_diag netlink, ``/proc/net`` or psutil, whichever is available).
 
 Example usage:
     from netwatch import NetWatcher
@@ -16,18 +17,15 @@ import json
 import logging
 import os
 import subprocess
+import time
 from dataclasses import dataclass, field
-from typing import Iterable, List, Optional, Set
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
 
-try:
-    import psutil
-except ImportError:  # pragma: no cover - handled gracefully in runtime
-    psutil = None  # type: ignore
-
-try:  # scapy is optional; we use it only when available.
-    from scapy.all import conf as scapy_conf  # type: ignore
-except Exception:  # pragma: no cover - scapy may not be installed
-    scapy_conf = None
+from allowlist import IpAllowlist
+from accounting import charge
+from flowtable import Flow, FlowTable
+from optional import optional_import
+from sockscan import Connection, ProcNetScanner, build_scanner, interface_signature, resolve_socket_pids
 
 LOGGER = logging.getLogger("sentinel.netwatch")
 
@@ -39,6 +37,15 @@ class NetWatcherConfig:
     vpn_interface: str = "tun0"
     allowlisted_remote_ips: Set[str] = field(default_factory=set)
     nordvpn_binary: str = "nordvpn"
+    scanner: str = "auto"  # netlink, procfs, psutil or auto
+    vpn_ip_ttl: float = 300.0
+    report_new_only: bool = True
+    allowlist_refresh_seconds: float = 600.0
+    max_flows: int = 10000
+    alert_rate_per_minute: float = 6.0
+    alert_burst: int = 3
+    summary_interval_seconds: float = 300.0
+    flow_idle_timeout_seconds: float = 3600.0
 
 
 class NetWatcher:
@@ -48,6 +55,20 @@ class NetWatcher:
         if config is None:
             config = self._load_config_from_env()
         self.config = config
+        # Entries may be IPs, CIDRs or hostnames; see :mod:`allowlist`.
+        self.allowlist = IpAllowlist(
+            config.allowlisted_remote_ips, refresh_seconds=config.allowlist_refresh_seconds
+        )
+        self.allowlist.start()
+        self._scanner = None
+        self.flows = FlowTable(
+            max_flows=config.max_flows,
+            alert_rate=config.alert_rate_per_minute / 60.0,
+            alert_burst=config.alert_burst,
+            summary_interval=config.summary_interval_seconds,
+            idle_timeout=config.flow_idle_timeout_seconds,
+        )
+        self._vpn_cache: Optional[Tuple[Optional[str], float, object]] = None
         LOGGER.debug("NetWatcher initialised with config: %s", self.config)
 
     def _load_config_from_env(self) -> NetWatcherConfig:
@@ -69,31 +90,81 @@ class NetWatcher:
     # Public API
     # ------------------------------------------------------------------
     def scan_connections(self) -> Iterable[dict]:
-        """Yield alerts for connections that violate VPN policy.
+        """Return alerts for connections that violate VPN policy.
 
-        Returns dictionaries that can be forwarded to :mod:`reporter`.
+        With ``report_new_only`` (the default) suspicious flows, keyed on
+        (laddr, raddr, pid), raise one alert when first seen, subject to a
+        per-remote token bucket, and a ``flow_summary`` alert periodically
+        describes the flows still open. Returns dictionaries that can be
+        forwarded to :mod:`reporter`.
         """
 
         LOGGER.debug("Starting connection scan")
-        vpn_ip = self._discover_vpn_ip()
+        vpn_ip = self._cached_vpn_ip()
         LOGGER.debug("Active VPN IP: %s", vpn_ip)
 
-        if psutil is None:
-            LOGGER.warning("psutil not installed; skipping network scan")
+        if self._get_scanner() is None:
+            LOGGER.warning("No socket scanner available; skipping network scan")
             return []
 
-        suspicious: List[dict] = []
-        for conn in psutil.net_connections(kind="inet"):
-            if not conn.raddr:
-                continue
+        now = time.time()
+        pending: List[Tuple[Connection, Optional[Flow]]] = []
+        for conn in self._scan():
             remote_ip = self._extract_ip(conn.raddr)
             local_ip = self._extract_ip(conn.laddr)
-            if self._is_suspicious(local_ip, remote_ip, vpn_ip):
-                alert = self._format_alert(conn, vpn_ip)
-                LOGGER.debug("Suspicious connection found: %s", alert)
-                suspicious.append(alert)
+            if not self._is_suspicious(local_ip, remote_ip, vpn_ip):
+                continue
+            if not self.config.report_new_only:
+                pending.append((conn, None))
+                continue
+            flow, is_new = self.flows.observe(
+                (conn.laddr, conn.raddr, conn.pid), local_ip, remote_ip, now
+            )
+            if is_new and self.flows.allow_alert(remote_ip, now):
+                pending.append((conn, flow))
+
+        pids = resolve_socket_pids(conn.inode for conn, _ in pending if conn.pid is None)
+        suspicious: List[dict] = []
+        for conn, flow in pending:
+            if conn.pid is None and conn.inode in pids:
+                conn = conn._replace(pid=pids[conn.inode])
+            if flow is not None:
+                flow.pid = conn.pid
+            alert = self._format_alert(conn, vpn_ip)
+            LOGGER.debug("Suspicious connection found: %s", alert)
+            suspicious.append(alert)
+        if self.config.report_new_only:
+            summary = self.flows.summary(now)
+            if summary:
+                suspicious.append(summary)
         return suspicious
 
+    def _get_scanner(self):
+        if self._scanner is None:
+            self._scanner = build_scanner(self.config.scanner)
+        return self._scanner
+
+    def _scan(self) -> Iterator[Connection]:
+        seen = set()
+        try:
+            try:
+                for conn in self._scanner.scan():
+                    seen.add(conn.key)
+                    yield conn
+            except OSError:
+                if isinstance(self._scanner, ProcNetScanner) or not ProcNetScanner.available():
+                    raise
+                LOGGER.warning(
+                    "%s socket scan failed; falling back to /proc/net", self._scanner.name, exc_info=True
+                )
+                self._scanner = ProcNetScanner()
+                for conn in self._scanner.scan():
+                    if conn.key not in seen:
+                        seen.add(conn.key)
+                        yield conn
+        finally:
+            charge(sockets=len(seen))
+
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
@@ -104,6 +175,21 @@ class NetWatcher:
             return endpoint[0]
         return str(endpoint)
 
+    def _cached_vpn_ip(self) -> Optional[str]:
+        """Return the VPN IP, re-discovering it on TTL expiry or interface change."""
+
+        signature = interface_signature(self.config.vpn_interface)
+        now = time.monotonic()
+        if self._vpn_cache is not None:
+            vpn_ip, expires_at, cached_signature = self._vpn_cache
+            if now < expires_at and signature == cached_signature:
+                return vpn_ip
+            if signature != cached_signature:
+                LOGGER.info("Interface %s changed; refreshing VPN IP", self.config.vpn_interface)
+        vpn_ip = self._discover_vpn_ip()
+        self._vpn_cache = (vpn_ip, now + self.config.vpn_ip_ttl, signature)
+        return vpn_ip
+
     def _discover_vpn_ip(self) -> Optional[str]:
         """Attempt to detect the VPN IP via nordvpn or scapy."""
 
@@ -119,6 +205,9 @@ class NetWatcher:
         except (FileNotFoundError, subprocess.CalledProcessError, json.JSONDecodeError):
             LOGGER.debug("Falling back to scapy for VPN detection", exc_info=True)
 
+        # scapy is optional and slow to import; only load it for this fallback.
+        scapy = optional_import("scapy.all")
+        scapy_conf = getattr(scapy, "conf", None)
         if scapy_conf and getattr(scapy_conf, "route", None):
             try:
                 vpn_route = next(
@@ -136,7 +225,7 @@ class NetWatcher:
         return None
 
     def _is_suspicious(self, local_ip: str, remote_ip: str, vpn_ip: Optional[str]) -> bool:
-        if remote_ip in self.config.allowlisted_remote_ips:
+        if remote_ip in self.allowlist:
             return False
         if vpn_ip and remote_ip == vpn_ip:
             return False
@@ -144,6 +233,11 @@ class NetWatcher:
             return False
         return True
 
+    def close(self) -> None:
+        """Stop the background hostname resolver."""
+
+        self.allowlist.stop()
+
     def _format_alert(self, conn, vpn_ip: Optional[str]) -> dict:
         alert = {
             "type": "network",
@@ -151,6 +245,7 @@ class NetWatcher:
             "remote": self._extract_ip(conn.raddr),
             "status": "outside_vpn",
             "vpn_ip": vpn_ip,
+            "pid": getattr(conn, "pid", None),
         }
         return alert
 
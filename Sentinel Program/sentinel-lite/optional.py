@@ -0,0 +1,47 @@
+"""Deferred imports of optional dependencies for Sentinel Lite.
+
+psutil, scapy, watchdog, paramiko and requests are each needed by only some
+code paths, and several are slow to import (scapy alone can take over a
+second on a Raspberry Pi). Modules call :func:`optional_import` at the point
+of use instead of importing at module load, so commands such as
+``sentinelctl status`` never pay for them. Results, including failures, are
+cached, and import times are kept for ``sentinelctl --profile-startup``.
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Dict, Optional
+
+LOGGER = logging.getLogger("sentinel.optional")
+
+_modules: Dict[str, Optional[ModuleType]] = {}
+_lock = threading.Lock()
+
+# module name -> seconds spent importing it
+import_timings: Dict[str, float] = {}
+
+
+def optional_import(name: str) -> Optional[ModuleType]:
+    """Import ``name`` on first use, returning ``None`` if it is unavailable."""
+
+    if name in _modules:
+        return _modules[name]
+    with _lock:
+        if name in _modules:
+            return _modules[name]
+        started = time.perf_counter()
+        try:
+            module: Optional[ModuleType] = importlib.import_module(name)
+        except Exception:  # scapy raises more than ImportError on odd hosts
+            LOGGER.debug("Optional dependency %s unavailable", name, exc_info=True)
+            module = None
+        import_timings[name] = time.perf_counter() - started
+        _modules[name] = module
+        return module
+
+
+__all__ = ["import_timings", "optional_import"]
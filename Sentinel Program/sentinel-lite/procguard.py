@@ -2,23 +2,24 @@
 
 Watches a list of critical executables and compares their SHA-256 hashes
 against a baseline. When a deviation is observed an alert dictionary is
-returned so :mod:`reporter` can forward the event.
+returned so :mod:`reporter` can forward the event. Files at or above
+``chunk_threshold`` are baselined per chunk (see :mod:`chunking`) so the
+alert names the byte ranges that changed.
 """
 from __future__ import annotations
 
-import hashlib
 import json
 import logging
+import threading
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
-try:
-    from watchdog.events import FileSystemEventHandler
-    from watchdog.observers import Observer
-except ImportError:  # pragma: no cover - optional dependency
-    FileSystemEventHandler = object  # type: ignore
-    Observer = None  # type: ignore
+from baselinestore import KIND_BYTES, KIND_SHA256, BaselineStore, CorruptRecordError
+from chunking import ChunkedDigest, ChunkSpec, ManifestEntry, changed_ranges, entry_digest, is_chunked
+from hashing import HashEngine
+from optional import optional_import
 
 LOGGER = logging.getLogger("sentinel.procguard")
 
@@ -27,111 +28,307 @@ LOGGER = logging.getLogger("sentinel.procguard")
 class ProcGuardConfig:
     critical_paths: List[Path] = field(default_factory=list)
     manifest_path: Path = Path("hash_manifest.json")
+    coalesce_seconds: float = 1.0
+    chunk_threshold: int = 0  # baseline files this large per chunk; 0 disables
+    chunking: ChunkSpec = field(default_factory=ChunkSpec)
+
+
+def _encode_key(path) -> bytes:
+    return str(path).encode("utf-8", "surrogateescape")
+
+
+def _encode_entry(entry: ManifestEntry):
+    if isinstance(entry, str) and len(entry) == 64:
+        try:
+            return KIND_SHA256, bytes.fromhex(entry)
+        except ValueError:
+            pass
+    return KIND_BYTES, json.dumps(entry, sort_keys=True).encode("utf-8")
+
+
+def _decode_entry(kind: int, value: bytes) -> ManifestEntry:
+    if kind == KIND_SHA256:
+        return value.hex()
+    return json.loads(value)
 
 
 class HashBaseline:
-    """Helper object for storing and updating baseline hashes."""
+    """Baseline hashes kept in a :class:`baselinestore.BaselineStore`.
+
+    Changes made with :meth:`set` are held in memory until :meth:`save`
+    appends them to the store's log. A ``manifest_path`` ending in ``.json``
+    is treated as the legacy manifest: the store lives next to it with a
+    ``.db`` suffix and imports the JSON the first time it is created.
+    """
 
     def __init__(self, manifest_path: Path) -> None:
         self.manifest_path = manifest_path
-        self._hashes: Dict[str, str] = {}
+        self.store_path = manifest_path.with_suffix(".db") if manifest_path.suffix == ".json" else manifest_path
+        self._pending: Dict[str, ManifestEntry] = {}
+        self.corrupt = False
         self._load()
 
     def _load(self) -> None:
-        if self.manifest_path.exists():
+        created = not (self.store_path.exists() or self.store_path.with_name(self.store_path.name + ".log").exists())
+        try:
+            self._store = BaselineStore(self.store_path)
+        except CorruptRecordError as exc:
+            # Keep the damaged files for forensics and make the reset visible.
+            suffix = f".corrupt-{int(time.time())}"
+            for damaged in (self.store_path, self.store_path.with_name(self.store_path.name + ".log")):
+                if damaged.exists():
+                    damaged.rename(damaged.with_name(damaged.name + suffix))
+            LOGGER.error("%s; moved aside with suffix %s and starting an empty baseline", exc, suffix)
+            self.corrupt = True
+            self._store = BaselineStore(self.store_path)
+            return
+        legacy = self.store_path.with_suffix(".json")
+        if created and legacy.exists():
             try:
-                self._hashes = json.loads(self.manifest_path.read_text())
+                hashes = json.loads(legacy.read_text())
             except json.JSONDecodeError:
-                LOGGER.warning("Manifest corrupted; starting with empty baseline")
-                self._hashes = {}
+                LOGGER.warning("Legacy manifest %s corrupted; not importing it", legacy)
+                return
+            self._store.put_many(
+                (_encode_key(path), *_encode_entry(entry)) for path, entry in sorted(hashes.items())
+            )
+            LOGGER.info("Imported %s baseline hashes from %s into %s", len(hashes), legacy.name, self.store_path.name)
 
     def save(self) -> None:
-        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
-        self.manifest_path.write_text(json.dumps(self._hashes, indent=2, sort_keys=True))
+        pending, self._pending = self._pending, {}
+        self._store.put_many((_encode_key(path), *_encode_entry(entry)) for path, entry in pending.items())
 
     def get(self, path: Path) -> Optional[str]:
-        return self._hashes.get(str(path))
+        """Digest to compare against: the SHA-256 or, if chunked, the Merkle root."""
+
+        return entry_digest(self.entry(path))
+
+    def entry(self, path: Path) -> Optional[ManifestEntry]:
+        """Baseline entry for ``path``; raises :class:`CorruptRecordError` on a bad record."""
 
-    def set(self, path: Path, digest: str) -> None:
-        self._hashes[str(path)] = digest
+        key = str(path)
+        if key in self._pending:
+            return self._pending[key]
+        record = self._store.get(_encode_key(key))
+        return None if record is None else _decode_entry(*record)
+
+    def set(self, path: Path, digest: ManifestEntry) -> None:
+        self._pending[str(path)] = digest
 
     def items(self):
-        return self._hashes.items()
+        merged = {
+            key.decode("utf-8", "surrogateescape"): _decode_entry(*record) for key, record in self._store.items()
+        }
+        merged.update(self._pending)
+        return merged.items()
+
+    def close(self) -> None:
+        self._store.close()
 
 
 class ProcGuard:
     """Hash critical executables and watch for changes."""
 
-    def __init__(self, config: ProcGuardConfig) -> None:
+    def __init__(self, config: ProcGuardConfig, hasher: Optional[HashEngine] = None) -> None:
         self.config = config
+        self.hasher = hasher or HashEngine()
         self.baseline = HashBaseline(config.manifest_path)
-        self._observer: Optional[Observer] = None
+        self._observer = None
+        self._handler: Optional["_CriticalPathHandler"] = None
+        self._index: Dict[str, Path] = {}
+        self._lock = threading.RLock()
 
     def compute_hash(self, path: Path) -> str:
-        digest = hashlib.sha256()
-        with path.open("rb") as file:
-            for chunk in iter(lambda: file.read(8192), b""):
-                digest.update(chunk)
-        return digest.hexdigest()
+        return self.hasher.hash_file(path)
+
+    def _chunk_spec(self, path: Path, refresh: bool = False) -> Optional[ChunkSpec]:
+        """How ``path`` is hashed: as its baseline entry was, or by size."""
+
+        try:
+            entry = None if refresh else self.baseline.entry(path)
+        except CorruptRecordError:
+            return None  # _evaluate reports it
+        if is_chunked(entry):
+            return ChunkSpec.from_entry(entry)
+        if entry is None and self.config.chunk_threshold > 0:
+            try:
+                if path.stat().st_size >= self.config.chunk_threshold:
+                    return self.config.chunking
+            except OSError:
+                return None
+        return None
+
+    def _chunk_specs(self, paths: Iterable[Path], refresh: bool = False) -> Dict[Path, ChunkSpec]:
+        specs = {}
+        for path in paths:
+            spec = self._chunk_spec(path, refresh)
+            if spec is not None:
+                specs[path] = spec
+        return specs
 
     def refresh_baseline(self) -> None:
-        for path in self.config.critical_paths:
-            if path.exists():
-                self.baseline.set(path, self.compute_hash(path))
+        existing = [path for path in self.config.critical_paths if path.exists()]
+        for result in self.hasher.hash_many(existing, self._chunk_specs(existing, refresh=True)):
+            if result.error is not None:
+                LOGGER.warning("Unable to hash %s: %s", result.path, result.error)
+                continue
+            self.baseline.set(result.path, result.chunks.to_entry() if result.chunks else result.digest)
         self.baseline.save()
 
-    def compare(self) -> Iterable[dict]:
-        alerts = []
-        for path in self.config.critical_paths:
-            if not path.exists():
-                continue
-            actual = self.compute_hash(path)
-            expected = self.baseline.get(path)
-            if expected is None:
-                self.baseline.set(path, actual)
-                continue
-            if actual != expected:
-                alert = {
-                    "type": "process",
-                    "path": str(path),
-                    "expected": expected,
-                    "actual": actual,
-                    "status": "hash_mismatch",
-                }
-                LOGGER.debug("Hash mismatch detected for %s", path)
-                alerts.append(alert)
-        if alerts:
+    def _evaluate(self, path: Path, actual: str, chunks: Optional[ChunkedDigest] = None) -> Optional[dict]:
+        with self._lock:
+            try:
+                entry = self.baseline.entry(path)
+            except CorruptRecordError as exc:
+                LOGGER.error("%s", exc)
+                return {"type": "process", "path": str(path), "status": "baseline_corrupt"}
+            if entry is None:
+                self.baseline.set(path, chunks.to_entry() if chunks else actual)
+                return None
+        expected = entry_digest(entry)
+        if actual == expected:
+            return None
+        LOGGER.debug("Hash mismatch detected for %s", path)
+        alert = {
+            "type": "process",
+            "path": str(path),
+            "expected": expected,
+            "actual": actual,
+            "status": "hash_mismatch",
+        }
+        if chunks is not None and is_chunked(entry):
+            alert["ranges"] = changed_ranges(entry, chunks)
+        return alert
+
+    def _save_baseline(self) -> None:
+        with self._lock:
             self.baseline.save()
-        return alerts
+
+    def iter_compare(self) -> Iterator[dict]:
+        """Yield mismatch alerts as soon as each critical path is hashed."""
+
+        if self.baseline.corrupt:
+            self.baseline.corrupt = False
+            yield {"type": "process", "path": str(self.baseline.store_path), "status": "baseline_corrupt"}
+        existing = [path for path in self.config.critical_paths if path.exists()]
+        try:
+            for result in self.hasher.hash_many(existing, self._chunk_specs(existing)):
+                if result.error is not None:
+                    LOGGER.warning("Unable to hash %s: %s", result.path, result.error)
+                    continue
+                alert = self._evaluate(result.path, result.digest, result.chunks)
+                if alert:
+                    yield alert
+        finally:
+            # Appends only newly baselined paths; mismatches never overwrite.
+            self._save_baseline()
+
+    def compare(self) -> Iterable[dict]:
+        return list(self.iter_compare())
+
+    def check_path(self, path: Path) -> Optional[dict]:
+        """Rehash a single critical path and return an alert on mismatch."""
+
+        chunks = None
+        try:
+            spec = self._chunk_spec(path)
+            if spec is None:
+                actual = self.compute_hash(path)
+            else:
+                chunks = self.hasher.hash_chunked(path, spec)
+                actual = chunks.root
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            LOGGER.warning("Unable to hash %s: %s", path, exc)
+            return None
+        alert = self._evaluate(path, actual, chunks)
+        self._save_baseline()
+        return alert
 
     # ---------------------------- Watchdog support ----------------------------
     def start_watchdog(self, callback) -> None:
-        if Observer is None:
+        observers = optional_import("watchdog.observers")
+        if observers is None:
             LOGGER.warning("watchdog not available; cannot enable realtime monitoring")
             return
 
-        class Handler(FileSystemEventHandler):
-            def on_modified(self, event):  # type: ignore[override]
-                if not event.is_directory and Path(event.src_path) in self.config.critical_paths:
-                    LOGGER.info("Realtime hash alert triggered for %s", event.src_path)
-                    for alert in self.compare():
-                        callback(alert)
-
-        observer = Observer()
-        for critical in self.config.critical_paths:
-            target = critical.parent
+        self._index = {str(path): path for path in self.config.critical_paths}
+        handler = _CriticalPathHandler(self, callback)
+        observer = observers.Observer()
+        directories = {path.parent for path in self.config.critical_paths}
+        for target in sorted(directories):
             if not target.exists():
                 LOGGER.warning("Cannot watch %s; parent directory missing", target)
                 continue
-            observer.schedule(Handler(), path=str(target), recursive=False)
+            observer.schedule(handler, path=str(target), recursive=False)
         observer.start()
         self._observer = observer
+        self._handler = handler
+        LOGGER.info(
+            "Realtime monitoring of %s critical paths across %s directories",
+            len(self._index),
+            len(directories),
+        )
 
     def stop_watchdog(self) -> None:
         if self._observer:
             self._observer.stop()
             self._observer.join()
             self._observer = None
+        if self._handler:
+            self._handler.cancel()
+            self._handler = None
+
+
+class _CriticalPathHandler:
+    """Route watchdog events for indexed critical paths to :class:`ProcGuard`.
+
+    Bursts of events for the same path are coalesced: the first event arms a
+    timer and the file is rehashed once when it fires.
+    """
+
+    def __init__(self, guard: ProcGuard, callback) -> None:
+        self.guard = guard
+        self.callback = callback
+        self._timers: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def dispatch(self, event) -> None:
+        # watchdog observers only call dispatch(); no base class needed.
+        self.on_any_event(event)
+
+    def on_any_event(self, event) -> None:
+        if event.is_directory:
+            return
+        for raw in (event.src_path, getattr(event, "dest_path", "")):
+            path = self.guard._index.get(raw) if raw else None
+            if path is not None:
+                self._schedule(raw, path)
+
+    def _schedule(self, key: str, path: Path) -> None:
+        with self._lock:
+            if key in self._timers:
+                return
+            timer = threading.Timer(self.guard.config.coalesce_seconds, self._fire, args=(key, path))
+            timer.daemon = True
+            self._timers[key] = timer
+        timer.start()
+
+    def _fire(self, key: str, path: Path) -> None:
+        with self._lock:
+            self._timers.pop(key, None)
+        alert = self.guard.check_path(path)
+        if alert:
+            LOGGER.info("Realtime hash alert triggered for %s", path)
+            self.callback(alert)
+
+    def cancel(self) -> None:
+        with self._lock:
+            timers = list(self._timers.values())
+            self._timers.clear()
+        for timer in timers:
+            timer.cancel()
 
 
 __all__ = ["ProcGuard", "ProcGuardConfig"]
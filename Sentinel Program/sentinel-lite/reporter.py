@@ -5,19 +5,14 @@ import json
 import logging
 import queue
 import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-try:
-    import requests
-except ImportError:  # pragma: no cover - optional dependency
-    requests = None  # type: ignore
-
-try:
-    import paramiko
-except ImportError:  # pragma: no cover - optional dependency
-    paramiko = None  # type: ignore
+from logstore import LogStore
+from optional import optional_import
+from spool import DROP_OLDEST, Spool, SpoolConfig, SpoolLockedError
 
 LOGGER = logging.getLogger("sentinel.reporter")
 
@@ -30,62 +25,225 @@ class ReporterConfig:
     ssh_username: Optional[str] = None
     ssh_key_path: Optional[str] = None
     local_log_path: str = "logs/sentinel.log"
+    batch_size: int = 50
+    # HTTPS receivers get one JSON object per POST unless they opt in to
+    # arrays; batching then only applies to SSH.
+    https_array: bool = False
+    batch_interval: float = 1.0
+    max_retries: int = 5
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+    spool_dir: Optional[str] = None  # durable on-disk queue instead of memory
+    spool_max_bytes: int = 64 * 1024 * 1024
+    spool_policy: str = DROP_OLDEST
 
 
 class Reporter:
-    """Send logs to server via SSH or HTTPS webhook."""
+    """Send logs to server via SSH or HTTPS webhook.
+
+    Alerts are drained from the queue into batches bounded by
+    ``batch_size`` and ``batch_interval``; over HTTPS a batch is one alert
+    (the legacy single-object body) unless ``https_array`` is set, in which
+    case the body is a JSON array. Each batch is delivered over a
+    pooled HTTPS session or a persistent SSH channel and retried with
+    exponential backoff before the next batch is attempted, so delivery
+    order matches submission order.
+
+    When ``spool_dir`` is configured alerts are written to a :class:`Spool`
+    instead of memory and are only acknowledged once delivered, so an
+    unreachable endpoint or a restart never loses them. If another process
+    (normally the daemon) already owns the spool, alerts are delivered from
+    memory instead.
+    """
 
     def __init__(self, config: ReporterConfig) -> None:
         self.config = config
         self._queue: "queue.Queue[Dict]" = queue.Queue()
         self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._session: Any = None
+        self._ssh_client: Any = None
+        self._ssh_stdin: Any = None
+        self._log_store: Optional[LogStore] = None
+        self._wakeup = threading.Event()
+        self._spool: Optional[Spool] = None
+        if config.spool_dir:
+            try:
+                self._spool = Spool(
+                    SpoolConfig(
+                        directory=Path(config.spool_dir),
+                        max_bytes=config.spool_max_bytes,
+                        policy=config.spool_policy,
+                    )
+                )
+            except SpoolLockedError:
+                # One-shot commands next to a running daemon deliver directly
+                # rather than replaying or acking the daemon's spool.
+                LOGGER.info("Spool %s is owned by another process; delivering without it", config.spool_dir)
         LOGGER.debug("Reporter initialised with config %s", config)
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
             return
-        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._stopping.clear()
+        target = self._spool_worker if self._spool is not None else self._worker
+        self._thread = threading.Thread(target=target, daemon=True)
         self._thread.start()
 
     def stop(self) -> None:
         if self._thread:
+            self._stopping.set()
+            self._wakeup.set()
             self._queue.put(None)  # type: ignore[arg-type]
             self._thread.join()
             self._thread = None
 
     def submit(self, payload: Dict) -> None:
         LOGGER.info("Queueing alert for delivery: %s", payload)
+        if self._spool is not None:
+            self._spool.append(payload)
+            self._wakeup.set()
+            return
         self._queue.put(payload)
 
+    def spool_status(self) -> Optional[Dict[str, object]]:
+        return self._spool.status() if self._spool is not None else None
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+    def _next_batch(self) -> Tuple[List[Dict], bool]:
+        """Block for one payload, then gather more until the batch is full."""
+
+        payload = self._queue.get()
+        if payload is None:
+            return [], True
+        batch = [payload]
+        deadline = time.monotonic() + self.config.batch_interval
+        while len(batch) < self._batch_limit():
+            remaining = deadline - time.monotonic()
+            try:
+                payload = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if payload is None:
+                return batch, True
+            batch.append(payload)
+        return batch, False
+
     def _worker(self) -> None:
+        try:
+            while True:
+                batch, stopping = self._next_batch()
+                if batch:
+                    self._deliver(batch)
+                if stopping:
+                    break
+        finally:
+            self._close()
+
+    def _spool_worker(self) -> None:
+        assert self._spool is not None
+        spool = self._spool
+        try:
+            while True:
+                stopping = self._stopping.is_set()
+                if not stopping and spool.depth < self._batch_limit():
+                    self._wakeup.wait(None if spool.depth == 0 else self.config.batch_interval)
+                    self._wakeup.clear()
+                spool.maybe_sync()
+                batch, position = spool.read_batch(self._batch_limit())
+                if not batch:
+                    if stopping:
+                        break
+                    continue
+                if self._deliver(batch):
+                    spool.ack(position)
+                elif stopping:
+                    LOGGER.warning("Leaving %s alerts spooled for the next start", spool.depth)
+                    break
+                else:
+                    self._stopping.wait(self.config.backoff_max)
+        finally:
+            spool.close()
+            self._close()
+
+    def _batch_limit(self) -> int:
+        if self.config.mode == "https" and not self.config.https_array:
+            return 1
+        return max(1, self.config.batch_size)
+
+    def _deliver(self, batch: List[Dict]) -> bool:
+        attempt = 0
         while True:
-            payload = self._queue.get()
-            if payload is None:
-                break
             try:
                 if self.config.mode == "https":
-                    self._send_https(payload)
+                    self._send_https(batch)
                 elif self.config.mode == "ssh":
-                    self._send_ssh(payload)
-                self._append_local_log(payload)
+                    self._send_ssh(batch)
+                break
             except Exception:
-                LOGGER.exception("Unable to forward payload: %s", payload)
+                attempt += 1
+                self._reset_transport()
+                if attempt > self.config.max_retries or self._stopping.is_set():
+                    LOGGER.exception(
+                        "Unable to forward %s payloads after %s attempts: %s",
+                        len(batch),
+                        attempt,
+                        batch,
+                    )
+                    return False
+                delay = min(self.config.backoff_max, self.config.backoff_base * 2 ** (attempt - 1))
+                LOGGER.warning(
+                    "Delivery of %s payloads failed (attempt %s); retrying in %.1fs",
+                    len(batch),
+                    attempt,
+                    delay,
+                    exc_info=True,
+                )
+                self._stopping.wait(delay)
+        # Outside the retry loop: a local log failure must not re-send a delivered batch.
+        try:
+            self._append_local_log(batch)
+        except Exception:
+            LOGGER.exception("Unable to append %s delivered payloads to the local log", len(batch))
+        return True
 
-    def _send_https(self, payload: Dict) -> None:
+    # ------------------------------------------------------------------
+    # Transports
+    # ------------------------------------------------------------------
+    def _send_https(self, batch: List[Dict]) -> None:
+        requests = optional_import("requests")
         if requests is None:
             LOGGER.warning("requests not installed; skipping HTTPS submission")
             return
         if not self.config.endpoint:
             raise ValueError("HTTPS endpoint not configured")
-        response = requests.post(self.config.endpoint, json=payload, timeout=10)
+        if self._session is None:
+            self._session = requests.Session()
+        body: Any = batch if self.config.https_array else batch[0]
+        response = self._session.post(self.config.endpoint, json=body, timeout=10)
         response.raise_for_status()
 
-    def _send_ssh(self, payload: Dict) -> None:
-        if paramiko is None:
+    def _send_ssh(self, batch: List[Dict]) -> None:
+        if optional_import("paramiko") is None:
             LOGGER.warning("paramiko not installed; skipping SSH submission")
             return
         if not all([self.config.ssh_host, self.config.ssh_username, self.config.ssh_key_path]):
             raise ValueError("SSH configuration incomplete")
+        stdin = self._ssh_channel()
+        stdin.write("".join(json.dumps(payload) + "\n" for payload in batch))
+        stdin.flush()
+
+    def _ssh_channel(self):
+        """Return the stdin of a long-lived remote ``cat >>`` command."""
+
+        if self._ssh_stdin is not None:
+            transport = self._ssh_client.get_transport()
+            if transport is not None and transport.is_active() and not self._ssh_stdin.channel.closed:
+                return self._ssh_stdin
+            self._reset_transport()
+        paramiko = optional_import("paramiko")
         client = paramiko.SSHClient()
         client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         client.connect(
@@ -94,19 +252,43 @@ class Reporter:
             key_filename=self.config.ssh_key_path,
             timeout=10,
         )
-        stdin, stdout, stderr = client.exec_command(
+        transport = client.get_transport()
+        if transport is not None:
+            transport.set_keepalive(30)
+        stdin, _stdout, _stderr = client.exec_command(
             f"cat >> {self.config.endpoint or '~/sentinel.log'}"
         )
-        stdin.write(json.dumps(payload) + "\n")
-        stdin.flush()
-        stdout.channel.shutdown_write()
-        client.close()
-
-    def _append_local_log(self, payload: Dict) -> None:
-        path = self.config.local_log_path
-        Path(path).parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "a", encoding="utf-8") as handle:
-            handle.write(json.dumps(payload) + "\n")
+        self._ssh_client, self._ssh_stdin = client, stdin
+        return stdin
+
+    def _reset_transport(self) -> None:
+        if self._ssh_stdin is not None:
+            try:
+                self._ssh_stdin.channel.shutdown_write()
+            except Exception:  # pragma: no cover - channel already gone
+                pass
+            self._ssh_stdin = None
+        if self._ssh_client is not None:
+            self._ssh_client.close()
+            self._ssh_client = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    # ------------------------------------------------------------------
+    # Local log
+    # ------------------------------------------------------------------
+    def _append_local_log(self, batch: List[Dict]) -> None:
+        if self._log_store is None:
+            # Shared with the runtime's logging handler when the paths match,
+            # so both go through one lock, index and rotation policy.
+            self._log_store = LogStore.for_path(Path(self.config.local_log_path))
+        # One write per batch keeps lines whole and costs one index check.
+        self._log_store.write("".join(json.dumps(payload) + "\n" for payload in batch))
+
+    def _close(self) -> None:
+        self._reset_transport()
+        self._log_store = None
 
 
 __all__ = ["Reporter", "ReporterConfig"]
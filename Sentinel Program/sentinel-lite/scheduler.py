@@ -0,0 +1,280 @@
+"""Single-loop probe scheduler for Sentinel Lite.
+
+Every periodic check (network scan, procguard compare, integrity sweep) is
+registered as a :class:`Probe` and driven from one asyncio event loop. The
+loop owns all timing: each probe's next run is its interval plus random
+jitter, so probes never fire in lock-step, and a shared semaphore caps how
+many run at once. The blocking probe bodies execute on a small thread pool
+and are consumed alert by alert, which lets a stop request interrupt a long
+sweep between files instead of waiting for it to finish.
+
+Each run is charged for the CPU time of its thread plus any work it handed
+to helper threads (see :func:`accounting.charge`) and for the bytes it read. A probe
+that exceeds its CPU or IO budget has its next run pushed back until its
+average usage is within budget again.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from accounting import ProbeRun, bound, cancelled, charge
+
+LOGGER = logging.getLogger("sentinel.scheduler")
+
+@dataclass
+class Probe:
+    name: str
+    run: Callable[[], Iterable[dict]]
+    interval: float
+    jitter: float = 0.1  # fraction of the interval, applied +/-
+    cpu_budget: float = 0.0  # fraction of one core averaged over a cycle; 0 disables
+    io_budget: float = 0.0  # bytes per second averaged over a cycle; 0 disables
+    initial_delay: float = 0.0
+
+
+@dataclass
+class ProbeStats:
+    runs: int = 0
+    failures: int = 0
+    alerts: int = 0
+    throttled: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    io_bytes: int = 0
+    files: int = 0
+    sockets: int = 0
+    last_duration: float = 0.0
+    next_due: Optional[float] = None
+
+    def record(self, run: ProbeRun) -> None:
+        self.runs += 1
+        self.failures += int(run.failed)
+        self.alerts += run.alerts
+        self.wall_seconds += run.wall_seconds
+        self.cpu_seconds += run.cpu_seconds
+        self.io_bytes += run.io_bytes
+        self.files += run.files
+        self.sockets += run.sockets
+        self.last_duration = run.wall_seconds
+
+
+@dataclass
+class SchedulerConfig:
+    max_concurrency: int = 2
+    stats_interval: float = 900.0  # log usage every N seconds; 0 disables
+    grace_seconds: float = 5.0  # wait this long for in-flight probes on stop
+
+
+class Scheduler:
+    """Run probes on jittered intervals from a single asyncio loop."""
+
+    def __init__(self, config: SchedulerConfig, sink: Callable[[dict], None]) -> None:
+        self.config = config
+        self.sink = sink
+        self.probes: List[Probe] = []
+        self.stats: Dict[str, ProbeStats] = {}
+        self._stopping = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_requested: Optional[asyncio.Event] = None
+
+    def add(self, probe: Probe) -> None:
+        self.probes.append(probe)
+        self.stats[probe.name] = ProbeStats()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def run(self) -> None:
+        """Block running all probes until :meth:`stop` or SIGTERM/SIGINT."""
+
+        asyncio.run(self._main())
+
+    def stop(self) -> None:
+        """Request shutdown; safe to call from any thread or signal handler."""
+
+        self._stopping.set()
+        loop, event = self._loop, self._stop_requested
+        if loop is not None and event is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(event.set)
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop_requested = asyncio.Event()
+        if self._stopping.is_set():
+            return
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                self._loop.add_signal_handler(signum, self._on_signal, signum)
+            except (NotImplementedError, RuntimeError):
+                # Not on the main thread (or not supported): rely on stop().
+                pass
+        workers = max(1, self.config.max_concurrency)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sentinel-probe")
+        semaphore = asyncio.Semaphore(workers)
+        tasks = [
+            asyncio.create_task(self._drive(probe, semaphore, executor), name=f"probe-{probe.name}")
+            for probe in self.probes
+        ]
+        if self.config.stats_interval > 0:
+            tasks.append(asyncio.create_task(self._report_stats(), name="probe-stats"))
+        LOGGER.info(
+            "Scheduler running %s probes (max %s concurrent)", len(self.probes), workers
+        )
+        try:
+            await self._stop_requested.wait()
+        finally:
+            self._stopping.set()
+            for task in tasks:
+                task.cancel()
+            # Cancelled tasks wait for their in-flight probe; bound that wait.
+            done, pending = await asyncio.wait(tasks, timeout=self.config.grace_seconds)
+            if pending:
+                LOGGER.warning(
+                    "%s probes still running after %.0fs grace period; abandoning them",
+                    len(pending),
+                    self.config.grace_seconds,
+                )
+            executor.shutdown(wait=False, cancel_futures=True)
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                try:
+                    self._loop.remove_signal_handler(signum)
+                except (NotImplementedError, RuntimeError):
+                    pass
+            LOGGER.info("Scheduler stopped")
+
+    def _on_signal(self, signum: int) -> None:
+        LOGGER.info("Received signal %s; shutting down", signum)
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Probe driving
+    # ------------------------------------------------------------------
+    def _jittered(self, probe: Probe, base: float) -> float:
+        spread = base * probe.jitter
+        return max(0.0, base + random.uniform(-spread, spread))
+
+    async def _drive(self, probe: Probe, semaphore: asyncio.Semaphore, executor: ThreadPoolExecutor) -> None:
+        stats = self.stats[probe.name]
+        loop = asyncio.get_running_loop()
+        # Stagger the first runs a little without delaying long sweeps for minutes.
+        delay = probe.initial_delay + random.uniform(0.0, min(probe.interval, 60.0) * probe.jitter)
+        while True:
+            stats.next_due = time.time() + delay
+            await asyncio.sleep(delay)
+            async with semaphore:
+                future = loop.run_in_executor(executor, self._execute, probe, self.sink)
+                try:
+                    run = await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # Give the worker a chance to notice _stopping and unwind.
+                    try:
+                        await asyncio.wait({future})
+                    finally:
+                        future.cancel()
+                    raise
+            stats.record(run)
+            delay = self._jittered(probe, probe.interval)
+            rest = self._budget_rest(probe, run.cpu_seconds, run.io_bytes)
+            if rest > delay:
+                stats.throttled += 1
+                LOGGER.info(
+                    "Probe %s over budget (%.2fs CPU, %.1f MB read); next run in %.0fs",
+                    probe.name,
+                    run.cpu_seconds,
+                    run.io_bytes / 1e6,
+                    rest,
+                )
+                delay = rest
+
+    @staticmethod
+    def _budget_rest(probe: Probe, cpu: float, io_bytes: int) -> float:
+        """Cycle length needed to keep this run's usage within budget."""
+
+        rest = 0.0
+        if probe.cpu_budget > 0:
+            rest = max(rest, cpu / probe.cpu_budget)
+        if probe.io_budget > 0:
+            rest = max(rest, io_bytes / probe.io_budget)
+        return rest
+
+    def _execute(self, probe: Probe, sink: Callable[[dict], None]) -> ProbeRun:
+        run = ProbeRun(name=probe.name)
+        started = time.monotonic()
+        cpu_started = time.thread_time()
+        with bound(run, self._stopping):
+            try:
+                for alert in probe.run():
+                    sink(alert)
+                    run.alerts += 1
+                    if self._stopping.is_set():
+                        break
+            except Exception:  # pragma: no cover - defensive, keeps the loop alive
+                run.failed = True
+                LOGGER.exception("Probe %s failed", probe.name)
+        run.cpu_seconds += time.thread_time() - cpu_started
+        run.wall_seconds = time.monotonic() - started
+        return run
+
+    def run_once(self) -> Dict[str, ProbeRun]:
+        """Run every probe once, up to ``max_concurrency`` at a time, and wait.
+
+        Alerts are collected in :attr:`ProbeRun.results` instead of being
+        passed to the sink.
+        """
+
+        workers = max(1, min(self.config.max_concurrency, len(self.probes)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sentinel-probe") as executor:
+            futures = {}
+            for probe in self.probes:
+                results: List[dict] = []
+                futures[probe.name] = (executor.submit(self._execute, probe, results.append), results)
+            runs = {}
+            for name, (future, results) in futures.items():
+                run = future.result()
+                run.results = results
+                self.stats[name].record(run)
+                runs[name] = run
+        return runs
+
+    async def _report_stats(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.stats_interval)
+            for name, snapshot in self.snapshot().items():
+                LOGGER.info(
+                    "Probe %s: %s runs, %s failures, %s throttled, %.1fs CPU, %.1f MB read",
+                    name,
+                    snapshot["runs"],
+                    snapshot["failures"],
+                    snapshot["throttled"],
+                    snapshot["cpu_seconds"],
+                    snapshot["io_bytes"] / 1e6,
+                )
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return {
+            name: {
+                "runs": stats.runs,
+                "failures": stats.failures,
+                "alerts": stats.alerts,
+                "throttled": stats.throttled,
+                "wall_seconds": round(stats.wall_seconds, 3),
+                "cpu_seconds": round(stats.cpu_seconds, 3),
+                "io_bytes": stats.io_bytes,
+                "files": stats.files,
+                "sockets": stats.sockets,
+                "last_duration": round(stats.last_duration, 3),
+                "next_due": stats.next_due,
+            }
+            for name, stats in self.stats.items()
+        }
+
+
+__all__ = ["Probe", "ProbeRun", "ProbeStats", "Scheduler", "SchedulerConfig", "cancelled", "charge"]
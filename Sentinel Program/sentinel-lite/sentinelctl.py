@@ -1,42 +1,105 @@
-"""Command line interface for Sentinel Lite."""
+"""Command line interface for Sentinel Lite.
+
+Component modules and optional dependencies are imported on first use so
+that quick commands such as ``status`` start without loading the probes.
+"""
 from __future__ import annotations
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 import argparse
 import configparser
+import json
 import logging
-import signal
+import os
+import socket
 import sys
 import threading
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
 
-from integrity import IntegrityConfig, IntegrityVerifier
-from netwatch import NetWatcher, NetWatcherConfig
-from procguard import ProcGuard, ProcGuardConfig
-from reporter import Reporter, ReporterConfig
+import optional
+from logstore import LogReader, LogStore, LogStoreHandler
+
+if TYPE_CHECKING:
+    from hashing import HashEngine
+    from integrity import IntegrityVerifier
+    from netwatch import NetWatcher
+    from procguard import ProcGuard
+    from reporter import Reporter, ReporterConfig
+    from scheduler import Scheduler
 
 LOG_PATH = Path(__file__).resolve().parent / "logs" / "sentinel.log"
-LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout), logging.FileHandler(LOG_PATH)],
-)
 LOGGER = logging.getLogger("sentinel.cli")
 
+# label -> seconds, reported by --profile-startup
+STARTUP_TIMINGS: Dict[str, float] = {"import sentinelctl": time.perf_counter() - _IMPORT_STARTED}
+
+
+@contextmanager
+def _timed(label: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[label] = STARTUP_TIMINGS.get(label, 0.0) + time.perf_counter() - started
+
+
+def _configure_logging() -> None:
+    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout), LogStoreHandler(LogStore.for_path(LOG_PATH))],
+    )
+
 
 class SentinelRuntime:
-    """Coordinates all Sentinel Lite components."""
+    """Coordinates all Sentinel Lite components.
+
+    Components are built on first access, so a command only pays for the
+    subsystems it touches (``report`` never hashes the ProcGuard baseline).
+    """
 
-    def __init__(self, config_root: Path) -> None:
+    def __init__(self, config_root: Path, refresh_baseline: bool = True) -> None:
         self.config_root = config_root
-        self._stop_event = threading.Event()
+        self.refresh_baseline = refresh_baseline
         self.config = self._load_config()
-        self.reporter = Reporter(self._build_reporter_config())
-        self.netwatcher = self._build_netwatch()
-        self.procguard = self._build_procguard()
-        self.integrity = self._build_integrity()
-        self._threads: List[threading.Thread] = []
+        self._configure_logs()
+        self._components: Dict[str, object] = {}
+        self._components_lock = threading.RLock()
+        self.scheduler: Optional[Scheduler] = None
+
+    def _component(self, name: str, build: Callable[[], object]):
+        with self._components_lock:
+            if name not in self._components:
+                with _timed(f"init {name}"):
+                    self._components[name] = build()
+            return self._components[name]
+
+    @property
+    def reporter(self) -> Reporter:
+        return self._component("reporter", self._build_reporter)
+
+    @property
+    def hasher(self) -> HashEngine:
+        return self._component("hasher", self._build_hasher)
+
+    @property
+    def netwatcher(self) -> NetWatcher:
+        return self._component("netwatcher", self._build_netwatch)
+
+    @property
+    def procguard(self) -> ProcGuard:
+        return self._component("procguard", self._build_procguard)
+
+    @property
+    def integrity(self) -> IntegrityVerifier:
+        return self._component("integrity", self._build_integrity)
 
     # ------------------------------------------------------------------
     # Configuration helpers
@@ -48,7 +111,33 @@ class SentinelRuntime:
             parser.read(conf_path)
         return parser
 
+    def _resolve(self, raw: str) -> Path:
+        path = Path(raw)
+        return path if path.is_absolute() else self.config_root / path
+
+    def _configure_logs(self) -> None:
+        section = self.config["logging"] if self.config.has_section("logging") else None
+        if not section:
+            return
+        limits = {
+            "max_bytes": section.getint("max_bytes", fallback=None),
+            "backups": section.getint("backups", fallback=None),
+            "index_every": section.getint("index_every", fallback=None),
+        }
+        LogStore.for_path(LOG_PATH, **limits)
+        local_log = self.config.get("reporting", "local_log_path", fallback=None)
+        if local_log:
+            LogStore.for_path(self._resolve(local_log), **limits)
+
+    def _build_reporter(self) -> Reporter:
+        with _timed("import reporter"):
+            from reporter import Reporter
+
+        return Reporter(self._build_reporter_config())
+
     def _build_reporter_config(self) -> ReporterConfig:
+        from reporter import ReporterConfig
+
         section = self.config["reporting"] if self.config.has_section("reporting") else None
         mode = section.get("mode", "https") if section else "https"
         endpoint = section.get("endpoint") if section else None
@@ -56,28 +145,73 @@ class SentinelRuntime:
         if section and not Path(local_log_path).is_absolute():
             local_log_path = str(self.config_root / local_log_path)
         config = ReporterConfig(mode=mode, endpoint=endpoint, local_log_path=local_log_path)
+        if section:
+            config.batch_size = section.getint("batch_size", fallback=config.batch_size)
+            config.batch_interval = section.getfloat("batch_interval", fallback=config.batch_interval)
+            config.https_array = section.getboolean("https_array", fallback=config.https_array)
+            config.max_retries = section.getint("max_retries", fallback=config.max_retries)
+            spool_dir = section.get("spool_dir")
+            if spool_dir:
+                config.spool_dir = str(self._resolve(spool_dir))
+                config.spool_max_bytes = section.getint("spool_max_bytes", fallback=config.spool_max_bytes)
+                config.spool_policy = section.get("spool_policy", config.spool_policy)
         if mode == "ssh" and section:
             config.ssh_host = section.get("ssh_host")
             config.ssh_username = section.get("ssh_username")
             config.ssh_key_path = section.get("ssh_key_path")
         return config
 
+    def _build_hasher(self) -> HashEngine:
+        with _timed("import hashing"):
+            from hashing import DEFAULT_WORKERS, HashEngine
+
+        section = self.config["hashing"] if self.config.has_section("hashing") else None
+        workers = section.getint("workers", fallback=DEFAULT_WORKERS) if section else DEFAULT_WORKERS
+        return HashEngine(workers=workers)
+
     def _build_netwatch(self) -> NetWatcher:
+        with _timed("import netwatch"):
+            from netwatch import NetWatcher, NetWatcherConfig
+
         section = self.config["network"] if self.config.has_section("network") else None
         vpn_interface = section.get("vpn_interface", "tun0") if section else "tun0"
         allowlist_raw = section.get("allowlist", "") if section else ""
         allowlist = {item.strip() for item in allowlist_raw.split(",") if item.strip()}
-        return NetWatcher(
-            NetWatcherConfig(
-                vpn_interface=vpn_interface,
-                allowlisted_remote_ips=allowlist,
-            )
+        config = NetWatcherConfig(
+            vpn_interface=vpn_interface,
+            allowlisted_remote_ips=allowlist,
         )
+        if section:
+            config.scanner = section.get("scanner", config.scanner)
+            config.vpn_ip_ttl = section.getfloat("vpn_ip_ttl", fallback=config.vpn_ip_ttl)
+            config.report_new_only = section.getboolean("report_new_only", fallback=config.report_new_only)
+            config.allowlist_refresh_seconds = section.getfloat(
+                "allowlist_refresh", fallback=config.allowlist_refresh_seconds
+            )
+            config.max_flows = section.getint("max_flows", fallback=config.max_flows)
+            config.alert_rate_per_minute = section.getfloat(
+                "alert_rate_per_minute", fallback=config.alert_rate_per_minute
+            )
+            config.alert_burst = section.getint("alert_burst", fallback=config.alert_burst)
+            config.summary_interval_seconds = section.getfloat(
+                "summary_interval", fallback=config.summary_interval_seconds
+            )
+            config.flow_idle_timeout_seconds = section.getfloat(
+                "flow_idle_timeout", fallback=config.flow_idle_timeout_seconds
+            )
+        return NetWatcher(config)
 
     def _build_procguard(self) -> ProcGuard:
+        with _timed("import procguard"):
+            from chunking import ChunkSpec
+            from procguard import ProcGuard, ProcGuardConfig
+
         section = self.config["procguard"] if self.config.has_section("procguard") else None
         critical_files = []
         manifest = self.config_root / "hash_manifest.json"
+        coalesce = 1.0
+        chunk_threshold = 0
+        chunking = ChunkSpec()
         if section:
             critical_files = [
                 Path(path.strip())
@@ -87,79 +221,136 @@ class SentinelRuntime:
             manifest = Path(section.get("manifest", str(manifest)))
             if not manifest.is_absolute():
                 manifest = self.config_root / manifest
+            coalesce = section.getfloat("coalesce", fallback=1.0)
+            chunk_threshold = section.getint("chunk_threshold", fallback=0)
+            chunking = ChunkSpec(
+                mode=section.get("chunking", chunking.mode),
+                size=section.getint("chunk_size", fallback=chunking.size),
+            )
         config = ProcGuardConfig(
             critical_paths=critical_files,
             manifest_path=manifest,
+            coalesce_seconds=coalesce,
+            chunk_threshold=chunk_threshold,
+            chunking=chunking,
         )
-        guard = ProcGuard(config)
-        guard.refresh_baseline()
+        guard = ProcGuard(config, hasher=self.hasher)
+        if self.refresh_baseline:
+            guard.refresh_baseline()
         return guard
 
     def _build_integrity(self) -> IntegrityVerifier:
+        with _timed("import integrity"):
+            from integrity import IntegrityConfig, IntegrityVerifier
+
         section = self.config["integrity"] if self.config.has_section("integrity") else None
         manifest = self.config_root / "manifest.json"
         interval = 600
+        cache_path = None
+        paranoid_every = 0
+        mode = "poll"
+        debounce = 2.0
+        safety_interval = 3600
+        sample_chunks = 0
         if section:
             manifest = Path(section.get("manifest", str(manifest)))
             if not manifest.is_absolute():
                 manifest = self.config_root / manifest
             interval = section.getint("interval", fallback=600)
-        config = IntegrityConfig(manifest_path=manifest, interval_seconds=interval)
-        return IntegrityVerifier(config)
+            if section.get("cache"):
+                cache_path = Path(section.get("cache"))
+                if not cache_path.is_absolute():
+                    cache_path = self.config_root / cache_path
+            paranoid_every = section.getint("paranoid_every", fallback=0)
+            mode = section.get("mode", "poll")
+            debounce = section.getfloat("debounce", fallback=2.0)
+            safety_interval = section.getint("safety_interval", fallback=3600)
+            sample_chunks = section.getint("sample_chunks", fallback=0)
+        config = IntegrityConfig(
+            manifest_path=manifest,
+            interval_seconds=interval,
+            cache_path=cache_path,
+            paranoid_every=paranoid_every,
+            mode=mode,
+            debounce_seconds=debounce,
+            safety_interval_seconds=safety_interval,
+            sample_chunks=sample_chunks,
+        )
+        return IntegrityVerifier(config, hasher=self.hasher)
+
+    def _section_interval(self, name: str, default: float) -> float:
+        if not self.config.has_section(name):
+            return default
+        return self.config[name].getfloat("interval", fallback=default)
+
+    def _build_scheduler(self) -> Scheduler:
+        with _timed("import scheduler"):
+            from scheduler import Probe, Scheduler, SchedulerConfig
+
+        section = self.config["scheduler"] if self.config.has_section("scheduler") else None
+        config = SchedulerConfig()
+        jitter = 0.1
+        cpu_budget = 0.0
+        io_budget = 0.0
+        if section:
+            config.max_concurrency = section.getint("max_concurrency", fallback=config.max_concurrency)
+            config.stats_interval = section.getfloat("stats_interval", fallback=config.stats_interval)
+            config.grace_seconds = section.getfloat("grace", fallback=config.grace_seconds)
+            jitter = section.getfloat("jitter", fallback=jitter)
+            cpu_budget = section.getfloat("cpu_budget", fallback=cpu_budget)
+            io_budget = section.getfloat("io_budget_mb_s", fallback=io_budget) * 1e6
+        scheduler = Scheduler(config, sink=self.reporter.submit)
+        probes = (
+            ("network", self.netwatcher.scan_connections, self._section_interval("network", 30)),
+            ("procguard", self.procguard.iter_compare, self._section_interval("procguard", 60)),
+            ("integrity", self.integrity.iter_verify, self.integrity.sweep_interval),
+        )
+        for name, run, interval in probes:
+            scheduler.add(
+                Probe(
+                    name=name,
+                    run=run,
+                    interval=interval,
+                    jitter=jitter,
+                    cpu_budget=cpu_budget,
+                    io_budget=io_budget,
+                )
+            )
+        return scheduler
 
     # ------------------------------------------------------------------
     # Runtime controls
     # ------------------------------------------------------------------
     def start(self) -> None:
         LOGGER.info("Starting Sentinel runtime")
-        self._stop_event.clear()
-        self._threads = []
         self.reporter.start()
         self.procguard.start_watchdog(self.reporter.submit)
-
-        net_thread = threading.Thread(target=self._poll_network, daemon=True)
-        net_thread.start()
-        self._threads.append(net_thread)
-
-        proc_thread = threading.Thread(target=self._poll_procguard, daemon=True)
-        proc_thread.start()
-        self._threads.append(proc_thread)
-
-        integ_thread = threading.Thread(
-            target=self.integrity.run_forever,
-            args=(self.reporter.submit,),
-            daemon=True,
-        )
-        integ_thread.start()
-        self._threads.append(integ_thread)
-
-        def handle_signal(signum, frame):
-            LOGGER.info("Received signal %s; shutting down", signum)
-            self.stop()
-
-        signal.signal(signal.SIGTERM, handle_signal)
-        signal.signal(signal.SIGINT, handle_signal)
-
-        for thread in self._threads:
-            thread.join()
+        self.integrity.start_watch(self.reporter.submit)
+        self.scheduler = self._build_scheduler()
+        try:
+            # Blocks until SIGTERM/SIGINT or stop().
+            self.scheduler.run()
+        finally:
+            self._shutdown()
 
     def stop(self) -> None:
-        LOGGER.info("Stopping Sentinel runtime")
-        self.reporter.stop()
-        self.procguard.stop_watchdog()
-        self._stop_event.set()
-
-    def _poll_network(self) -> None:
-        while not self._stop_event.is_set():
-            for alert in self.netwatcher.scan_connections():
-                self.reporter.submit(alert)
-            self._stop_event.wait(30)
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        else:
+            self._shutdown()
 
-    def _poll_procguard(self) -> None:
-        while not self._stop_event.is_set():
-            for alert in self.procguard.compare():
-                self.reporter.submit(alert)
-            self._stop_event.wait(60)
+    def _shutdown(self) -> None:
+        LOGGER.info("Stopping Sentinel runtime")
+        # Only tear down what was built; do not construct components to stop them.
+        built = self._components
+        if "integrity" in built:
+            self.integrity.stop_watch()
+        if "procguard" in built:
+            self.procguard.stop_watchdog()
+        if "netwatcher" in built:
+            self.netwatcher.close()
+        if "reporter" in built:
+            self.reporter.stop()
 
 
 # ----------------------------------------------------------------------------
@@ -171,23 +362,108 @@ def _cmd_start(args) -> None:
     runtime.start()
 
 
+_FORCE_SCAN_BUNDLES = (("network", "network"), ("procguard", "process"), ("integrity", "integrity"))
+
+
+def _log_to_stderr() -> None:
+    """Keep stdout clean for machine-readable output."""
+
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            handler.setStream(sys.stderr)
+
+
 def _cmd_force_scan(args) -> None:
-    runtime = SentinelRuntime(Path(args.config_root))
+    if args.json:
+        _log_to_stderr()
+    # --parallel compares against the stored baseline instead of re-hashing it first.
+    runtime = SentinelRuntime(Path(args.config_root), refresh_baseline=not args.parallel)
     runtime.reporter.start()
     runtime.reporter.submit({"type": "info", "status": "force_scan_started"})
-    runtime.reporter.submit({"type": "network", "results": runtime.netwatcher.scan_connections()})
-    runtime.reporter.submit({"type": "process", "results": runtime.procguard.compare()})
-    runtime.reporter.submit({"type": "integrity", "results": list(runtime.integrity.verify_once())})
-    runtime.reporter.stop()
+    scheduler = runtime._build_scheduler()
+    scheduler.config.max_concurrency = len(scheduler.probes) if args.parallel else 1
+    started = time.perf_counter()
+    runs = {}
+    try:
+        runs = scheduler.run_once()
+    finally:
+        wall = time.perf_counter() - started
+        for probe, bundle in _FORCE_SCAN_BUNDLES:
+            if probe in runs:
+                runtime.reporter.submit({"type": bundle, "results": runs[probe].results})
+        runtime._shutdown()
+    report = {
+        "host": socket.gethostname(),
+        "mode": "parallel" if args.parallel else "sequential",
+        "timestamp": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "wall_seconds": round(wall, 3),
+        "hash_throughput_mb_s": round(runtime.hasher.throughput_mb_s(), 1),
+        "probes": {name: run.as_dict() for name, run in runs.items()},
+    }
+    if args.json:
+        print(json.dumps(report, sort_keys=True))
+        return
+    print(f"Force scan ({report['mode']}) on {report['host']}: {wall:.2f}s")
+    print(f"  {'probe':<10} {'wall s':>8} {'cpu s':>8} {'files':>7} {'MB read':>9} {'sockets':>8} {'alerts':>7}")
+    for name, run in runs.items():
+        print(
+            f"  {name:<10} {run.wall_seconds:>8.3f} {run.cpu_seconds:>8.3f} {run.files:>7} "
+            f"{run.io_bytes / 1e6:>9.1f} {run.sockets:>8} {run.alerts:>7}{'  FAILED' if run.failed else ''}"
+        )
+
+
+def _parse_when(raw: str) -> float:
+    """Parse ``--since``/``--until``: ISO 8601 or a relative ``30s``/``15m``/``2h``/``7d``."""
+
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if raw and raw[-1] in units and raw[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(raw[:-1]) * units[raw[-1]]
+    try:
+        return datetime.fromisoformat(raw).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time {raw!r}; use ISO 8601 or e.g. 15m, 2h, 7d")
 
 
 def _cmd_status(args) -> None:
     log_path = Path(args.log or LOG_PATH)
-    if not log_path.exists():
+    reader = LogReader(log_path)
+    if not reader.segments():
         print("No log file available", file=sys.stderr)
         return
-    for line in log_path.read_text().splitlines()[-20:]:
+    if args.since is not None or args.until is not None:
+        lines = reader.iter_range(args.since, args.until, args.type)
+    else:
+        lines = reader.tail(args.lines, args.type)
+    for line in lines:
         print(line)
+    if args.follow:
+        try:
+            for line in reader.follow(args.type):
+                print(line, flush=True)
+        except KeyboardInterrupt:
+            pass
+
+
+def _cmd_spool(args) -> None:
+    config_root = Path(args.config_root)
+    parser = configparser.ConfigParser()
+    parser.read(config_root / "sentinel.conf")
+    spool_dir = parser.get("reporting", "spool_dir", fallback=None)
+    if not spool_dir:
+        print("Spool not configured ([reporting] spool_dir)", file=sys.stderr)
+        return
+    directory = Path(spool_dir)
+    if not directory.is_absolute():
+        directory = config_root / directory
+    from spool import Spool, SpoolConfig
+
+    status = Spool(SpoolConfig(directory=directory), readonly=True).status()
+    age = status["oldest_age_seconds"]
+    print(f"Spool: {directory}")
+    print(f"  depth:    {status['depth']} alerts")
+    print(f"  bytes:    {status['bytes']}")
+    print(f"  segments: {status['segments']}")
+    print(f"  oldest:   {'n/a' if age is None else f'{age:.0f}s ago'}")
 
 
 def _cmd_report(args) -> None:
@@ -197,6 +473,32 @@ def _cmd_report(args) -> None:
     runtime.reporter.stop()
 
 
+def _cmd_manifest(args) -> None:
+    from chunking import DEFAULT_CHUNK_SIZE, ChunkSpec
+
+    runtime = SentinelRuntime(Path(args.config_root))
+    manifest_path = runtime._resolve(
+        args.manifest or runtime.config.get("integrity", "manifest", fallback="manifest.json")
+    )
+    try:
+        spec = ChunkSpec(mode="cdc" if args.cdc else "fixed", size=args.chunk_size or DEFAULT_CHUNK_SIZE)
+    except ValueError as exc:
+        print(f"Invalid chunking: {exc}", file=sys.stderr)
+        return
+    entries = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    paths = [Path(os.path.abspath(raw)) for raw in args.paths]
+    chunked = args.chunked or args.cdc or bool(args.chunk_size)
+    for result in runtime.hasher.hash_many(paths, {path: spec for path in paths} if chunked else None):
+        if result.error is not None:
+            print(f"Unable to hash {result.path}: {result.error}", file=sys.stderr)
+            continue
+        entries[str(result.path)] = result.chunks.to_entry() if result.chunks else result.digest
+        print(f"{result.path}: {result.digest}")
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(entries, indent=2, sort_keys=True))
+    os.replace(tmp_path, manifest_path)
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Sentinel Lite control tool")
     parser.add_argument(
@@ -204,18 +506,51 @@ def build_parser() -> argparse.ArgumentParser:
         default=str(Path(__file__).resolve().parent),
         help="Path to sentinel configuration root",
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print module import and component init timings to stderr on exit",
+    )
     sub = parser.add_subparsers(dest="command", required=True)
 
     cmd_start = sub.add_parser("start", help="Start Sentinel Lite service")
     cmd_start.set_defaults(func=_cmd_start)
 
     cmd_force = sub.add_parser("force-scan", help="Run all checks once and exit")
+    cmd_force.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Run probes concurrently and skip the ProcGuard baseline refresh",
+    )
+    cmd_force.add_argument("--json", action="store_true", help="Print the timing report as JSON")
     cmd_force.set_defaults(func=_cmd_force_scan)
 
     cmd_status = sub.add_parser("status", help="Show tail of Sentinel log")
     cmd_status.add_argument("--log", help="Path to log file")
+    cmd_status.add_argument("-n", "--lines", type=int, default=20, help="Number of trailing lines to show")
+    cmd_status.add_argument("-f", "--follow", action="store_true", help="Keep printing new lines")
+    cmd_status.add_argument(
+        "--type", action="append", help="Only show alerts of this type (repeatable), e.g. network"
+    )
+    cmd_status.add_argument("--since", type=_parse_when, help="Start of time range (ISO 8601 or 15m, 2h, 7d)")
+    cmd_status.add_argument("--until", type=_parse_when, help="End of time range (ISO 8601 or 15m, 2h, 7d)")
     cmd_status.set_defaults(func=_cmd_status)
 
+    cmd_spool = sub.add_parser("spool", help="Show reporter spool depth and age")
+    cmd_spool.set_defaults(func=_cmd_spool)
+
+    cmd_manifest = sub.add_parser("manifest", help="Add or update integrity manifest entries")
+    cmd_manifest.add_argument("paths", nargs="+", help="Files to record")
+    cmd_manifest.add_argument("--manifest", help="Manifest to update (default: [integrity] manifest)")
+    cmd_manifest.add_argument(
+        "--chunked", action="store_true", help="Record per-chunk digests and a Merkle root"
+    )
+    cmd_manifest.add_argument("--chunk-size", type=int, help="Chunk size in bytes (implies --chunked)")
+    cmd_manifest.add_argument(
+        "--cdc", action="store_true", help="Use content-defined chunk boundaries (implies --chunked)"
+    )
+    cmd_manifest.set_defaults(func=_cmd_manifest)
+
     cmd_report = sub.add_parser("report", help="Send an info report")
     cmd_report.set_defaults(func=_cmd_report)
 
@@ -225,7 +560,23 @@ def build_parser() -> argparse.ArgumentParser:
 def main(argv: List[str] | None = None) -> None:
     parser = build_parser()
     args = parser.parse_args(argv)
-    args.func(args)
+    _configure_logging()
+    try:
+        with _timed(f"command {args.command}"):
+            args.func(args)
+    finally:
+        if args.profile_startup:
+            _print_startup_profile()
+
+
+def _print_startup_profile() -> None:
+    rows = list(STARTUP_TIMINGS.items())
+    rows += [(f"optional {name}", seconds) for name, seconds in optional.import_timings.items()]
+    print("Startup profile (ms; init includes the imports it triggers):", file=sys.stderr)
+    for label, seconds in rows:
+        print(f"  {label:<28} {seconds * 1000:>9.1f}", file=sys.stderr)
+    total = time.perf_counter() - _IMPORT_STARTED
+    print(f"  {'total since import':<28} {total * 1000:>9.1f}", file=sys.stderr)
 
 
 if __name__ == "__main__":
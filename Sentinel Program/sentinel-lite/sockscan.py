@@ -0,0 +1,317 @@
+"""Socket table scanners for :mod:`netwatch`.
+
+``psutil.net_connections`` walks every process' file descriptors to attach
+PIDs, which is slow on hosts with tens of thousands of sockets. The
+scanners here read the kernel socket tables directly instead:
+
+* :class:`NetlinkScanner` dumps sockets via ``NETLINK_SOCK_DIAG``.
+* :class:`ProcNetScanner` parses ``/proc/net/{tcp,tcp6,udp,udp6}`` line by
+  line without loading the files into memory.
+* :class:`PsutilScanner` keeps the previous behaviour as a last resort.
+
+All scanners yield :class:`Connection` tuples for sockets with a remote
+peer. Kernel-table scanners do not know the owning process;
+:func:`resolve_socket_pids` looks it up for the few sockets worth reporting.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from optional import optional_import
+
+LOGGER = logging.getLogger("sentinel.sockscan")
+
+Endpoint = Tuple[str, int]
+
+_TCP_STATES = {
+    1: "ESTABLISHED",
+    2: "SYN_SENT",
+    3: "SYN_RECV",
+    4: "FIN_WAIT1",
+    5: "FIN_WAIT2",
+    6: "TIME_WAIT",
+    7: "CLOSE",
+    8: "CLOSE_WAIT",
+    9: "LAST_ACK",
+    10: "LISTEN",
+    11: "CLOSING",
+}
+
+
+class Connection(NamedTuple):
+    """A socket with a remote peer, independent of the scanner backend."""
+
+    proto: str
+    laddr: Endpoint
+    raddr: Endpoint
+    status: str
+    inode: int = 0
+    uid: Optional[int] = None
+    pid: Optional[int] = None
+
+    @property
+    def key(self) -> Tuple[str, Endpoint, Endpoint, int]:
+        return (self.proto, self.laddr, self.raddr, self.inode)
+
+
+# ----------------------------------------------------------------------------
+# /proc/net parser
+# ----------------------------------------------------------------------------
+
+def _decode_address(raw: str) -> Endpoint:
+    """Decode ``0100007F:0016`` style entries from /proc/net."""
+
+    host, port = raw.split(":")
+    packed = bytes.fromhex(host)
+    if len(packed) == 4:
+        ip = socket.inet_ntop(socket.AF_INET, packed[::-1])
+    else:
+        # IPv6 addresses are four host-endian 32-bit words.
+        words = b"".join(packed[i : i + 4][::-1] for i in range(0, 16, 4))
+        ip = socket.inet_ntop(socket.AF_INET6, words)
+    return ip, int(port, 16)
+
+
+def _is_unspecified(endpoint: Endpoint) -> bool:
+    return endpoint[1] == 0 and endpoint[0] in {"0.0.0.0", "::"}
+
+
+class ProcNetScanner:
+    """Parse the kernel socket tables under ``/proc/net``."""
+
+    name = "procfs"
+    TABLES = ("tcp", "tcp6", "udp", "udp6")
+
+    def __init__(self, root: Path = Path("/proc/net")) -> None:
+        self.root = root
+
+    @classmethod
+    def available(cls, root: Path = Path("/proc/net")) -> bool:
+        return (root / "tcp").exists()
+
+    def scan(self) -> Iterator[Connection]:
+        for table in self.TABLES:
+            path = self.root / table
+            try:
+                handle = path.open("r", encoding="ascii")
+            except OSError:
+                continue
+            proto = table.rstrip("6")
+            with handle:
+                next(handle, None)  # header
+                for line in handle:
+                    fields = line.split()
+                    if len(fields) < 10:
+                        continue
+                    raddr = _decode_address(fields[2])
+                    if _is_unspecified(raddr):
+                        continue
+                    state = int(fields[3], 16)
+                    yield Connection(
+                        proto=proto,
+                        laddr=_decode_address(fields[1]),
+                        raddr=raddr,
+                        status=_TCP_STATES.get(state, "NONE") if proto == "tcp" else "NONE",
+                        inode=int(fields[9]),
+                        uid=int(fields[7]),
+                    )
+
+
+# ----------------------------------------------------------------------------
+# sock_diag netlink
+# ----------------------------------------------------------------------------
+
+_NETLINK_SOCK_DIAG = 4
+_SOCK_DIAG_BY_FAMILY = 20
+_NLM_F_REQUEST = 0x1
+_NLM_F_DUMP = 0x300
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_NLMSG_HDR = struct.Struct("=IHHII")
+# family, protocol, ext, pad, states, sport, dport, src[16], dst[16], if, cookie[2]
+_DIAG_REQ = struct.Struct("=BBBxI2s2s16s16sIII")
+_DIAG_MSG = struct.Struct("=BBBB2s2s16s16sIQIIIII")
+_ALL_STATES = 0xFFFFFFFF & ~(1 << 10)  # everything except LISTEN
+
+
+class NetlinkScanner:
+    """Dump inet sockets through ``NETLINK_SOCK_DIAG``."""
+
+    name = "netlink"
+
+    @classmethod
+    def available(cls) -> bool:
+        if not hasattr(socket, "AF_NETLINK"):
+            return False
+        try:
+            with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, _NETLINK_SOCK_DIAG):
+                return True
+        except OSError:
+            return False
+
+    def scan(self) -> Iterator[Connection]:
+        with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, _NETLINK_SOCK_DIAG) as sock:
+            for family in (socket.AF_INET, socket.AF_INET6):
+                for proto, ipproto in (("tcp", socket.IPPROTO_TCP), ("udp", socket.IPPROTO_UDP)):
+                    yield from self._dump(sock, family, proto, ipproto)
+
+    def _dump(self, sock: socket.socket, family: int, proto: str, ipproto: int) -> Iterator[Connection]:
+        request = _DIAG_REQ.pack(family, ipproto, 0, _ALL_STATES, b"", b"", b"", b"", 0, 0, 0)
+        header = _NLMSG_HDR.pack(
+            _NLMSG_HDR.size + len(request), _SOCK_DIAG_BY_FAMILY, _NLM_F_REQUEST | _NLM_F_DUMP, 1, 0
+        )
+        sock.send(header + request)
+        while True:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + _NLMSG_HDR.size <= len(data):
+                length, msg_type, _flags, _seq, _pid = _NLMSG_HDR.unpack_from(data, offset)
+                if msg_type == _NLMSG_DONE:
+                    return
+                if msg_type == _NLMSG_ERROR:
+                    (errno,) = struct.unpack_from("=i", data, offset + _NLMSG_HDR.size)
+                    raise OSError(-errno, "sock_diag dump failed")
+                connection = self._parse(data, offset + _NLMSG_HDR.size, family, proto)
+                if connection is not None:
+                    yield connection
+                offset += (length + 3) & ~3
+
+    @staticmethod
+    def _parse(data: bytes, offset: int, family: int, proto: str) -> Optional[Connection]:
+        (
+            _family,
+            state,
+            _timer,
+            _retrans,
+            sport,
+            dport,
+            src,
+            dst,
+            _if,
+            _cookie,
+            _expires,
+            _rqueue,
+            _wqueue,
+            uid,
+            inode,
+        ) = _DIAG_MSG.unpack_from(data, offset)
+        size = 4 if family == socket.AF_INET else 16
+        raddr = (socket.inet_ntop(family, dst[:size]), int.from_bytes(dport, "big"))
+        if _is_unspecified(raddr):
+            return None
+        return Connection(
+            proto=proto,
+            laddr=(socket.inet_ntop(family, src[:size]), int.from_bytes(sport, "big")),
+            raddr=raddr,
+            status=_TCP_STATES.get(state, "NONE") if proto == "tcp" else "NONE",
+            inode=inode,
+            uid=uid,
+        )
+
+
+# ----------------------------------------------------------------------------
+# psutil fallback
+# ----------------------------------------------------------------------------
+
+class PsutilScanner:
+    """Wrap ``psutil.net_connections`` in the :class:`Connection` shape."""
+
+    name = "psutil"
+
+    @classmethod
+    def available(cls) -> bool:
+        return optional_import("psutil") is not None
+
+    def scan(self) -> Iterator[Connection]:
+        for conn in optional_import("psutil").net_connections(kind="inet"):
+            if not conn.raddr:
+                continue
+            proto = "tcp" if conn.type == socket.SOCK_STREAM else "udp"
+            yield Connection(
+                proto=proto,
+                laddr=(conn.laddr[0], conn.laddr[1]) if conn.laddr else ("", 0),
+                raddr=(conn.raddr[0], conn.raddr[1]),
+                status=conn.status,
+                pid=conn.pid,
+            )
+
+
+_BACKENDS = {
+    "netlink": NetlinkScanner,
+    "procfs": ProcNetScanner,
+    "psutil": PsutilScanner,
+}
+
+
+def build_scanner(preference: str = "auto"):
+    """Return the preferred available scanner, or ``None`` if none work."""
+
+    order = ("netlink", "procfs", "psutil") if preference == "auto" else (preference,)
+    for name in order:
+        backend = _BACKENDS.get(name)
+        if backend is None:
+            raise ValueError(f"Unknown socket scanner backend: {name}")
+        if backend.available():
+            LOGGER.debug("Using %s socket scanner", name)
+            return backend()
+    return None
+
+
+def resolve_socket_pids(inodes: Iterable[int], proc_root: Path = Path("/proc")) -> Dict[int, int]:
+    """Map socket inodes to owning PIDs by walking ``/proc/<pid>/fd``.
+
+    This is the expensive part of ``psutil.net_connections``; callers should
+    only ask for the handful of sockets they are about to report on.
+    """
+
+    wanted = {f"socket:[{inode}]": inode for inode in inodes if inode}
+    found: Dict[int, int] = {}
+    if not wanted:
+        return found
+    for entry in os.scandir(proc_root):
+        if not entry.name.isdigit():
+            continue
+        fd_dir = os.path.join(entry.path, "fd")
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                target = os.readlink(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            inode = wanted.get(target)
+            if inode is not None and inode not in found:
+                found[inode] = int(entry.name)
+                if len(found) == len(wanted):
+                    return found
+    return found
+
+
+def interface_signature(interface: str) -> Optional[Tuple[int, str]]:
+    """Cheap fingerprint of a network interface used to invalidate caches."""
+
+    base = Path("/sys/class/net") / interface
+    try:
+        ifindex = int((base / "ifindex").read_text().strip())
+        operstate = (base / "operstate").read_text().strip()
+    except (OSError, ValueError):
+        return None
+    return ifindex, operstate
+
+
+__all__ = [
+    "Connection",
+    "NetlinkScanner",
+    "ProcNetScanner",
+    "PsutilScanner",
+    "build_scanner",
+    "interface_signature",
+    "resolve_socket_pids",
+]
@@ -0,0 +1,364 @@
+"""Durable on-disk spool for Sentinel Lite alerts.
+
+Alerts are appended to numbered segment files as length-prefixed,
+CRC-checked records. A cursor file records how far delivery has
+progressed so that a restarted :class:`reporter.Reporter` replays exactly
+the alerts that were never acknowledged. The spool enforces a byte cap by
+dropping either the oldest segments or new submissions.
+
+Only one process may open a spool for writing: the owner holds an
+exclusive ``flock`` on ``spool.lock`` until :meth:`Spool.close`, and a
+second writer gets :class:`SpoolLockedError` instead of recovering (and
+possibly truncating) segments the owner is still appending to.
+
+Record layout (little endian)::
+
+    uint32 length | uint32 crc32(timestamp + payload) | uint64 timestamp_ns | payload
+"""
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LOGGER = logging.getLogger("sentinel.spool")
+
+_HEADER = struct.Struct("<IIQ")
+_SEGMENT_SUFFIX = ".seg"
+_CURSOR_NAME = "cursor.json"
+_LOCK_NAME = "spool.lock"
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+# (segment sequence, byte offset, records consumed within that segment)
+Position = Tuple[int, int, int]
+
+
+class SpoolLockedError(RuntimeError):
+    """Another process already has the spool open for writing."""
+
+
+@dataclass
+class SpoolConfig:
+    directory: Path
+    max_bytes: int = 64 * 1024 * 1024
+    segment_bytes: int = 4 * 1024 * 1024
+    policy: str = DROP_OLDEST
+    sync_every: int = 64
+    sync_interval: float = 1.0
+
+
+@dataclass
+class _Segment:
+    seq: int
+    size: int = 0
+    records: int = 0
+    first_ts: Optional[int] = None
+
+
+class Spool:
+    """Append-only segment spool with at-least-once replay."""
+
+    def __init__(self, config: SpoolConfig, readonly: bool = False) -> None:
+        self.config = config
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._segments: Dict[int, _Segment] = {}
+        self._cursor: Position = (0, 0, 0)
+        self._cursor_ts: Optional[int] = None
+        self._writer = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.dropped = 0
+        self._lock_file = None
+        if not readonly:
+            config.directory.mkdir(parents=True, exist_ok=True)
+            self._acquire_lock()
+        self._recover()
+
+    def _acquire_lock(self) -> None:
+        handle = (self.config.directory / _LOCK_NAME).open("a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            raise SpoolLockedError(f"Spool {self.config.directory} is in use by another process") from None
+        self._lock_file = handle
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+    def _segment_path(self, seq: int) -> Path:
+        return self.config.directory / f"{seq:016d}{_SEGMENT_SUFFIX}"
+
+    def _load_cursor(self) -> Position:
+        path = self.config.directory / _CURSOR_NAME
+        if not path.exists():
+            return (0, 0, 0)
+        try:
+            data = json.loads(path.read_text())
+            return (int(data["segment"]), int(data["offset"]), int(data.get("index", 0)))
+        except (ValueError, KeyError, json.JSONDecodeError):
+            LOGGER.warning("Spool cursor %s corrupted; replaying from the oldest segment", path)
+            return (0, 0, 0)
+
+    def _recover(self) -> None:
+        if not self.config.directory.exists():
+            return
+        seqs = sorted(
+            int(path.stem)
+            for path in self.config.directory.glob(f"*{_SEGMENT_SUFFIX}")
+            if path.stem.isdigit()
+        )
+        cursor = self._load_cursor()
+        if seqs and cursor[0] < seqs[0]:
+            cursor = (seqs[0], 0, 0)
+        for seq in seqs:
+            if seq < cursor[0]:
+                if not self.readonly:
+                    self._segment_path(seq).unlink(missing_ok=True)
+                continue
+            segment = self._scan_segment(seq, truncate=(seq == seqs[-1]))
+            self._segments[seq] = segment
+        if not seqs:
+            cursor = (cursor[0], 0, 0)
+        elif cursor[0] in self._segments and cursor[1] > self._segments[cursor[0]].size:
+            segment = self._segments[cursor[0]]
+            cursor = (cursor[0], segment.size, segment.records)
+        self._cursor = cursor
+        self._cursor_ts = self._timestamp_at(cursor)
+
+    def _scan_segment(self, seq: int, truncate: bool) -> _Segment:
+        path = self._segment_path(seq)
+        segment = _Segment(seq=seq)
+        offset = 0
+        with path.open("rb") as handle:
+            while True:
+                header = handle.read(_HEADER.size)
+                if not header:
+                    break
+                record = self._parse(handle, header)
+                if record is None:
+                    if truncate and not self.readonly:
+                        LOGGER.warning("Truncating torn spool record in %s at byte %s", path.name, offset)
+                        with path.open("r+b") as writer:
+                            writer.truncate(offset)
+                    else:
+                        LOGGER.warning("Corrupt spool record in %s at byte %s; skipping rest", path.name, offset)
+                    break
+                timestamp, payload = record
+                if segment.first_ts is None:
+                    segment.first_ts = timestamp
+                segment.records += 1
+                offset += _HEADER.size + len(payload)
+        segment.size = offset
+        return segment
+
+    @staticmethod
+    def _parse(handle, header: bytes) -> Optional[Tuple[int, bytes]]:
+        if len(header) < _HEADER.size:
+            return None
+        length, crc, timestamp = _HEADER.unpack(header)
+        payload = handle.read(length)
+        if len(payload) < length:
+            return None
+        if zlib.crc32(header[8:] + payload) != crc:
+            return None
+        return timestamp, payload
+
+    def _timestamp_at(self, position: Position) -> Optional[int]:
+        seq, offset, _ = position
+        segment = self._segments.get(seq)
+        if segment is None or offset >= segment.size:
+            return None
+        with self._segment_path(seq).open("rb") as handle:
+            handle.seek(offset)
+            header = handle.read(_HEADER.size)
+            record = self._parse(handle, header)
+        return record[0] if record else None
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    @property
+    def depth(self) -> int:
+        segments = self._segments.values()
+        return sum(segment.records for segment in segments) - self._cursor[2] if segments else 0
+
+    @property
+    def pending_bytes(self) -> int:
+        segments = self._segments.values()
+        return sum(segment.size for segment in segments) - self._cursor[1] if segments else 0
+
+    def append(self, payload: Dict) -> bool:
+        """Durably queue ``payload``; returns ``False`` if the cap dropped it."""
+
+        if self.readonly:
+            raise RuntimeError("Spool opened read-only")
+        data = json.dumps(payload).encode("utf-8")
+        timestamp = time.time_ns()
+        body = struct.pack("<Q", timestamp) + data
+        record = _HEADER.pack(len(data), zlib.crc32(body), timestamp) + data
+        with self._lock:
+            if self.pending_bytes + len(record) > self.config.max_bytes and not self._make_room(len(record)):
+                self.dropped += 1
+                LOGGER.warning("Spool full (%s bytes); dropping new alert", self.pending_bytes)
+                return False
+            segment = self._active_segment(len(record))
+            self._writer.write(record)
+            self._writer.flush()
+            segment.size += len(record)
+            segment.records += 1
+            if segment.first_ts is None:
+                segment.first_ts = timestamp
+            if self._cursor_ts is None:
+                self._cursor_ts = timestamp
+            self._unsynced += 1
+            if self._unsynced >= self.config.sync_every:
+                self._sync_locked()
+        return True
+
+    def _active_segment(self, incoming: int) -> _Segment:
+        last_seq = max(self._segments) if self._segments else self._cursor[0]
+        segment = self._segments.get(last_seq)
+        if segment is not None and (segment.size == 0 or segment.size + incoming <= self.config.segment_bytes):
+            if self._writer is None:
+                self._writer = self._segment_path(last_seq).open("ab")
+            return segment
+        self._sync_locked()
+        if self._writer is not None:
+            self._writer.close()
+        seq = last_seq + 1 if segment is not None else last_seq
+        segment = _Segment(seq=seq)
+        self._segments[seq] = segment
+        self._writer = self._segment_path(seq).open("ab")
+        if not self._segments or self._cursor[0] not in self._segments:
+            self._cursor = (seq, 0, 0)
+        return segment
+
+    def _make_room(self, incoming: int) -> bool:
+        if self.config.policy != DROP_OLDEST:
+            return False
+        while self.pending_bytes + incoming > self.config.max_bytes and len(self._segments) > 1:
+            oldest = min(self._segments)
+            segment = self._segments.pop(oldest)
+            lost = segment.records - (self._cursor[2] if self._cursor[0] == oldest else 0)
+            self.dropped += lost
+            self._segment_path(oldest).unlink(missing_ok=True)
+            self._cursor = (min(self._segments), 0, 0)
+            self._cursor_ts = self._segments[self._cursor[0]].first_ts
+            self._write_cursor()
+            LOGGER.warning("Spool cap reached; dropped %s undelivered alerts from segment %s", lost, oldest)
+        return self.pending_bytes + incoming <= self.config.max_bytes
+
+    def _sync_locked(self) -> None:
+        if self._writer is not None and self._unsynced:
+            os.fsync(self._writer.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def maybe_sync(self) -> None:
+        """fsync pending appends if ``sync_interval`` has elapsed."""
+
+        with self._lock:
+            if self._unsynced and time.monotonic() - self._last_sync >= self.config.sync_interval:
+                self._sync_locked()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def read_batch(self, limit: int) -> Tuple[List[Dict], Position]:
+        """Return up to ``limit`` unacknowledged payloads and the position after them."""
+
+        with self._lock:
+            seq, offset, index = self._cursor
+            batch: List[Dict] = []
+            for current in sorted(s for s in self._segments if s >= seq):
+                segment = self._segments[current]
+                if current != seq:
+                    offset, index = 0, 0
+                if offset >= segment.size:
+                    continue
+                with self._segment_path(current).open("rb") as handle:
+                    handle.seek(offset)
+                    while len(batch) < limit and offset < segment.size:
+                        record = self._parse(handle, handle.read(_HEADER.size))
+                        if record is None:
+                            LOGGER.warning("Skipping corrupt spool tail in segment %s", current)
+                            offset = segment.size
+                            break
+                        batch.append(json.loads(record[1]))
+                        offset += _HEADER.size + len(record[1])
+                        index += 1
+                seq = current
+                if len(batch) >= limit:
+                    break
+            return batch, (seq, offset, index)
+
+    def ack(self, position: Position) -> None:
+        """Mark everything before ``position`` as delivered."""
+
+        with self._lock:
+            if position[:2] <= self._cursor[:2] or position[0] not in self._segments:
+                return
+            for seq in [s for s in self._segments if s < position[0]]:
+                del self._segments[seq]
+                self._segment_path(seq).unlink(missing_ok=True)
+            segment = self._segments[position[0]]
+            if position[1] >= segment.size and position[0] != max(self._segments):
+                # Fully consumed and no longer written to.
+                del self._segments[position[0]]
+                self._segment_path(position[0]).unlink(missing_ok=True)
+                next_seq = min(self._segments)
+                position = (next_seq, 0, 0)
+            self._cursor = position
+            self._cursor_ts = self._timestamp_at(position)
+            self._write_cursor()
+
+    def _write_cursor(self) -> None:
+        seq, offset, index = self._cursor
+        path = self.config.directory / _CURSOR_NAME
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump({"segment": seq, "offset": offset, "index": index}, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+    def status(self) -> Dict[str, object]:
+        with self._lock:
+            oldest_age = None
+            if self.depth and self._cursor_ts is not None:
+                oldest_age = max(0.0, (time.time_ns() - self._cursor_ts) / 1e9)
+            return {
+                "depth": self.depth,
+                "bytes": self.pending_bytes,
+                "segments": len(self._segments),
+                "oldest_age_seconds": oldest_age,
+                "dropped": self.dropped,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync_locked()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+
+__all__ = ["Spool", "SpoolConfig", "SpoolLockedError", "DROP_OLDEST", "DROP_NEWEST"]